@@ -1,12 +1,14 @@
 # api/app.py
 
+import threading
 from datetime import datetime
 from flask import Flask
 
 from .config import (
     RANGE_LIVECHAT_DEFAULT, RANGE_STAFF_LIVECHAT, DATABASE_URL,
     SCOPES, SPREADSHEET_LIVECHAT,
-    SPREADSHEET_KESALAHAN, RANGE_KESALAHAN_STAFF, RANGE_KESALAHAN_FATAL
+    SPREADSHEET_KESALAHAN, RANGE_KESALAHAN_STAFF, RANGE_KESALAHAN_FATAL,
+    EAGER_INIT
 )
 from .database import db, get_global_config
 from .sheets_api import init_sheets_service
@@ -28,6 +30,7 @@ KESALAHAN_SPREADSHEET_ID = SPREADSHEET_KESALAHAN
 KESALAHAN_RANGE_STAFF = RANGE_KESALAHAN_STAFF
 KESALAHAN_RANGE_FATAL = RANGE_KESALAHAN_FATAL
 
+# SheetsServicePool (client per thread), bukan satu objek googleapiclient bersama
 SHEETS_SERVICE = None
 # Deklarasikan variabel global KESALAHAN_SHEETS_SERVICE
 KESALAHAN_SHEETS_SERVICE = None
@@ -68,7 +71,8 @@ def init_sheets_api_service():
     global SHEETS_SERVICE
     try:
         # Layanan untuk Livechat (SHEETS_SERVICE)
-        SHEETS_SERVICE = init_sheets_service(LIVECHAT_SPREADSHEET_ID, LIVECHAT_SCOPES)
+        # Pool yang sudah ada dikonfigurasi ulang di tempat (lihat SheetsServicePool)
+        SHEETS_SERVICE = init_sheets_service(LIVECHAT_SPREADSHEET_ID, LIVECHAT_SCOPES, pool=SHEETS_SERVICE)
     except Exception:
         SHEETS_SERVICE = None
         
@@ -78,23 +82,81 @@ def init_kesalahan_sheets_service():
     try:
         # Layanan baru untuk Kesalahan (KESALAHAN_SHEETS_SERVICE)
         # Menggunakan ID Spreadsheet Kesalahan, namun tetap menggunakan LIVECHAT_SCOPES
-        KESALAHAN_SHEETS_SERVICE = init_sheets_service(KESALAHAN_SPREADSHEET_ID, LIVECHAT_SCOPES)
+        KESALAHAN_SHEETS_SERVICE = init_sheets_service(KESALAHAN_SPREADSHEET_ID, LIVECHAT_SCOPES, pool=KESALAHAN_SHEETS_SERVICE)
     except Exception:
         KESALAHAN_SHEETS_SERVICE = None
         
 
-def init_db_and_services():
-    db.create_all()
-    load_global_config()
-    init_sheets_api_service()
-    # Inisialisasi layanan Kesalahan yang baru di sini
-    init_kesalahan_sheets_service()
+# =========================================================================
+# INISIALISASI LAZY (SEKALI PER PROSES)
+# Tidak ada pekerjaan saat import: DB, konfigurasi global, dan layanan Sheets
+# dibangun saat pertama kali dibutuhkan. Hanya langkah yang berhasil yang diingat;
+# langkah yang gagal (DB/Redis mati saat cold start, kredensial belum ada) dicatat
+# di log dan dicoba lagi pada pemakaian berikutnya.
+# =========================================================================
 
-with app.app_context():
-    try:
-        init_db_and_services()
-    except Exception:
-        pass
+_init_lock = threading.RLock()
+_initialized_steps = set()
+
+def _run_once(step_name, init_func, is_ready=None):
+    """Menjalankan init_func sampai berhasil sekali; mengembalikan True jika langkah sudah siap."""
+    if step_name in _initialized_steps:
+        return True
+    with _init_lock:
+        if step_name in _initialized_steps:
+            return True
+        try:
+            with app.app_context():
+                init_func()
+        except Exception:
+            app.logger.exception("Inisialisasi '%s' gagal, akan dicoba lagi.", step_name)
+            return False
+        if is_ready is not None and not is_ready():
+            app.logger.warning("Inisialisasi '%s' belum berhasil, akan dicoba lagi.", step_name)
+            return False
+        _initialized_steps.add(step_name)
+        return True
+
+def ensure_database():
+    """db.create_all sekali per proses (termasuk tabel baru seperti MonthlyAggregate)."""
+    return _run_once('database', db.create_all)
+
+def ensure_global_config():
+    # Seperti urutan lama saat import: tabel dibuat dulu, baru konfigurasi dibaca dari DB.
+    # Jika DB gagal, nilai default dari env dipakai dan konfigurasi dibaca lagi nanti.
+    if ensure_database():
+        _run_once('global_config', load_global_config)
+
+def get_sheets_service():
+    """SheetsServicePool Livechat, dibuat saat pertama kali dipakai."""
+    ensure_global_config()
+    _run_once('sheets_service', init_sheets_api_service, is_ready=lambda: SHEETS_SERVICE is not None)
+    return SHEETS_SERVICE
+
+def get_kesalahan_sheets_service():
+    """SheetsServicePool Kesalahan, dibuat saat pertama kali dipakai."""
+    ensure_global_config()
+    _run_once('kesalahan_sheets_service', init_kesalahan_sheets_service, is_ready=lambda: KESALAHAN_SHEETS_SERVICE is not None)
+    return KESALAHAN_SHEETS_SERVICE
+
+def get_livechat_settings():
+    """Mengembalikan (spreadsheet_id, range_kesalahan, range_staff) Livechat yang berlaku."""
+    ensure_global_config()
+    return LIVECHAT_SPREADSHEET_ID, LIVECHAT_RANGE_KESALAHAN, LIVECHAT_RANGE_STAFF
+
+def get_kesalahan_settings():
+    """Mengembalikan (spreadsheet_id, range_staff, range_fatal) Kesalahan yang berlaku."""
+    ensure_global_config()
+    return KESALAHAN_SPREADSHEET_ID, KESALAHAN_RANGE_STAFF, KESALAHAN_RANGE_FATAL
+
+def warmup_services():
+    """Hook opsional: membangun semua layanan sekarang (EAGER_INIT atau pemanggil lain)."""
+    ensure_database()
+    get_sheets_service()
+    get_kesalahan_sheets_service()
+
+if EAGER_INIT:
+    warmup_services()
 
 app.jinja_env.globals['current_year'] = datetime.now().year
 app.jinja_env.filters['render_cell'] = render_cell
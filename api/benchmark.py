@@ -0,0 +1,266 @@
+# api/benchmark.py
+
+"""
+Benchmark mesin ringkasan Livechat dan Kesalahan di atas spreadsheet sintetis.
+
+    python -m api.benchmark --sites 40 --staff 20 --months 12 --repeat 5 --json bench.json
+
+Fixture dibuat dengan synthetic_sheets lalu disajikan lewat LocalSheetsBackend
+(SHEETS_BACKEND=local), database memakai SQLite in-memory dan Redis dimatikan,
+sehingga tidak ada akses ke Google Sheets atau layanan produksi.
+
+Untuk setiap fungsi dan route dicatat waktu (min/median, perf_counter) dan
+puncak alokasi memori (tracemalloc, diukur pada putaran terpisah). Route diukur
+dalam dua mode: 'cold' (cache L1, indeks bulan, dan lru_cache parser dikosongkan
+sebelum setiap putaran) dan 'warm'.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .synthetic_sheets import generate_fixtures
+
+LIVECHAT_SPREADSHEET_ID = 'synthetic-livechat'
+KESALAHAN_SPREADSHEET_ID = 'synthetic-kesalahan'
+LEADERS = ['HENDY', 'DANIEL', 'SANTI', 'RUDI', 'MEGA']
+
+
+def measure(func, repeat=5, setup=None):
+    """
+    Menjalankan func(*setup()) sebanyak `repeat` kali. Waktu setup tidak ikut dihitung.
+    Mengembalikan {'min_ms', 'median_ms', 'peak_kib'}.
+    """
+    timings = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+
+    # tracemalloc memperlambat eksekusi, jadi memori diukur di putaran tersendiri
+    args = setup() if setup else ()
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'min_ms': round(min(timings) * 1000, 2),
+        'median_ms': round(statistics.median(timings) * 1000, 2),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def _configure_environment(fixture_dir):
+    """Harus dipanggil sebelum modul app/config di-import (config dibaca saat import)."""
+    if f'{__package__}.config' in sys.modules:
+        raise RuntimeError("api.config sudah di-import; jalankan benchmark sebagai proses tersendiri.")
+
+    os.environ.update({
+        'SHEETS_BACKEND': 'local',
+        'SHEETS_FIXTURE_DIR': fixture_dir,
+        'SPREADSHEET_LIVECHAT': LIVECHAT_SPREADSHEET_ID,
+        'SPREADSHEET_KESALAHAN': KESALAHAN_SPREADSHEET_ID,
+        'DATABASE_URL': 'sqlite:///:memory:',
+        # URL kosong membuat get_redis_client() mengembalikan None (hanya cache L1)
+        'REDIS_URL': '',
+        'EAGER_INIT': '',
+    })
+
+
+def _seed_site_configs(app, db, SiteConfig, sites):
+    with app.app_context():
+        db.create_all()
+        for i, site in enumerate(sites):
+            db.session.add(SiteConfig(
+                site_name_livechat=site,
+                site_name_kesalahan=site,
+                leader_name=LEADERS[i % len(LEADERS)]
+            ))
+        db.session.commit()
+
+
+def benchmark_functions(fixture_dir, fixtures, repeat):
+    """Fungsi perhitungan murni, dijalankan atas seluruh situs/bulan sintetis."""
+    from .sheets_backend import LocalSheetsBackend
+    from .sheets_api import clean_sheet_values
+    from .routes_livechat import (
+        calculate_staff_errors_from_kesalahan, filter_kesalahan_by_month, get_available_months
+    )
+    from .routes_kesalahan import (
+        _process_kesalahan_sheet, _finalize_rekap_data, _recap_per_situs, _recap_per_leader
+    )
+    from .config import RANGE_LIVECHAT_DEFAULT, RANGE_STAFF_LIVECHAT, RANGE_KESALAHAN_STAFF
+
+    backend = LocalSheetsBackend(fixture_dir)
+
+    site_data = []
+    for site in fixtures['sites']:
+        kesalahan_rows = backend.get_values(LIVECHAT_SPREADSHEET_ID, f"'{site}'!{RANGE_LIVECHAT_DEFAULT}").get('values', [])
+        staff_rows = backend.get_values(LIVECHAT_SPREADSHEET_ID, f"'{site}'!{RANGE_STAFF_LIVECHAT}").get('values', [])
+        staff_list = [row for row in staff_rows[1:] if row and row[0].strip()]
+        site_data.append((kesalahan_rows[1:], staff_list))
+
+    month_data = {
+        month: clean_sheet_values(
+            backend.get_values(KESALAHAN_SPREADSHEET_ID, f"'{month}'!{RANGE_KESALAHAN_STAFF}").get('values', [])
+        )
+        for month in fixtures['kesalahan_months']
+    }
+    latest_month = fixtures['kesalahan_months'][-1]
+    leader_mapping = {site: LEADERS[i % len(LEADERS)] for i, site in enumerate(fixtures['sites'])}
+
+    latest_filter = max(
+        (month for rows, _ in site_data for month in get_available_months(rows)),
+        key=lambda month: (month[3:], month[:2]),
+        default='all'
+    )
+
+    def run_available_months():
+        for rows, _ in site_data:
+            get_available_months(rows)
+
+    def run_filter(month_filter):
+        for rows, _ in site_data:
+            filter_kesalahan_by_month(rows, month_filter)
+
+    def run_staff_errors(month_filter):
+        for rows, staff_list in site_data:
+            calculate_staff_errors_from_kesalahan(filter_kesalahan_by_month(rows, month_filter), staff_list)
+
+    def run_process_months():
+        for month, raw_data in month_data.items():
+            _process_kesalahan_sheet(month, RANGE_KESALAHAN_STAFF, is_staff_sheet=True, raw_data=raw_data)
+
+    def fresh_rekap():
+        # _finalize_rekap_data mengubah input, jadi setiap putaran memakai hasil proses baru
+        _, _, rekap = _process_kesalahan_sheet(
+            latest_month, RANGE_KESALAHAN_STAFF, is_staff_sheet=True, raw_data=month_data[latest_month]
+        )
+        return (rekap,)
+
+    def run_recaps(rekap):
+        final_rekap_data = _finalize_rekap_data(rekap)
+        _recap_per_situs(final_rekap_data)
+        _recap_per_leader(final_rekap_data, leader_mapping)
+
+    return {
+        'get_available_months (semua situs)': measure(run_available_months, repeat),
+        f'filter_kesalahan_by_month {latest_filter} (semua situs)': measure(lambda: run_filter(latest_filter), repeat),
+        'filter_kesalahan_by_month all (semua situs)': measure(lambda: run_filter('all'), repeat),
+        f'calculate_staff_errors_from_kesalahan {latest_filter} (semua situs)': measure(lambda: run_staff_errors(latest_filter), repeat),
+        'calculate_staff_errors_from_kesalahan all (semua situs)': measure(lambda: run_staff_errors('all'), repeat),
+        '_process_kesalahan_sheet (semua bulan)': measure(run_process_months, repeat),
+        f'_finalize_rekap_data + rekap situs/leader ({latest_month})': measure(run_recaps, repeat, setup=fresh_rekap),
+    }
+
+
+def reset_process_caches():
+    """
+    Mode cold: mengosongkan semua cache per proses, yaitu L1 (local_cache), indeks bulan
+    per situs, dan lru_cache parser sel, sehingga putaran berikutnya mulai dari nol.
+    """
+    from .database import local_cache
+    from .routes_livechat import _month_index_cache, _parse_date_cell, classify_error_type, normalize_name
+    from .routes_kesalahan import _number_cell_value
+
+    local_cache.clear()
+    _month_index_cache.clear()
+    for memoized in (_parse_date_cell, classify_error_type, normalize_name, _number_cell_value):
+        memoized.cache_clear()
+
+
+def benchmark_routes(app, fixtures, repeat):
+    """Route utama lewat test_client, mode cold (semua cache proses kosong) dan warm."""
+    from .config import SUMMARY_LIVECHAT_ROUTE
+
+    first_site = fixtures['sites'][0]
+    all_months_query = '&'.join(f'sheets={month}' for month in fixtures['kesalahan_months'])
+    urls = [
+        f'/{SUMMARY_LIVECHAT_ROUTE}',
+        f'/{SUMMARY_LIVECHAT_ROUTE}/all',
+        f'/{first_site}',
+        f'/{first_site}/all',
+        '/kesalahan-summary',
+        f'/kesalahan-summary?{all_months_query}',
+        f"/kesalahan/{fixtures['kesalahan_months'][-1]}",
+    ]
+
+    client = app.test_client()
+    results = {}
+    for url in urls:
+        def request_url(url=url):
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} mengembalikan status {response.status_code}")
+
+        def clear_cache():
+            reset_process_caches()
+            return ()
+
+        results[f'{url} [cold]'] = measure(request_url, repeat, setup=clear_cache)
+        request_url()
+        results[f'{url} [warm]'] = measure(request_url, repeat)
+    return results
+
+
+def _print_table(title, results):
+    name_width = max([len(name) for name in results] + [len(title)])
+    print(f"\n{title.ljust(name_width)}  {'min ms':>10}  {'median ms':>10}  {'peak KiB':>10}")
+    print('-' * (name_width + 36))
+    for name, stats in results.items():
+        print(f"{name.ljust(name_width)}  {stats['min_ms']:>10}  {stats['median_ms']:>10}  {stats['peak_kib']:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ringkasan Livechat/Kesalahan dengan data sintetis.")
+    parser.add_argument('--sites', type=int, default=20, help="Jumlah situs Livechat (default 20)")
+    parser.add_argument('--staff', type=int, default=15, help="Staff per situs (default 15)")
+    parser.add_argument('--months', type=int, default=6, help="Jumlah bulan data (default 6)")
+    parser.add_argument('--errors', type=float, default=2.0, help="Rata-rata kesalahan per staff per bulan (default 2)")
+    parser.add_argument('--kesalahan-staff', type=int, default=300, help="Baris staff per sheet bulanan Kesalahan (default 300)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5, help="Putaran per pengukuran (default 5)")
+    parser.add_argument('--fixture-dir', help="Direktori fixture (default: direktori sementara)")
+    parser.add_argument('--skip-routes', action='store_true', help="Hanya ukur fungsi perhitungan")
+    parser.add_argument('--json', dest='json_path', help="Simpan hasil ke file JSON")
+    args = parser.parse_args(argv)
+
+    fixture_dir = args.fixture_dir or tempfile.mkdtemp(prefix='synthetic_sheets_')
+    fixtures = generate_fixtures(
+        fixture_dir, LIVECHAT_SPREADSHEET_ID, KESALAHAN_SPREADSHEET_ID,
+        sites=args.sites, staff_per_site=args.staff, months=args.months,
+        errors_per_staff_month=args.errors, kesalahan_staff=args.kesalahan_staff, seed=args.seed
+    )
+    _configure_environment(fixture_dir)
+
+    # Import setelah environment diatur; index mendaftarkan semua route
+    from .index import app
+    from .database import db, SiteConfig
+    _seed_site_configs(app, db, SiteConfig, fixtures['sites'])
+
+    print(f"Fixture: {fixture_dir} ({len(fixtures['sites'])} situs, {len(fixtures['kesalahan_months'])} bulan)")
+
+    results = {'parameters': vars(args), 'functions': benchmark_functions(fixture_dir, fixtures, args.repeat)}
+    _print_table('Fungsi', results['functions'])
+
+    if not args.skip_routes:
+        results['routes'] = benchmark_routes(app, fixtures, args.repeat)
+        _print_table('Route', results['routes'])
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == '__main__':
+    main()
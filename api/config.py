@@ -28,4 +28,100 @@ REDIS_URL = os.environ.get('REDIS_URL', 'redis://default:4u6RMXd2y5YdzWyshsa9QoF
 # --- KESALAHAN CONFIGURATION BARU ---
 SPREADSHEET_KESALAHAN = os.environ.get('SPREADSHEET_KESALAHAN', '1_WY_5vO5FJK0cfI2PjNwJ3GP5_ChELTT1GyJCiFYdE4')
 RANGE_KESALAHAN_STAFF = os.environ.get('RANGE_KESALAHAN_STAFF', 'A2:BN')
-RANGE_KESALAHAN_FATAL = os.environ.get('RANGE_KESALAHAN_FATAL', 'A1:M')
\ No newline at end of file
+RANGE_KESALAHAN_FATAL = os.environ.get('RANGE_KESALAHAN_FATAL', 'A1:M')
+
+# --- CACHE CONFIGURATION ---
+# Cache in-process (L1) di depan Redis (L2). TTL L1 sengaja pendek karena invalidasi
+# dari instance lain hanya terlihat lewat Redis.
+LOCAL_CACHE_MAX_ITEMS = int(os.environ.get('LOCAL_CACHE_MAX_ITEMS', '512'))
+# Cache index bulan per situs Livechat (terpisah dari L1 konfigurasi), satu entri per range + isi
+MONTH_INDEX_CACHE_MAX_ITEMS = int(os.environ.get('MONTH_INDEX_CACHE_MAX_ITEMS', '128'))
+LOCAL_CACHE_TTL = int(os.environ.get('LOCAL_CACHE_TTL', '60'))
+
+# Cache nilai mentah Google Sheets (values.get / batchGet) per spreadsheet + range
+SHEETS_VALUE_CACHE_TTL = int(os.environ.get('SHEETS_VALUE_CACHE_TTL', '300'))
+# Hard TTL: antara SHEETS_VALUE_CACHE_TTL dan nilai ini data lama dikembalikan sambil di-refresh di background
+SHEETS_VALUE_CACHE_HARD_TTL = int(os.environ.get('SHEETS_VALUE_CACHE_HARD_TTL', '3600'))
+
+# Single-flight: permintaan identik yang bersamaan menunggu satu fetch yang sedang berjalan
+SINGLE_FLIGHT_LOCK_TTL = int(os.environ.get('SINGLE_FLIGHT_LOCK_TTL', '30'))
+SINGLE_FLIGHT_WAIT_TIMEOUT = float(os.environ.get('SINGLE_FLIGHT_WAIT_TIMEOUT', '20'))
+
+# Cara refresh data yang lewat soft TTL (stale-while-revalidate). Data lama selalu
+# langsung dikembalikan; yang berbeda hanya siapa yang me-refresh:
+#   'thread' -> thread background di instance itu (server yang terus hidup)
+#   'defer'  -> tidak ada refresh di request; cron /cron/prewarm me-refresh data utama,
+#               sisanya diambil ulang sinkron setelah hard TTL habis (seperti cache miss).
+# Default 'defer' di Vercel (env VERCEL diset platform): thread background dibekukan/dimatikan
+# setelah response selesai, sedangkan refresh sinkron membuat request stale selambat cache miss.
+SWR_REFRESH_MODE = os.environ.get('SWR_REFRESH_MODE', 'defer' if os.environ.get('VERCEL') else 'thread')
+
+# Direktori sheet (judul, sheetId, gridProperties) per spreadsheet
+SHEET_DIRECTORY_CACHE_TTL = int(os.environ.get('SHEET_DIRECTORY_CACHE_TTL', '300'))
+SHEET_DIRECTORY_CACHE_HARD_TTL = int(os.environ.get('SHEET_DIRECTORY_CACHE_HARD_TTL', '3600'))
+
+# Thread pool untuk fetch Sheets yang independen (misalnya daftar sheet Livechat + Kesalahan)
+SHEETS_FETCH_MAX_WORKERS = int(os.environ.get('SHEETS_FETCH_MAX_WORKERS', '4'))
+SHEET_NAMES_FETCH_TIMEOUT = float(os.environ.get('SHEET_NAMES_FETCH_TIMEOUT', '10'))
+
+# batchGet dikirim sebagai GET; range dipecah per request agar URL tidak melebihi batas ini
+BATCH_GET_MAX_URL_CHARS = int(os.environ.get('BATCH_GET_MAX_URL_CHARS', '1800'))
+
+# Timeout socket maksimal (detik) untuk satu request HTTP client Google Sheets.
+# Per request dipotong lagi ke sisa SHEETS_CALL_DEADLINE (lihat call_sheets_api).
+SHEETS_HTTP_TIMEOUT = float(os.environ.get('SHEETS_HTTP_TIMEOUT', '15'))
+
+# Opt-in: inisialisasi DB, konfigurasi, dan layanan Sheets langsung saat import (bukan lazy)
+EAGER_INIT = os.environ.get('EAGER_INIT', '').strip().lower() in ('1', 'true', 'yes')
+
+# Sumber data spreadsheet: 'google' (default) atau 'local' (fixture JSON/CSV untuk profiling/load test)
+SHEETS_BACKEND = os.environ.get('SHEETS_BACKEND', 'google').strip().lower()
+SHEETS_FIXTURE_DIR = os.environ.get('SHEETS_FIXTURE_DIR', 'fixtures/sheets')
+
+# Agregat bulanan (tabel monthly_aggregate): bulan dianggap final dan dibekukan setelah
+# melewati awal bulan berikutnya + masa tenggang ini (hari), untuk koreksi data terlambat
+MONTHLY_AGGREGATE_FREEZE_DAYS = int(os.environ.get('MONTHLY_AGGREGATE_FREEZE_DAYS', '7'))
+
+# Hasil jadi ringkasan Livechat per filter bulan (kunci memuat range + leader mapping, bukan isi sheet)
+LIVECHAT_SUMMARY_CACHE_TTL = int(os.environ.get('LIVECHAT_SUMMARY_CACHE_TTL', '300'))
+LIVECHAT_SUMMARY_CACHE_HARD_TTL = int(os.environ.get('LIVECHAT_SUMMARY_CACHE_HARD_TTL', '3600'))
+
+# Sheet situs Livechat hanya bertambah di bawah: refresh cukup mengambil baris terakhir
+# (ditambah overlap untuk menangkap edit), dengan resync penuh setiap interval ini (detik)
+LIVECHAT_TAIL_OVERLAP_ROWS = int(os.environ.get('LIVECHAT_TAIL_OVERLAP_ROWS', '50'))
+LIVECHAT_TAIL_FULL_RESYNC_INTERVAL = int(os.environ.get('LIVECHAT_TAIL_FULL_RESYNC_INTERVAL', '3600'))
+
+# Probe perubahan (hanya sheet log yang baris lamanya tidak pernah diedit, hanya bertambah
+# di bawah): sebelum range yang sudah di-cache diunduh ulang, baris terakhirnya (+1 baris
+# sesudahnya) dibaca dulu; jika sama, cache diperpanjang tanpa unduhan penuh.
+# Trade-off: Sheets API tidak punya digest/revisi per sheet (Drive API butuh scope tambahan),
+# jadi edit di atas baris yang di-probe baru terlihat setelah SHEETS_PROBE_MAX_AGE detik,
+# saat unduhan penuh tetap dilakukan (0 = probe mati). Sheet yang diedit di tempat (grid
+# bulanan Kesalahan, sheet khusus Livechat, KETENTUAN) tidak pernah di-probe.
+SHEETS_PROBE_ROWS = int(os.environ.get('SHEETS_PROBE_ROWS', '2'))
+SHEETS_PROBE_MAX_AGE = int(os.environ.get('SHEETS_PROBE_MAX_AGE', '1800'))
+# Sheet Kesalahan yang hanya bertambah di bawah dan boleh di-probe (dipisah koma)
+KESALAHAN_APPEND_ONLY_SHEETS = [
+    name.strip().upper() for name in os.environ.get('KESALAHAN_APPEND_ONLY_SHEETS', 'FATAL!!!').split(',') if name.strip()
+]
+
+# Kuota baca Google Sheets: token bucket bersama di Redis (per menit, semua instance)
+SHEETS_READ_QUOTA_PER_MINUTE = int(os.environ.get('SHEETS_READ_QUOTA_PER_MINUTE', '60'))
+# Batas waktu menunggu token sebelum request dianggap gagal (detik)
+SHEETS_RATE_LIMIT_MAX_WAIT = float(os.environ.get('SHEETS_RATE_LIMIT_MAX_WAIT', '10'))
+# Retry eksponensial dengan jitter untuk 429/5xx dan gangguan jaringan
+SHEETS_RETRY_MAX_ATTEMPTS = int(os.environ.get('SHEETS_RETRY_MAX_ATTEMPTS', '4'))
+SHEETS_RETRY_BASE_DELAY = float(os.environ.get('SHEETS_RETRY_BASE_DELAY', '0.5'))
+SHEETS_RETRY_MAX_DELAY = float(os.environ.get('SHEETS_RETRY_MAX_DELAY', '8'))
+# Batas total satu panggilan (menunggu token + semua retry). Harus di bawah
+# SINGLE_FLIGHT_WAIT_TIMEOUT agar pemanggil yang menunggu hasil flight tidak ikut fetch sendiri.
+SHEETS_CALL_DEADLINE = min(
+    float(os.environ.get('SHEETS_CALL_DEADLINE', '15')), SINGLE_FLIGHT_WAIT_TIMEOUT - 1
+)
+
+# Prewarm cache terjadwal (python -m api.prewarm atau Vercel cron ke /cron/prewarm).
+# Vercel mengirim "Authorization: Bearer <CRON_SECRET>"; tanpa CRON_SECRET route cron ditolak.
+CRON_SECRET = os.environ.get('CRON_SECRET', '')
+# Langkah prewarm yang belum mulai dilewati setelah sekian detik; di bawah maxDuration
+# function Vercel (vercel.json) dengan sisa waktu untuk satu panggilan SHEETS_CALL_DEADLINE.
+PREWARM_TIME_BUDGET = float(os.environ.get('PREWARM_TIME_BUDGET', '40'))
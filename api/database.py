@@ -1,18 +1,42 @@
 # api/database.py
 
 import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
 import redis
+from flask import current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.exc import IntegrityError
-from .config import DATABASE_URL, REDIS_URL
+from .config import (
+    DATABASE_URL, REDIS_URL, LOCAL_CACHE_MAX_ITEMS, LOCAL_CACHE_TTL,
+    SINGLE_FLIGHT_LOCK_TTL, SINGLE_FLIGHT_WAIT_TIMEOUT, SWR_REFRESH_MODE
+)
 
 db = SQLAlchemy()
 
-try:
-    redis_client = redis.from_url(REDIS_URL, decode_responses=True)
-    redis_client.ping()
-except Exception:
-    redis_client = None
+# Koneksi Redis dibuat saat pertama kali dipakai (bukan saat import) agar cold start
+# tidak menunggu ping ke Redis Cloud. Hasilnya (termasuk None jika gagal) diingat per proses.
+_redis_client = None
+_redis_initialized = False
+_redis_init_lock = threading.Lock()
+
+def get_redis_client():
+    global _redis_client, _redis_initialized
+    if not _redis_initialized:
+        with _redis_init_lock:
+            if not _redis_initialized:
+                try:
+                    client = redis.from_url(REDIS_URL, decode_responses=True)
+                    client.ping()
+                except Exception:
+                    client = None
+                _redis_client = client
+                _redis_initialized = True
+    return _redis_client
 
 # --- MODELS ---
 
@@ -44,29 +68,383 @@ class GlobalConfig(db.Model):
     def __repr__(self):
         return f"<GlobalConfig key='{self.key}' value='{self.value[:30]}...'>"
 
-# --- FUNGSI CACHE REDIS ---
+class MonthlyAggregate(db.Model):
+    """
+    Agregat per bulan per situs yang dihitung oleh job refresh (api/monthly_aggregates.py).
+    source 'livechat': month_key 'mm-YYYY', site_name = nama sheet situs Livechat.
+    source 'kesalahan': month_key = nama sheet bulanan (misalnya 'NOV25'), site_name kosong.
+    Bulan yang sudah is_frozen dibaca route ringkasan tanpa memproses sel mentah.
+    """
+    __tablename__ = 'monthly_aggregate'
+    __table_args__ = (db.UniqueConstraint('source', 'month_key', 'site_name', name='uq_monthly_aggregate'),)
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(20), nullable=False)
+    month_key = db.Column(db.String(20), nullable=False)
+    site_name = db.Column(db.String(100), nullable=False, default='')
+    data = db.Column(db.Text, nullable=False)
+    is_frozen = db.Column(db.Boolean, default=False)
+    refreshed_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<MonthlyAggregate {self.source} month='{self.month_key}' site='{self.site_name}' frozen={self.is_frozen}>"
+
+# --- FUNGSI CACHE (L1 IN-PROCESS + L2 REDIS) ---
 
 CACHE_TTL_24_JAM = 3600 * 24 
+# Hard TTL konfigurasi: setelah 24 jam data lama masih dipakai sambil di-refresh di background
+CACHE_TTL_48_JAM = 3600 * 48
+
+class LocalCache:
+    """Cache in-process dengan batas jumlah item (LRU) dan TTL per kunci.
+
+    Nilai disimpan apa adanya (tanpa serialisasi), jadi pemanggil harus
+    memperlakukan data yang dikembalikan sebagai read-only.
+    """
+
+    def __init__(self, max_items=512):
+        self.max_items = max_items
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+local_cache = LocalCache(max_items=LOCAL_CACHE_MAX_ITEMS)
+
+# Entri mode stale-while-revalidate disimpan sebagai {SWR_MARKER: fresh_until, 'data': ...}
+SWR_MARKER = '__swr_fresh_until__'
+
+def _wrap_cache_entry(data, cache_ttl, hard_ttl):
+    if hard_ttl and hard_ttl > cache_ttl:
+        return {SWR_MARKER: time.time() + cache_ttl, 'data': data}
+    return data
+
+def _unwrap_cache_entry(entry):
+    """Mengembalikan (data, is_stale) dari entri cache biasa maupun entri SWR."""
+    if isinstance(entry, dict) and SWR_MARKER in entry:
+        return entry.get('data'), entry[SWR_MARKER] <= time.time()
+    return entry, False
+
+def _store_cache_entry(cache_key, data, cache_ttl, hard_ttl=None, local_ttl=None):
+    redis_client = get_redis_client()
+    if not data:
+        return
+
+    expire_ttl = hard_ttl if hard_ttl and hard_ttl > cache_ttl else cache_ttl
+    if local_ttl is None:
+        local_ttl = min(cache_ttl, LOCAL_CACHE_TTL)
+
+    entry = _wrap_cache_entry(data, cache_ttl, hard_ttl)
+    local_cache.set(cache_key, entry, min(local_ttl, expire_ttl))
 
-def get_data_with_cache(cache_key, fetch_func, cache_ttl=300):
     if redis_client:
+        try:
+            redis_client.set(cache_key, json.dumps(entry), ex=expire_ttl)
+        except Exception:
+            pass
+
+def get_data_with_cache(cache_key, fetch_func, cache_ttl=300, local_ttl=None, hard_ttl=None, force_refresh=False):
+    """
+    Cache dua tingkat: L1 in-process (LocalCache) lalu L2 Redis.
+    TTL L1 dibatasi LOCAL_CACHE_TTL agar perubahan dari instance lain tetap
+    terlihat dalam waktu singkat.
+
+    Jika hard_ttl > cache_ttl, mode stale-while-revalidate aktif: setelah
+    cache_ttl (soft TTL) data lama tetap dikembalikan sampai hard_ttl, sementara
+    satu refresh berjalan di background.
+
+    force_refresh=True melewati cache dan selalu menjalankan fetch_func secara
+    sinkron (dipakai job prewarm).
+    """
+    redis_client = get_redis_client()
+    if local_ttl is None:
+        local_ttl = min(cache_ttl, LOCAL_CACHE_TTL)
+
+    entry = None if force_refresh else local_cache.get(cache_key)
+
+    if entry is None and redis_client and not force_refresh:
         cached_data = redis_client.get(cache_key)
         if cached_data:
             try:
-                return json.loads(cached_data)
+                entry = json.loads(cached_data)
+                local_cache.set(cache_key, entry, local_ttl)
             except (json.JSONDecodeError, TypeError):
                 if redis_client:
                     redis_client.delete(cache_key)
+
+    if entry is not None:
+        data, is_stale = _unwrap_cache_entry(entry)
+        if data:
+            if is_stale:
+                refresh_in_background(cache_key, lambda: _store_cache_entry(
+                    cache_key, fetch_func(), cache_ttl, hard_ttl, local_ttl
+                ))
+            return data
     
     data = fetch_func()
-    
-    if redis_client and data:
+    _store_cache_entry(cache_key, data, cache_ttl, hard_ttl, local_ttl)
+        
+    return data
+
+def get_cached_many(cache_keys, local_ttl=LOCAL_CACHE_TTL, stale_keys=None):
+    """
+    Mengambil banyak kunci sekaligus (L1 lalu satu MGET ke Redis).
+    Mengembalikan dict {cache_key: data} hanya untuk kunci yang ditemukan.
+    Jika `stale_keys` (set) diberikan, kunci yang sudah lewat soft TTL
+    ditambahkan ke set tersebut.
+    """
+    redis_client = get_redis_client()
+    entries = {}
+    missing = []
+    for key in cache_keys:
+        entry = local_cache.get(key)
+        if entry is not None:
+            entries[key] = entry
+        else:
+            missing.append(key)
+
+    if redis_client and missing:
+        try:
+            raw_values = redis_client.mget(missing)
+        except Exception:
+            raw_values = []
+
+        for key, raw in zip(missing, raw_values):
+            if not raw:
+                continue
+            try:
+                entry = json.loads(raw)
+            except (json.JSONDecodeError, TypeError):
+                continue
+            entries[key] = entry
+            local_cache.set(key, entry, local_ttl)
+
+    found = {}
+    for key, entry in entries.items():
+        data, is_stale = _unwrap_cache_entry(entry)
+        if data is None:
+            continue
+        found[key] = data
+        if is_stale and stale_keys is not None:
+            stale_keys.add(key)
+
+    return found
+
+def set_cached_many(data_map, cache_ttl=300, local_ttl=None, hard_ttl=None):
+    """Menyimpan banyak kunci sekaligus ke L1 dan Redis (satu pipeline)."""
+    redis_client = get_redis_client()
+    if local_ttl is None:
+        local_ttl = min(cache_ttl, LOCAL_CACHE_TTL)
+    expire_ttl = hard_ttl if hard_ttl and hard_ttl > cache_ttl else cache_ttl
+
+    entries = {
+        key: _wrap_cache_entry(data, cache_ttl, hard_ttl)
+        for key, data in data_map.items() if data
+    }
+
+    for key, entry in entries.items():
+        local_cache.set(key, entry, min(local_ttl, expire_ttl))
+
+    if redis_client and entries:
         try:
-            redis_client.set(cache_key, json.dumps(data), ex=cache_ttl) 
+            pipe = redis_client.pipeline(transaction=False)
+            for key, entry in entries.items():
+                pipe.set(key, json.dumps(entry), ex=expire_ttl)
+            pipe.execute()
         except Exception:
             pass
-        
-    return data
+
+# --- SINGLE-FLIGHT (PENGGABUNGAN FETCH IDENTIK) ---
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+def _release_redis_lock(lock_key, token):
+    """Melepas lock hanya jika masih dipegang oleh token ini."""
+    redis_client = get_redis_client()
+    try:
+        redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+    except Exception:
+        try:
+            if redis_client.get(lock_key) == token:
+                redis_client.delete(lock_key)
+        except Exception:
+            pass
+
+class _InflightCall:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+_inflight_lock = threading.Lock()
+_inflight_calls = {}
+
+def single_flight(flight_key, fetch_func, lock_ttl=SINGLE_FLIGHT_LOCK_TTL,
+                  wait_timeout=SINGLE_FLIGHT_WAIT_TIMEOUT, result_ttl=None):
+    """
+    Menjalankan fetch_func satu kali untuk flight_key yang sama.
+
+    Di dalam satu proses, thread lain dengan kunci yang sama menunggu hasil
+    thread pertama. Antar instance, hanya pemegang lock Redis yang melakukan
+    fetch; instance lain menunggu hasilnya di kunci hasil Redis. Jika menunggu
+    melewati wait_timeout, pemanggil melakukan fetch sendiri.
+    """
+    with _inflight_lock:
+        call = _inflight_calls.get(flight_key)
+        is_leader = call is None
+        if is_leader:
+            call = _InflightCall()
+            _inflight_calls[flight_key] = call
+
+    if not is_leader:
+        if call.event.wait(wait_timeout):
+            if call.error is not None:
+                raise call.error
+            return call.result
+        return fetch_func()
+
+    try:
+        call.result = _single_flight_redis(
+            flight_key, fetch_func, lock_ttl, wait_timeout,
+            result_ttl if result_ttl is not None else lock_ttl
+        )
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight_calls.pop(flight_key, None)
+        call.event.set()
+
+def _single_flight_redis(flight_key, fetch_func, lock_ttl, wait_timeout, result_ttl):
+    redis_client = get_redis_client()
+    if not redis_client:
+        return fetch_func()
+
+    lock_key = f"lock:{flight_key}"
+    result_key = f"flight:{flight_key}"
+    token = uuid.uuid4().hex
+
+    try:
+        acquired = redis_client.set(lock_key, token, nx=True, px=int(lock_ttl * 1000))
+    except Exception:
+        return fetch_func()
+
+    if acquired:
+        try:
+            result = fetch_func()
+            try:
+                redis_client.set(result_key, json.dumps(result), ex=result_ttl)
+            except Exception:
+                pass
+            return result
+        finally:
+            _release_redis_lock(lock_key, token)
+
+    # Instance lain sedang fetch: tunggu hasilnya dengan polling bertahap
+    deadline = time.monotonic() + wait_timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        try:
+            cached_result = redis_client.get(result_key)
+            if cached_result:
+                return json.loads(cached_result)
+            if not redis_client.exists(lock_key):
+                # Pemegang lock selesai/gagal tanpa menyimpan hasil
+                break
+        except (redis.RedisError, json.JSONDecodeError, TypeError):
+            break
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+    return fetch_func()
+
+# --- REFRESH BACKGROUND (STALE-WHILE-REVALIDATE) ---
+
+_refresh_lock = threading.Lock()
+_refreshing_keys = set()
+
+def refresh_in_background(refresh_key, refresh_func, lock_ttl=SINGLE_FLIGHT_LOCK_TTL):
+    """
+    Menjalankan refresh_func di thread background, maksimal satu refresh per
+    refresh_key di seluruh instance (set lokal + lock Redis NX).
+    App context Flask ikut dibawa agar query database tetap berjalan.
+    Jika SWR_REFRESH_MODE = 'defer' (serverless) tidak ada refresh sama sekali: data
+    lama di-refresh oleh cron prewarm atau setelah hard TTL habis. Error refresh selalu
+    ditelan: data lama tetap dipakai.
+    """
+    if SWR_REFRESH_MODE == 'defer':
+        return False
+
+    with _refresh_lock:
+        if refresh_key in _refreshing_keys:
+            return False
+        _refreshing_keys.add(refresh_key)
+
+    app = current_app._get_current_object() if has_app_context() else None
+
+    def _run():
+        redis_client = get_redis_client()
+        lock_key = f"refresh:{refresh_key}"
+        token = uuid.uuid4().hex
+        acquired = True
+        try:
+            if redis_client:
+                try:
+                    acquired = redis_client.set(lock_key, token, nx=True, px=int(lock_ttl * 1000))
+                except Exception:
+                    acquired = True
+            if not acquired:
+                return
+
+            if app is not None:
+                with app.app_context():
+                    refresh_func()
+            else:
+                refresh_func()
+        except Exception:
+            pass
+        finally:
+            if redis_client and acquired:
+                _release_redis_lock(lock_key, token)
+            with _refresh_lock:
+                _refreshing_keys.discard(refresh_key)
+
+    threading.Thread(target=_run, daemon=True).start()
+    return True
 
 # --- FUNGSI HELPER (TTL 24 JAM) ---
 
@@ -82,7 +460,7 @@ def _fetch_livechat_leader_mapping_from_db():
 
 def get_livechat_leader_mapping():
     """Mengembalikan mapping {site_name_livechat (UPPER): leader_name}."""
-    return get_data_with_cache('config:livechat_leader_mapping', _fetch_livechat_leader_mapping_from_db, cache_ttl=CACHE_TTL_24_JAM) 
+    return get_data_with_cache('config:livechat_leader_mapping', _fetch_livechat_leader_mapping_from_db, cache_ttl=CACHE_TTL_24_JAM, hard_ttl=CACHE_TTL_48_JAM) 
 
 ## FUNGSI BARU UNTUK KESALAHAN
 def _fetch_kesalahan_leader_mapping_from_db():
@@ -96,7 +474,7 @@ def _fetch_kesalahan_leader_mapping_from_db():
 
 def get_kesalahan_leader_mapping():
     """Mengembalikan mapping {site_name_kesalahan (UPPER): leader_name}."""
-    return get_data_with_cache('config:kesalahan_leader_mapping', _fetch_kesalahan_leader_mapping_from_db, cache_ttl=CACHE_TTL_24_JAM) 
+    return get_data_with_cache('config:kesalahan_leader_mapping', _fetch_kesalahan_leader_mapping_from_db, cache_ttl=CACHE_TTL_24_JAM, hard_ttl=CACHE_TTL_48_JAM) 
 
 
 # NOTE: Fungsi sebelumnya 'get_leader_mapping' dihapus/diganti dengan yang lebih spesifik.
@@ -109,7 +487,7 @@ def _fetch_special_sheets_from_db():
         return {}
 
 def get_special_sheets():
-    return get_data_with_cache('config:special_sheets', _fetch_special_sheets_from_db, cache_ttl=CACHE_TTL_24_JAM)
+    return get_data_with_cache('config:special_sheets', _fetch_special_sheets_from_db, cache_ttl=CACHE_TTL_24_JAM, hard_ttl=CACHE_TTL_48_JAM)
 
 
 def _fetch_global_config_from_db():
@@ -128,16 +506,48 @@ def _fetch_global_config_from_db():
         return {}
         
 def get_global_config():
-    return get_data_with_cache('config:global_config', _fetch_global_config_from_db, cache_ttl=CACHE_TTL_24_JAM)
+    return get_data_with_cache('config:global_config', _fetch_global_config_from_db, cache_ttl=CACHE_TTL_24_JAM, hard_ttl=CACHE_TTL_48_JAM)
+
+
+def _fetch_frozen_aggregates_from_db(source):
+    try:
+        results = MonthlyAggregate.query.filter_by(source=source, is_frozen=True).all()
+        aggregates = {}
+        for item in results:
+            aggregates.setdefault(item.site_name, {})[item.month_key] = json.loads(item.data)
+        version = max((item.refreshed_at.isoformat() for item in results), default='')
+        # Dibungkus agar hasil kosong (belum ada bulan beku) tetap tersimpan di cache
+        return {'aggregates': aggregates, 'version': version}
+    except Exception:
+        return {}
+
+def _get_frozen_aggregates_entry(source):
+    return get_data_with_cache(
+        f'aggregates:{source}', lambda: _fetch_frozen_aggregates_from_db(source),
+        cache_ttl=CACHE_TTL_24_JAM, hard_ttl=CACHE_TTL_48_JAM
+    ) or {}
+
+def get_frozen_aggregates(source):
+    """Mengembalikan {site_name: {month_key: data}} untuk bulan yang sudah dibekukan."""
+    return _get_frozen_aggregates_entry(source).get('aggregates', {})
+
+def get_frozen_aggregates_version(source):
+    """Waktu refresh terakhir bulan beku (string ISO), untuk kunci cache turunan."""
+    return _get_frozen_aggregates_entry(source).get('version', '')
 
 
 # --- FUNGSI UPDATE/HAPUS ---
 
 def _clear_cache(keys):
+    redis_client = get_redis_client()
+    if isinstance(keys, str):
+        keys = [keys]
+
+    # Selalu bersihkan L1 lokal, meskipun Redis tidak tersedia
+    local_cache.delete(*keys)
+
     if redis_client:
         try:
-            if isinstance(keys, str):
-                keys = [keys]
             redis_client.delete(*keys)
         except Exception:
             pass
@@ -239,4 +649,31 @@ def delete_special_sheet(sheet_id):
         return False
     except Exception:
         db.session.rollback()
-        return False
\ No newline at end of file
+        return False
+
+def save_monthly_aggregates(source, aggregates):
+    """
+    Upsert agregat bulanan. `aggregates` berisi tuple (month_key, site_name, data, is_frozen).
+    Cache bulan beku untuk source ini dihapus setelah commit.
+    """
+    try:
+        existing = {
+            (item.month_key, item.site_name): item
+            for item in MonthlyAggregate.query.filter_by(source=source).all()
+        }
+        now = datetime.utcnow()
+        for month_key, site_name, data, is_frozen in aggregates:
+            item = existing.get((month_key, site_name))
+            if item is None:
+                item = MonthlyAggregate(source=source, month_key=month_key, site_name=site_name)
+                db.session.add(item)
+            item.data = json.dumps(data)
+            item.is_frozen = bool(is_frozen)
+            item.refreshed_at = now
+
+        db.session.commit()
+        _clear_cache(f'aggregates:{source}')
+        return True
+    except Exception:
+        db.session.rollback()
+        return False
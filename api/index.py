@@ -1,6 +1,6 @@
 # api/index.py
 
-from .app import app, SHEETS_SERVICE
+from .app import app, get_sheets_service
 
 # PENTING: Import routes agar terdaftar di instance 'app'
 from . import routes 
@@ -9,7 +9,7 @@ from . import routes
 if __name__ == '__main__':
     # Di lingkungan produksi, Anda akan menggunakan WSGI seperti Gunicorn, 
     # tetapi untuk pengembangan, app.run sudah cukup.
-    if SHEETS_SERVICE is not None:
+    if get_sheets_service() is not None:
         try:
             app.run(debug=True)
         except Exception:
@@ -0,0 +1,170 @@
+# api/monthly_aggregates.py
+
+"""
+Job refresh agregat bulanan (tabel monthly_aggregate).
+
+    python -m api.monthly_aggregates [--force]
+
+Di Vercel dijalankan harian oleh cron /cron/monthly-aggregates (vercel.json).
+
+Untuk setiap bulan yang sudah lewat, rekap dihitung sekali dari sel mentah lalu
+disimpan: per situs Livechat per bulan pembatas (total per staff) dan per sheet
+bulanan Kesalahan (rekap per staff tanpa rincian tanggal). Bulan ditandai beku
+setelah awal bulan berikutnya + MONTHLY_AGGREGATE_FREEZE_DAYS; route ringkasan
+membaca bulan beku dari tabel ini dan hanya menghitung bulan berjalan secara live.
+Bulan yang sudah beku dilewati kecuali dengan --force.
+"""
+
+import argparse
+import re
+from datetime import datetime, timedelta
+
+from .config import MONTHLY_AGGREGATE_FREEZE_DAYS
+from .app import (
+    app, ensure_database, get_sheets_service, get_kesalahan_sheets_service,
+    get_livechat_settings
+)
+from .database import get_livechat_leader_mapping, get_frozen_aggregates, save_monthly_aggregates
+from .sheets_api import get_batch_sheet_data, limit_range_columns
+from .utils import get_all_sheet_names
+from .routes_livechat import (
+    get_site_month_index, filter_kesalahan_by_month, staff_total_partials, month_key_to_str
+)
+from .routes_kesalahan import _get_global_kesalahan_ranges, _load_kesalahan_sheets, _process_kesalahan_sheet
+
+# Singkatan bulan pada nama sheet Kesalahan ('NOV25', 'OKT25', 'MEI25', ...)
+MONTH_ABBREVIATIONS = {
+    'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'MEI': 5, 'JUN': 6, 'JUL': 7,
+    'AUG': 8, 'AGU': 8, 'AGS': 8, 'SEP': 9, 'OCT': 10, 'OKT': 10, 'NOV': 11, 'DEC': 12, 'DES': 12,
+}
+_MONTH_SHEET_PATTERN = re.compile(r'^([A-Z]{3})(\d{2})$')
+
+
+def parse_month_sheet_name(sheet_name):
+    """'NOV25' -> (2025, 11); None jika bukan nama sheet bulanan."""
+    match = _MONTH_SHEET_PATTERN.match(sheet_name.strip().upper())
+    if not match or match.group(1) not in MONTH_ABBREVIATIONS:
+        return None
+    return 2000 + int(match.group(2)), MONTH_ABBREVIATIONS[match.group(1)]
+
+
+def is_month_closed(month_key, now=None):
+    """Bulan (tahun, bulan) beku jika sekarang >= awal bulan berikutnya + masa tenggang."""
+    now = now or datetime.now()
+    year, month = month_key
+    next_month_start = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return now >= next_month_start + timedelta(days=MONTHLY_AGGREGATE_FREEZE_DAYS)
+
+
+def refresh_livechat_aggregates(force=False, now=None):
+    """Menyimpan total per staff per bulan pembatas (selain bulan terbaru) untuk setiap situs."""
+    sheets_service = get_sheets_service()
+    if sheets_service is None:
+        return 0
+
+    livechat_spreadsheet_id, livechat_range_kesalahan, livechat_range_staff = get_livechat_settings()
+    # Perhitungan staff hanya membaca kolom pertama (nama staff), kolom lain tidak perlu diambil
+    livechat_range_staff = limit_range_columns(livechat_range_staff, 1)
+    sheet_names_livechat, _, sheet_khusus = get_all_sheet_names()
+    leader_sites = {k.upper() for k in get_livechat_leader_mapping()}
+
+    # Pemilihan situs sama seperti show_summary_livechat
+    sites = sorted({name.upper() for name in sheet_names_livechat if name not in sheet_khusus and name.upper() in leader_sites})
+    if not sites:
+        return 0
+
+    ranges = (
+        [f"'{site}'!{livechat_range_kesalahan}" for site in sites] +
+        [f"'{site}'!{livechat_range_staff}" for site in sites]
+    )
+    batch_results = get_batch_sheet_data(
+        sheets_service, ranges, livechat_spreadsheet_id, append_only_ranges=ranges[:len(sites)]
+    )
+    frozen = {} if force else get_frozen_aggregates('livechat')
+
+    aggregates = []
+    for i, site in enumerate(sites):
+        kesalahan_values = batch_results[i].get('values', [])
+        staff_values = batch_results[i + len(sites)].get('values', [])
+        staff_list = [row for row in staff_values[1:] if row and row[0].strip()]
+        if not kesalahan_values or not staff_list:
+            continue
+
+        rows, month_index = get_site_month_index(batch_results[i])
+        # Bulan pembatas terbaru masih terbuka (batas akhirnya belum ada)
+        for month_key in month_index['sorted_months'][1:]:
+            month_str = month_key_to_str(month_key)
+            if month_str in frozen.get(site, {}):
+                continue
+
+            partials = staff_total_partials(filter_kesalahan_by_month(rows, month_str, month_index), staff_list)
+            partials = {key: partial for key, partial in partials.items() if partial['total'] or partial['notes']}
+            aggregates.append((month_str, site, partials, is_month_closed(month_key, now)))
+
+    if aggregates and not save_monthly_aggregates('livechat', aggregates):
+        raise RuntimeError("Gagal menyimpan agregat bulanan Livechat.")
+    return len(aggregates)
+
+
+def refresh_kesalahan_aggregates(force=False, now=None):
+    """Menyimpan rekap per staff (tanpa rincian tanggal) untuk setiap sheet bulanan yang sudah lewat."""
+    if get_kesalahan_sheets_service() is None:
+        return 0
+
+    now = now or datetime.now()
+    range_data_kesalahan = _get_global_kesalahan_ranges()[0] or 'A2:BP'
+    _, kesalahan_sheet_names, _ = get_all_sheet_names()
+    frozen = {} if force else get_frozen_aggregates('kesalahan').get('', {})
+
+    month_sheets = {}
+    for sheet_name in kesalahan_sheet_names:
+        month_key = parse_month_sheet_name(sheet_name)
+        if month_key and month_key < (now.year, now.month) and sheet_name not in frozen:
+            month_sheets[sheet_name] = month_key
+    if not month_sheets:
+        return 0
+
+    raw_data_per_sheet = _load_kesalahan_sheets(list(month_sheets), range_data_kesalahan)
+    aggregates = []
+    for sheet_name, month_key in month_sheets.items():
+        _, _, rekap_per_staf = _process_kesalahan_sheet(
+            sheet_name, range_data_kesalahan, is_staff_sheet=True,
+            raw_data=raw_data_per_sheet.get(sheet_name, []), include_details=False
+        )
+        aggregates.append((sheet_name, '', rekap_per_staf, is_month_closed(month_key, now)))
+
+    if not save_monthly_aggregates('kesalahan', aggregates):
+        raise RuntimeError("Gagal menyimpan agregat bulanan Kesalahan.")
+    return len(aggregates)
+
+
+def refresh_monthly_aggregates(force=False):
+    """Menjalankan refresh Livechat dan Kesalahan. Mengembalikan jumlah baris yang disimpan per sumber."""
+    with app.app_context():
+        ensure_database()
+        return {
+            'livechat': refresh_livechat_aggregates(force),
+            'kesalahan': refresh_kesalahan_aggregates(force),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh agregat bulanan (monthly_aggregate).")
+    parser.add_argument('--force', action='store_true', help="Hitung ulang juga bulan yang sudah beku")
+    args = parser.parse_args(argv)
+
+    print("Memulai refresh agregat bulanan...")
+    try:
+        counts = refresh_monthly_aggregates(force=args.force)
+    except Exception as e:
+        print(f"\n❌ Refresh agregat gagal: {e}")
+        return 1
+
+    for source, count in counts.items():
+        print(f" 🔄 {source}: {count} bulan disimpan")
+    print("\n✅ Refresh agregat bulanan selesai!")
+    return 0
+
+
+if __name__ == '__main__':
+    main()
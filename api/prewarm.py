@@ -0,0 +1,176 @@
+# api/prewarm.py
+
+"""
+Job prewarm cache Sheets.
+
+    python -m api.prewarm [--source livechat|kesalahan]
+
+Dijalankan terjadwal (Vercel cron memanggil /cron/prewarm?source=...) supaya request
+pengguna hampir selalu mendapat cache yang masih segar. Per sumber: direktori sheet,
+lalu untuk Livechat nilai mentah semua situs yang punya leader (plus sheet khusus) dan
+ringkasan jadi (default dan 'all'), untuk Kesalahan nilai mentah sheet non-bulan dan
+sheet bulan yang belum beku (bulan berjalan, dan bulan lalu selama MONTHLY_AGGREGATE_FREEZE_DAYS).
+Nilai diambil per spreadsheet dalam satu batchGet (tetap lewat probe dan fetch ekor)
+agar kuota baca tidak habis; waktu dicatat per langkah beserta daftar sheet-nya.
+
+Setiap sumber dijalankan cron terpisah agar satu invocation tetap pendek, dan langkah
+yang belum mulai dilewati setelah PREWARM_TIME_BUDGET detik. Jadwal per 5 menit di
+vercel.json butuh paket Vercel Pro (Hobby hanya mengizinkan cron harian).
+"""
+
+import argparse
+import time
+
+from .config import PREWARM_TIME_BUDGET, KESALAHAN_APPEND_ONLY_SHEETS
+from .app import (
+    app, get_sheets_service, get_kesalahan_sheets_service,
+    get_livechat_settings, get_kesalahan_settings
+)
+from .database import get_livechat_leader_mapping, get_frozen_aggregates
+from .sheets_api import get_sheet_directory, get_batch_sheet_data, limit_range_columns
+from .utils import get_all_sheet_names
+from .routes_livechat import get_livechat_summary_ranges, get_livechat_summary
+from .routes_kesalahan import _get_global_kesalahan_ranges
+from .monthly_aggregates import parse_month_sheet_name, is_month_closed
+
+# Filter ringkasan Livechat yang dihitung ulang (None = bulan terbaru, URL default)
+LIVECHAT_SUMMARY_FILTERS = [None, 'all']
+KESALAHAN_NON_MONTH_SHEETS = ['FATAL!!!', 'KETENTUAN']
+PREWARM_SOURCES = ['livechat', 'kesalahan']
+
+
+def _timed_step(report, step, sheets, func, deadline):
+    """Menjalankan satu langkah prewarm; error dicatat di report tanpa menghentikan langkah lain."""
+    entry = {'step': step, 'sheets': list(sheets), 'ok': True, 'error': None}
+    started = time.perf_counter()
+    if time.monotonic() >= deadline:
+        entry.update(ok=False, error="Dilewati: batas waktu prewarm (PREWARM_TIME_BUDGET) habis.", seconds=0)
+        report.append(entry)
+        return False
+    try:
+        func()
+    except Exception as e:
+        entry['ok'] = False
+        entry['error'] = str(e)
+    entry['seconds'] = round(time.perf_counter() - started, 3)
+    report.append(entry)
+    return entry['ok']
+
+
+def _prewarm_livechat(report, deadline):
+    sheets_service = get_sheets_service()
+    if sheets_service is None:
+        raise RuntimeError("Google Sheets API Service untuk Livechat tidak tersedia.")
+    livechat_spreadsheet_id, livechat_range_kesalahan, livechat_range_staff = get_livechat_settings()
+
+    if not _timed_step(report, 'directory:livechat', [], lambda: get_sheet_directory(
+        sheets_service, livechat_spreadsheet_id, force_refresh=True
+    ), deadline):
+        return
+    # Direktori baru saja di-refresh, jadi daftar nama sheet sudah terbaru
+    sheet_names_livechat, _, sheet_khusus = get_all_sheet_names()
+
+    # Range staff sama dengan yang dipakai route (hanya kolom nama staff)
+    livechat_range_staff = limit_range_columns(livechat_range_staff, 1)
+    leader_mapping = get_livechat_leader_mapping()
+
+    sites, combined_ranges = get_livechat_summary_ranges(
+        sheet_names_livechat, sheet_khusus, leader_mapping,
+        livechat_range_kesalahan, livechat_range_staff
+    )
+    special_ranges = [f"'{name}'!{range_name}" for name, range_name in sheet_khusus.items()]
+
+    _timed_step(report, 'values:livechat', sites + list(sheet_khusus), lambda: get_batch_sheet_data(
+        sheets_service, combined_ranges + special_ranges, livechat_spreadsheet_id,
+        append_only_ranges=combined_ranges[:len(sites)], force_refresh=True
+    ), deadline)
+
+    for month_filter in LIVECHAT_SUMMARY_FILTERS:
+        _timed_step(report, f"summary:livechat:{month_filter or 'default'}", sites, lambda month_filter=month_filter: get_livechat_summary(
+            sheets_service, livechat_spreadsheet_id, sites,
+            combined_ranges, leader_mapping, month_filter, force_refresh=True
+        ), deadline)
+
+
+def _prewarm_kesalahan(report, deadline):
+    kesalahan_sheets_service = get_kesalahan_sheets_service()
+    if kesalahan_sheets_service is None:
+        raise RuntimeError("Google Sheets API Service untuk Kesalahan tidak tersedia.")
+    kesalahan_spreadsheet_id, _, _ = get_kesalahan_settings()
+    range_staff, range_fatal = _get_global_kesalahan_ranges()
+
+    if not _timed_step(report, 'directory:kesalahan', [], lambda: get_sheet_directory(
+        kesalahan_sheets_service, kesalahan_spreadsheet_id, force_refresh=True
+    ), deadline):
+        return
+    _, kesalahan_sheet_names, _ = get_all_sheet_names()
+
+    # Sheet bulan yang sudah beku (MonthlyAggregate) atau sudah lewat masa tenggang tidak
+    # berubah lagi, jadi tidak dibaca ulang setiap cron; sheet non-bulan (FATAL!!!) tetap
+    frozen_sheets = get_frozen_aggregates('kesalahan').get('', {})
+    live_sheet_names = []
+    for name in kesalahan_sheet_names:
+        month_key = parse_month_sheet_name(name)
+        if month_key and (name in frozen_sheets or is_month_closed(month_key)):
+            continue
+        live_sheet_names.append(name)
+    if not live_sheet_names:
+        return
+
+    # Range sama dengan route /kesalahan-summary dan /kesalahan/<sheet_name>
+    ranges = [
+        f"'{name}'!{(range_fatal or 'A:Z') if name.upper() in KESALAHAN_NON_MONTH_SHEETS else (range_staff or 'A2:BP')}"
+        for name in live_sheet_names
+    ]
+
+    probe_ranges = [
+        range_name for name, range_name in zip(live_sheet_names, ranges)
+        if name.upper() in KESALAHAN_APPEND_ONLY_SHEETS
+    ]
+
+    _timed_step(report, 'values:kesalahan', live_sheet_names, lambda: get_batch_sheet_data(
+        kesalahan_sheets_service, ranges, kesalahan_spreadsheet_id, force_refresh=True, probe_ranges=probe_ranges
+    ), deadline)
+
+
+def prewarm_caches(sources=PREWARM_SOURCES, time_budget=PREWARM_TIME_BUDGET):
+    """
+    Me-refresh cache Sheets untuk sumber yang diminta ('livechat', 'kesalahan') secara
+    sinkron. Mengembalikan daftar langkah [{step, sheets, ok, error, seconds}].
+    """
+    prewarm_steps = {'livechat': _prewarm_livechat, 'kesalahan': _prewarm_kesalahan}
+    deadline = time.monotonic() + time_budget
+    report = []
+    with app.app_context():
+        for source in sources:
+            try:
+                prewarm_steps[source](report, deadline)
+            except Exception as e:
+                report.append({'step': source, 'sheets': [], 'ok': False, 'error': str(e), 'seconds': 0})
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prewarm cache Google Sheets.")
+    parser.add_argument('--source', choices=PREWARM_SOURCES, help="Hanya satu sumber (default: semua)")
+    args = parser.parse_args(argv)
+
+    print("Memulai prewarm cache Sheets...")
+    report = prewarm_caches([args.source] if args.source else PREWARM_SOURCES)
+
+    for entry in report:
+        icon = '🟢' if entry['ok'] else '❌'
+        detail = f" ({len(entry['sheets'])} sheet)" if entry['sheets'] else ''
+        print(f" {icon} {entry['step']}{detail}: {entry['seconds']:.2f} detik")
+        if entry['error']:
+            print(f"    {entry['error']}")
+
+    if all(entry['ok'] for entry in report):
+        print("\n✅ Prewarm cache selesai!")
+        return 0
+    print("\n❌ Sebagian langkah prewarm gagal.")
+    return 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
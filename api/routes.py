@@ -6,9 +6,8 @@ from flask import render_template, redirect, url_for, request, flash
 import math
 
 from .app import (
-    app, SHEETS_SERVICE, KESALAHAN_SHEETS_SERVICE,
-    LIVECHAT_SPREADSHEET_ID, LIVECHAT_RANGE_KESALAHAN, LIVECHAT_RANGE_STAFF,
-    KESALAHAN_SPREADSHEET_ID,
+    app, get_sheets_service, get_kesalahan_sheets_service,
+    get_livechat_settings, get_kesalahan_settings,
     load_global_config, init_sheets_api_service, init_kesalahan_sheets_service
 )
 from .config import SUMMARY_LIVECHAT_ROUTE, TARGET_KESALAHAN_HEADERS, KHUSUS_KESALAHAN_HEADERS 
@@ -32,5 +31,6 @@ from .filters import format_number
 from . import routes_main      # Berisi: home, show_db_config, show_summary_livechat
 from . import routes_livechat  # Berisi: show_data
 from . import routes_kesalahan # Berisi: get_kesalahan_sheet_names, show_kesalahan_data
+from . import routes_cron      # Berisi: cron_prewarm (prewarm cache terjadwal)
 
 # File ini hanya bertindak sebagai pengumpul rute.
\ No newline at end of file
@@ -0,0 +1,43 @@
+# api/routes_cron.py
+
+import hmac
+from flask import request, jsonify, abort
+
+from .app import app
+from .config import CRON_SECRET
+from .prewarm import prewarm_caches, PREWARM_SOURCES
+from .monthly_aggregates import refresh_monthly_aggregates
+
+# =========================================================================
+# ROUTE CRON (VERCEL)
+# =========================================================================
+
+def _require_cron_secret():
+    # Vercel cron mengirim "Authorization: Bearer <CRON_SECRET>"
+    authorization = request.headers.get('Authorization', '')
+    if not CRON_SECRET or not hmac.compare_digest(authorization, f"Bearer {CRON_SECRET}"):
+        abort(401)
+
+@app.route('/cron/prewarm')
+def cron_prewarm():
+    _require_cron_secret()
+
+    # Satu sumber per invocation (?source=livechat / ?source=kesalahan) agar tetap di bawah maxDuration
+    source = request.args.get('source')
+    if source is not None and source not in PREWARM_SOURCES:
+        abort(400)
+    report = prewarm_caches([source] if source else PREWARM_SOURCES)
+    ok = all(entry['ok'] for entry in report)
+    return jsonify({'ok': ok, 'steps': report}), 200 if ok else 500
+
+@app.route('/cron/monthly-aggregates')
+def cron_monthly_aggregates():
+    _require_cron_secret()
+
+    # Harian: bulan yang sudah lewat MONTHLY_AGGREGATE_FREEZE_DAYS disimpan beku,
+    # bulan lalu yang masih dalam masa tenggang disimpan ulang tanpa dibekukan
+    try:
+        counts = refresh_monthly_aggregates()
+    except Exception as e:
+        return jsonify({'ok': False, 'error': str(e)}), 500
+    return jsonify({'ok': True, 'saved': counts}), 200
@@ -2,16 +2,18 @@
 
 import re
 import datetime # Import modul datetime
+from functools import lru_cache
 from urllib.parse import unquote
 from flask import render_template, redirect, url_for, request
 from collections import defaultdict
 
-from .database import get_kesalahan_leader_mapping
+from .config import KESALAHAN_APPEND_ONLY_SHEETS
+from .database import get_kesalahan_leader_mapping, get_frozen_aggregates
 from .app import (
-    app, KESALAHAN_SHEETS_SERVICE, KESALAHAN_SPREADSHEET_ID,
+    app, get_kesalahan_sheets_service, get_kesalahan_settings,
     load_global_config
 )
-from .sheets_api import get_sheet_names, get_sheet_data
+from .sheets_api import get_sheet_names, get_sheet_data, get_batch_sheet_data, clean_sheet_values, SheetsApiError
 from .routes_main import get_all_sheet_names
 
 KESALAHAN_RANGE_STAFF = 'Bukan A2:BP'
@@ -24,22 +26,214 @@ KESALAHAN_RANGE_FATAL = 'Bukan A:Z'
 def _get_global_kesalahan_ranges():
     with app.app_context():
         load_global_config()
-        from .app import KESALAHAN_RANGE_STAFF as GLOBAL_RANGE_STAFF, KESALAHAN_RANGE_FATAL as GLOBAL_RANGE_FATAL
-        return GLOBAL_RANGE_STAFF, GLOBAL_RANGE_FATAL
+        _, global_range_staff, global_range_fatal = get_kesalahan_settings()
+        return global_range_staff, global_range_fatal
+
+def _load_kesalahan_sheets(sheet_names, range_data_kesalahan):
+    """
+    Membaca beberapa sheet bulanan sekaligus lewat satu get_batch_sheet_data
+    (dipecah otomatis jika URL terlalu panjang).
+    Mengembalikan {sheet_name: raw_data} dengan format yang sama seperti get_sheet_data.
+    """
+    kesalahan_sheets_service = get_kesalahan_sheets_service()
+    if kesalahan_sheets_service is None:
+        raise Exception("Google Sheets API Service untuk Kesalahan tidak tersedia.")
+
+    kesalahan_spreadsheet_id, _, _ = get_kesalahan_settings()
+    ranges = [f"'{sheet_name}'!{range_data_kesalahan}" for sheet_name in sheet_names]
+    # Sheet log yang hanya bertambah di bawah (FATAL!!!) dicek dengan probe sebelum diunduh ulang
+    probe_ranges = [
+        range_name for sheet_name, range_name in zip(sheet_names, ranges)
+        if sheet_name.upper() in KESALAHAN_APPEND_ONLY_SHEETS
+    ]
+    value_ranges = get_batch_sheet_data(
+        kesalahan_sheets_service, ranges, kesalahan_spreadsheet_id, probe_ranges=probe_ranges
+    )
+
+    return {
+        sheet_name: clean_sheet_values(value_range.get('values', []))
+        for sheet_name, value_range in zip(sheet_names, value_ranges)
+    }
+
+START_COL_INDEX = 4
+_NUMBER_CELL_PATTERN = re.compile(r'^\d+(\.\d+)?$')
+
+@lru_cache(maxsize=4096)
+def _number_cell_value(cell_value):
+    """Nilai sel kesalahan: angka '123' / '1.5' (setelah strip) yang > 0, selain itu 0.0."""
+    cell_value = cell_value.strip() if cell_value is not None else ''
+    if _NUMBER_CELL_PATTERN.match(cell_value):
+        jumlah_kesalahan = float(cell_value)
+        if jumlah_kesalahan > 0:
+            return jumlah_kesalahan
+    return 0.0
+
+def _new_rekap_entry(row):
+    return {
+        'passport': row[0].strip() if len(row) > 0 and row[0] is not None else '',
+        'nama': row[1].strip() if len(row) > 1 and row[1] is not None else '',
+        'status': row[2].strip() if len(row) > 2 and row[2] is not None else '',
+        'situs': row[3].strip() if len(row) > 3 and row[3] is not None else '',
+        'total_kesalahan': 0.0,
+        'total_kesalahan_dp': 0.0,
+        'total_kesalahan_wd': 0.0,
+        'point_dp': 0.0,
+        'point_wd': 0.0,
+        'point_total': 0.0,
+        'details_per_date': []
+    }
+
+def _staff_rekap_key(row):
+    """Kunci rekap (nama UPPER) atau None jika baris bukan baris staff."""
+    if len(row) < START_COL_INDEX or not (row[1].strip() if len(row) > 1 and row[1] is not None else ''):
+        return None
+    rekap_key = row[1].strip().upper()
+    if not rekap_key or rekap_key in ['TOTAL']:
+        return None
+    return rekap_key
+
+def _detail_entry(sheet_name, tanggal, jenis_kesalahan, jumlah_kesalahan):
+    point_dp_detail = jumlah_kesalahan * 0.25 if jenis_kesalahan == 'DP' else 0.0
+    point_wd_detail = jumlah_kesalahan * 1.0 if jenis_kesalahan == 'WD' else 0.0
+    return {
+        'bulan': sheet_name,
+        'tanggal': tanggal,
+        'tipe': jenis_kesalahan,
+        'jumlah': jumlah_kesalahan,
+        'point_dp': round(point_dp_detail, 2),
+        'point_wd': round(point_wd_detail, 2)
+    }
+
+def _rekap_staff_grid_python(sheet_name, kesalahan_data, date_mapping, column_types, include_details):
+    """Parser sel per sel (fallback jika NumPy tidak tersedia)."""
+    rekap_per_staf = {}
+
+    for row in kesalahan_data:
+        rekap_key = _staff_rekap_key(row)
+        if rekap_key is None:
+            continue
+
+        if rekap_key not in rekap_per_staf:
+            rekap_per_staf[rekap_key] = _new_rekap_entry(row)
+        rekap = rekap_per_staf[rekap_key]
+
+        for i in range(START_COL_INDEX, min(len(row), len(column_types))):
+            jumlah_kesalahan = _number_cell_value(row[i])
+            
+            if jumlah_kesalahan > 0:
+                jenis_kesalahan = column_types[i]
+                
+                rekap['total_kesalahan'] += jumlah_kesalahan
+                if jenis_kesalahan == 'DP':
+                    rekap['total_kesalahan_dp'] += jumlah_kesalahan
+                elif jenis_kesalahan == 'WD':
+                    rekap['total_kesalahan_wd'] += jumlah_kesalahan
+
+                if include_details:
+                    rekap['details_per_date'].append(
+                        _detail_entry(sheet_name, date_mapping.get(i, 'N/A'), jenis_kesalahan, jumlah_kesalahan)
+                    )
+
+    return rekap_per_staf
+
+@lru_cache(maxsize=None)
+def _load_numpy():
+    """
+    NumPy opsional (tidak ada di requirements.txt agar bundle serverless tetap kecil),
+    diimpor saat sheet staff pertama diproses (bukan saat route diimpor pada cold start).
+    None jika tidak terpasang: dipakai parser Python murni dengan hasil yang sama.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def _rekap_staff_grid_numpy(sheet_name, kesalahan_data, date_mapping, column_types, include_details):
+    """
+    Parser kolumnar: area angka (kolom E sampai akhir header baris 2) dimuat sekali
+    ke array 2-D, lalu total, DP/WD, dan detail dihitung dengan operasi array.
+    """
+    np = _load_numpy()
+    staff_rows = []
+    staff_keys = []
+    for row in kesalahan_data:
+        rekap_key = _staff_rekap_key(row)
+        if rekap_key is not None:
+            staff_rows.append(row)
+            staff_keys.append(rekap_key)
+
+    rekap_per_staf = {}
+    num_columns = len(column_types) - START_COL_INDEX
+    if not staff_rows or num_columns <= 0:
+        for row, rekap_key in zip(staff_rows, staff_keys):
+            rekap_per_staf.setdefault(rekap_key, _new_rekap_entry(row))
+        return rekap_per_staf
+
+    grid = np.array(
+        [
+            row[START_COL_INDEX:len(column_types)] + [''] * (len(column_types) - max(len(row), START_COL_INDEX))
+            for row in staff_rows
+        ],
+        dtype=object
+    ).reshape(len(staff_rows), num_columns)
+
+    # Sebagian besar sel kosong: hanya sel berisi yang diparse (dengan memo per teks sel)
+    values = np.zeros(grid.shape, dtype=float)
+    filled = grid != ''
+    if filled.any():
+        values[filled] = np.fromiter(map(_number_cell_value, grid[filled]), dtype=float)
+
+    types = np.array(column_types[START_COL_INDEX:], dtype=str)
+    row_totals = values.sum(axis=1)
+    row_dp = values[:, types == 'DP'].sum(axis=1)
+    row_wd = values[:, types == 'WD'].sum(axis=1)
+
+    for index, (row, rekap_key) in enumerate(zip(staff_rows, staff_keys)):
+        if rekap_key not in rekap_per_staf:
+            rekap_per_staf[rekap_key] = _new_rekap_entry(row)
+        rekap = rekap_per_staf[rekap_key]
+        rekap['total_kesalahan'] += float(row_totals[index])
+        rekap['total_kesalahan_dp'] += float(row_dp[index])
+        rekap['total_kesalahan_wd'] += float(row_wd[index])
+
+    if include_details:
+        # np.nonzero mengembalikan urutan baris lalu kolom, sama dengan loop per sel
+        for row_index, column_offset in zip(*np.nonzero(values)):
+            column_index = int(column_offset) + START_COL_INDEX
+            rekap_per_staf[staff_keys[row_index]]['details_per_date'].append(
+                _detail_entry(
+                    sheet_name,
+                    date_mapping.get(column_index, 'N/A'),
+                    column_types[column_index],
+                    float(values[row_index, column_offset])
+                )
+            )
+
+    return rekap_per_staf
 
-def _process_kesalahan_sheet(sheet_name, range_data_kesalahan, is_staff_sheet):
-    if KESALAHAN_SHEETS_SERVICE is None:
+def _process_kesalahan_sheet(sheet_name, range_data_kesalahan, is_staff_sheet, raw_data=None, include_details=True):
+    """
+    Membaca satu sheet Kesalahan. Untuk sheet staff bulanan, rekap per staff dihitung
+    dengan parser NumPy jika tersedia (fallback: parser Python). `details_per_date`
+    hanya diisi jika include_details=True.
+    """
+    kesalahan_sheets_service = get_kesalahan_sheets_service()
+    if kesalahan_sheets_service is None:
         raise Exception("Google Sheets API Service untuk Kesalahan tidak tersedia.")
 
     sheet_name = unquote(sheet_name)
     
-    raw_data = get_sheet_data(
-        KESALAHAN_SHEETS_SERVICE,
-        sheet_name,
-        range_data_kesalahan,
-        expected_columns=None,
-        spreadsheet_id=KESALAHAN_SPREADSHEET_ID
-    )
+    if raw_data is None:
+        kesalahan_spreadsheet_id, _, _ = get_kesalahan_settings()
+        raw_data = get_sheet_data(
+            kesalahan_sheets_service,
+            sheet_name,
+            range_data_kesalahan,
+            expected_columns=None,
+            spreadsheet_id=kesalahan_spreadsheet_id,
+            probe=sheet_name.upper() in KESALAHAN_APPEND_ONLY_SHEETS
+        )
 
     if is_staff_sheet and len(raw_data) >= 2:
         header_row_1 = raw_data[0]
@@ -61,8 +255,6 @@ def _process_kesalahan_sheet(sheet_name, range_data_kesalahan, is_staff_sheet):
     rekap_per_staf = {}
 
     if is_staff_sheet and len(header_row_1) > 4 and len(header_row_2) > 4:
-        START_COL_INDEX = 4
-
         date_mapping = {}
         current_date = ''
         for i in range(START_COL_INDEX, len(header_row_2)):
@@ -70,66 +262,13 @@ def _process_kesalahan_sheet(sheet_name, range_data_kesalahan, is_staff_sheet):
                 current_date = header_row_1[i].strip()
             date_mapping[i] = current_date
 
-        for row in kesalahan_data:
-            if len(row) < START_COL_INDEX or not (row[1].strip() if len(row) > 1 and row[1] is not None else ''):
-                continue
-                
-            passport = row[0].strip() if len(row) > 0 and row[0] is not None else ''
-            staff_name = row[1].strip() if len(row) > 1 and row[1] is not None else ''
-            status = row[2].strip() if len(row) > 2 and row[2] is not None else ''
-            situs = row[3].strip() if len(row) > 3 and row[3] is not None else ''
-            
-            rekap_key = staff_name.upper()
+        column_types = [
+            header.strip().upper() if header is not None else ''
+            for header in header_row_2
+        ]
 
-            if not rekap_key or rekap_key in ['TOTAL']:
-                continue
-
-            if rekap_key not in rekap_per_staf:
-                rekap_per_staf[rekap_key] = {
-                    'passport': passport,
-                    'nama': staff_name,
-                    'status': status,
-                    'situs': situs,
-                    'total_kesalahan': 0.0,
-                    'total_kesalahan_dp': 0.0,
-                    'total_kesalahan_wd': 0.0,
-                    'point_dp': 0.0,
-                    'point_wd': 0.0,
-                    'point_total': 0.0,
-                    'details_per_date': []
-                }
-
-            for i in range(START_COL_INDEX, len(row)):
-                if i < len(header_row_2):
-                    jenis_kesalahan = header_row_2[i].strip().upper() if header_row_2[i] is not None else ''
-                    tanggal = date_mapping.get(i, 'N/A')
-                    
-                    cell_value = row[i].strip() if i < len(row) and row[i] is not None else ''
-                    
-                    if re.match(r'^\d+(\.\d+)?$', cell_value) and float(cell_value) > 0:
-                        jumlah_kesalahan = float(cell_value)
-                        
-                        rekap_per_staf[rekap_key]['total_kesalahan'] += jumlah_kesalahan
-                        
-                        point_dp_detail = 0.0
-                        point_wd_detail = 0.0
-                        
-                        if jenis_kesalahan == 'DP':
-                            rekap_per_staf[rekap_key]['total_kesalahan_dp'] += jumlah_kesalahan
-                            point_dp_detail = jumlah_kesalahan * 0.25
-                            
-                        elif jenis_kesalahan == 'WD':
-                            rekap_per_staf[rekap_key]['total_kesalahan_wd'] += jumlah_kesalahan
-                            point_wd_detail = jumlah_kesalahan * 1.0
-                            
-                        rekap_per_staf[rekap_key]['details_per_date'].append({
-                            'bulan': sheet_name,
-                            'tanggal': tanggal,
-                            'tipe': jenis_kesalahan,
-                            'jumlah': jumlah_kesalahan,
-                            'point_dp': round(point_dp_detail, 2),
-                            'point_wd': round(point_wd_detail, 2)
-                        })
+        rekap_staff_grid = _rekap_staff_grid_numpy if _load_numpy() is not None else _rekap_staff_grid_python
+        rekap_per_staf = rekap_staff_grid(sheet_name, kesalahan_data, date_mapping, column_types, include_details)
     
     return kesalahan_headers, kesalahan_data, rekap_per_staf
 
@@ -253,25 +392,8 @@ def _recap_per_leader(final_rekap_data, leader_mapping):
     
     return final_rekap_leader
 
-# =========================================================================
-# ROUTE KESALAHAN
-# =========================================================================
-
-@app.route('/kesalahan-summary')
-def show_kesalahan_summary():
-    KESALAHAN_RANGE_STAFF, KESALAHAN_RANGE_FATAL = _get_global_kesalahan_ranges()
-
-    if KESALAHAN_SHEETS_SERVICE is None:
-        config_url = url_for('show_db_config')
-        message = f"Gagal terhubung ke Google Sheets API untuk Kesalahan. Silakan cek ID Spreadsheet dan kredensial. <a href='{config_url}' class='font-bold underline'>Atur Konfigurasi</a>."
-        return render_template('error.html', message=message)
-    
-    sheet_names_livechat, kesalahan_sheet_names, sheet_khusus = get_all_sheet_names()
-    
-    leader_mapping = get_kesalahan_leader_mapping()
-    
-    # --- LOGIKA DEFAULT BULAN INI DIMULAI DI SINI ---
-    
+def _select_summary_months(kesalahan_sheet_names):
+    """Mengembalikan (available_months, summary_sheet_names) dari parameter ?sheets= atau default bulan ini."""
     # 1. Tentukan nama bulan saat ini (misalnya, 'NOV25')
     # Sesuaikan format ini jika sheet Anda menggunakan format tanggal yang berbeda!
     current_month_name = datetime.datetime.now().strftime('%b%y').upper()
@@ -301,15 +423,25 @@ def show_kesalahan_summary():
     if not summary_sheet_names and available_months:
         summary_sheet_names = [available_months[-1]]
 
-    # --- LOGIKA DEFAULT BULAN INI SELESAI DI SINI ---
+    return available_months, summary_sheet_names
 
-    current_sheets_title = ', '.join(summary_sheet_names)
-    if set(summary_sheet_names) == set(available_months):
-        current_sheets_title = 'Semua Bulan'
-    elif not summary_sheet_names:
-        current_sheets_title = 'Tidak Ada Bulan Dipilih'
-    
-    master_rekap_per_staf = defaultdict(lambda: {
+def _merge_monthly_rekap(master_rekap_per_staf, rekap_bulan_ini):
+    for key, data in rekap_bulan_ini.items():
+        # Pastikan data base staff tetap dari data sheet yang diproses
+        if not master_rekap_per_staf[key]['passport']:
+            master_rekap_per_staf[key]['passport'] = data['passport']
+            master_rekap_per_staf[key]['nama'] = data['nama']
+            master_rekap_per_staf[key]['status'] = data['status']
+            master_rekap_per_staf[key]['situs'] = data['situs']
+        
+        master_rekap_per_staf[key]['total_kesalahan'] += data['total_kesalahan']
+        master_rekap_per_staf[key]['total_kesalahan_dp'] += data['total_kesalahan_dp']
+        master_rekap_per_staf[key]['total_kesalahan_wd'] += data['total_kesalahan_wd']
+        
+        master_rekap_per_staf[key]['details_per_date'].extend(data['details_per_date'])
+
+def _new_master_rekap():
+    return defaultdict(lambda: {
         'passport': '', 'nama': '', 'status': '', 'situs': '',
         'total_kesalahan': 0.0, 'total_kesalahan_dp': 0.0,
         'total_kesalahan_wd': 0.0, 'point_dp': 0.0,
@@ -317,36 +449,63 @@ def show_kesalahan_summary():
         'details_per_date': []
     })
 
+# =========================================================================
+# ROUTE KESALAHAN
+# =========================================================================
+
+@app.route('/kesalahan-summary')
+def show_kesalahan_summary():
+    KESALAHAN_RANGE_STAFF, KESALAHAN_RANGE_FATAL = _get_global_kesalahan_ranges()
+
+    if get_kesalahan_sheets_service() is None:
+        config_url = url_for('show_db_config')
+        message = f"Gagal terhubung ke Google Sheets API untuk Kesalahan. Silakan cek ID Spreadsheet dan kredensial. <a href='{config_url}' class='font-bold underline'>Atur Konfigurasi</a>."
+        return render_template('error.html', message=message)
+    
+    sheet_names_livechat, kesalahan_sheet_names, sheet_khusus = get_all_sheet_names()
+    
+    leader_mapping = get_kesalahan_leader_mapping()
+    
+    available_months, summary_sheet_names = _select_summary_months(kesalahan_sheet_names)
+
+    current_sheets_title = ', '.join(summary_sheet_names)
+    if set(summary_sheet_names) == set(available_months):
+        current_sheets_title = 'Semua Bulan'
+    elif not summary_sheet_names:
+        current_sheets_title = 'Tidak Ada Bulan Dipilih'
+    
+    master_rekap_per_staf = _new_master_rekap()
+
     found_sheets = 0
     
     try:
-        for sheet_name in summary_sheet_names:
-            if sheet_name not in kesalahan_sheet_names:
-                continue
+        range_data_kesalahan = KESALAHAN_RANGE_STAFF or 'A2:BP'
+        sheets_to_load = [name for name in summary_sheet_names if name in kesalahan_sheet_names]
+
+        # Bulan yang sudah dibekukan memakai rekap dari MonthlyAggregate tanpa membaca sheet
+        frozen_rekap_per_sheet = get_frozen_aggregates('kesalahan').get('', {})
+        sheets_to_fetch = [name for name in sheets_to_load if name not in frozen_rekap_per_sheet]
+        
+        # Semua bulan terpilih dibaca dalam satu batchGet, bukan satu request per bulan
+        raw_data_per_sheet = _load_kesalahan_sheets(sheets_to_fetch, range_data_kesalahan) if sheets_to_fetch else {}
 
+        for sheet_name in sheets_to_load:
             found_sheets += 1
+
+            if sheet_name in frozen_rekap_per_sheet:
+                _merge_monthly_rekap(master_rekap_per_staf, frozen_rekap_per_sheet[sheet_name])
+                continue
             
-            range_data_kesalahan = KESALAHAN_RANGE_STAFF or 'A2:BP'
-            
+            # Ringkasan hanya menampilkan total; rincian per tanggal ada di halaman detail staff
             _, _, rekap_bulan_ini = _process_kesalahan_sheet(
                 sheet_name,
                 range_data_kesalahan,
-                is_staff_sheet=True
+                is_staff_sheet=True,
+                raw_data=raw_data_per_sheet.get(sheet_name, []),
+                include_details=False
             )
 
-            for key, data in rekap_bulan_ini.items():
-                # Pastikan data base staff tetap dari data sheet yang diproses
-                if not master_rekap_per_staf[key]['passport']:
-                    master_rekap_per_staf[key]['passport'] = data['passport']
-                    master_rekap_per_staf[key]['nama'] = data['nama']
-                    master_rekap_per_staf[key]['status'] = data['status']
-                    master_rekap_per_staf[key]['situs'] = data['situs']
-                
-                master_rekap_per_staf[key]['total_kesalahan'] += data['total_kesalahan']
-                master_rekap_per_staf[key]['total_kesalahan_dp'] += data['total_kesalahan_dp']
-                master_rekap_per_staf[key]['total_kesalahan_wd'] += data['total_kesalahan_wd']
-                
-                master_rekap_per_staf[key]['details_per_date'].extend(data['details_per_date'])
+            _merge_monthly_rekap(master_rekap_per_staf, rekap_bulan_ini)
         
         if found_sheets == 0:
             message = f"Tidak ada sheet bulanan yang ditemukan. Pastikan sheet bulanan ({', '.join(available_months)}) tersedia di Spreadsheet."
@@ -358,6 +517,9 @@ def show_kesalahan_summary():
         
         rekap_per_leader_data = _recap_per_leader(final_rekap_data, leader_mapping)
             
+    except SheetsApiError:
+        # Ditangani handler 503 di routes_main
+        raise
     except Exception as e:
         message = f"Gagal membuat ringkasan kesalahan: {e}"
         return render_template('error.html', message=message)
@@ -381,21 +543,87 @@ def show_kesalahan_summary():
                            available_months=available_months
                            )
 
+@app.route('/kesalahan-summary/staff/<path:staff_name>')
+def show_kesalahan_staff_detail(staff_name):
+    """Rincian kesalahan per tanggal untuk satu staff pada bulan yang dipilih (?sheets=)."""
+    KESALAHAN_RANGE_STAFF, KESALAHAN_RANGE_FATAL = _get_global_kesalahan_ranges()
+
+    if get_kesalahan_sheets_service() is None:
+        config_url = url_for('show_db_config')
+        message = f"Gagal terhubung ke Google Sheets API untuk Kesalahan. Silakan cek ID Spreadsheet dan kredensial. <a href='{config_url}' class='font-bold underline'>Atur Konfigurasi</a>."
+        return render_template('error.html', message=message)
+
+    staff_name = unquote(staff_name)
+    staff_key = staff_name.strip().upper()
+
+    sheet_names_livechat, kesalahan_sheet_names, sheet_khusus = get_all_sheet_names()
+    available_months, summary_sheet_names = _select_summary_months(kesalahan_sheet_names)
+
+    master_rekap_per_staf = _new_master_rekap()
+
+    try:
+        range_data_kesalahan = KESALAHAN_RANGE_STAFF or 'A2:BP'
+        sheets_to_load = [name for name in summary_sheet_names if name in kesalahan_sheet_names]
+        raw_data_per_sheet = _load_kesalahan_sheets(sheets_to_load, range_data_kesalahan) if sheets_to_load else {}
+
+        for sheet_name in sheets_to_load:
+            # Hanya dua baris header + baris staff ini yang diproses (rincian per tanggal mahal)
+            raw_data = raw_data_per_sheet.get(sheet_name, [])
+            staff_raw_data = raw_data[:2] + [row for row in raw_data[2:] if _staff_rekap_key(row) == staff_key]
+            _, _, rekap_bulan_ini = _process_kesalahan_sheet(
+                sheet_name,
+                range_data_kesalahan,
+                is_staff_sheet=True,
+                raw_data=staff_raw_data
+            )
+            if staff_key in rekap_bulan_ini:
+                _merge_monthly_rekap(master_rekap_per_staf, {staff_key: rekap_bulan_ini[staff_key]})
+
+        final_rekap_data = _finalize_rekap_data(master_rekap_per_staf)
+
+    except SheetsApiError:
+        # Ditangani handler 503 di routes_main
+        raise
+    except Exception as e:
+        message = f"Gagal mengambil rincian kesalahan untuk staff '{staff_name}': {e}"
+        return render_template('error.html', message=message)
+
+    return render_template('index.html',
+                           kesalahan_headers=[],
+                           kesalahan_data=[],
+                           staff_headers=[],
+                           staff_rows=[],
+                           total_kesalahan_staff=sum(item['total_kesalahan'] for item in final_rekap_data),
+                           current_sheet=staff_name,
+                           sheet_names=sheet_names_livechat,
+                           kesalahan_sheet_names=kesalahan_sheet_names,
+                           SHEET_KHUSUS={},
+                           title_prefix='Data Kesalahan Mistake',
+                           template_include='detail_kesalahan_staff_summary.html',
+                           kesalahan_rekap_data=final_rekap_data,
+                           summary_sheet_names=summary_sheet_names
+                           )
+
+
 @app.route('/kesalahan-sheets')
 def get_kesalahan_sheet_names_route():
-    if KESALAHAN_SHEETS_SERVICE is None:
+    if get_kesalahan_sheets_service() is None:
         config_url = url_for('show_db_config')
         message = f"Gagal terhubung ke Google Sheets API untuk Kesalahan. Silakan cek ID Spreadsheet dan kredensial. <a href='{config_url}' class='font-bold underline'>Atur Konfigurasi</a>."
         return render_template('error.html', message=message)
 
     try:
-        sheet_names = get_sheet_names(KESALAHAN_SHEETS_SERVICE, {}, KESALAHAN_SPREADSHEET_ID)
+        kesalahan_spreadsheet_id, _, _ = get_kesalahan_settings()
+        sheet_names = get_sheet_names(get_kesalahan_sheets_service(), {}, kesalahan_spreadsheet_id)
         
         return render_template('debug_list.html',
                                current_sheet='Daftar Sheet Kesalahan',
                                items=sheet_names,
                                header="Nama-nama Sheet dari Spreadsheet Kesalahan")
 
+    except SheetsApiError:
+        # Ditangani handler 503 di routes_main
+        raise
     except Exception as e:
         message = f"Gagal mengambil nama sheet dari Spreadsheet Kesalahan: {e}"
         return render_template('error.html', message=message)
@@ -406,7 +634,7 @@ def show_kesalahan_data(sheet_name):
     
     KESALAHAN_RANGE_STAFF, KESALAHAN_RANGE_FATAL = _get_global_kesalahan_ranges()
 
-    if KESALAHAN_SHEETS_SERVICE is None:
+    if get_kesalahan_sheets_service() is None:
         config_url = url_for('show_db_config')
         message = f"Gagal terhubung ke Google Sheets API untuk Spreadsheet Kesalahan. Silakan cek ID Spreadsheet dan kredensial. <a href='{config_url}' class='font-bold underline'>Atur Konfigurasi</a>."
         return render_template('error.html', message=message)
@@ -458,6 +686,9 @@ def show_kesalahan_data(sheet_name):
 
             # --- LOGIKA FILTER BARU SELESAI DI SINI ---
                 
+    except SheetsApiError:
+        # Ditangani handler 503 di routes_main
+        raise
     except Exception as e:
         message = f"Gagal mengambil data dari Sheet Kesalahan '{sheet_name}': {e}"
         final_rekap_data = []
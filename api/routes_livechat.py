@@ -1,19 +1,27 @@
 # api/routes_livechat.py
 
 import re
+import json
+import hashlib
+from functools import lru_cache
 from urllib.parse import unquote
 from flask import render_template, redirect, url_for, abort
 import math
 from datetime import datetime, timedelta
 
-from .app import (
-    app, SHEETS_SERVICE, 
-    LIVECHAT_SPREADSHEET_ID, LIVECHAT_RANGE_KESALAHAN, LIVECHAT_RANGE_STAFF,
+from .app import app, get_sheets_service, get_livechat_settings
+from .config import (
+    SUMMARY_LIVECHAT_ROUTE, TARGET_KESALAHAN_HEADERS, KHUSUS_KESALAHAN_HEADERS, LOCAL_CACHE_TTL,
+    MONTH_INDEX_CACHE_MAX_ITEMS,
+    LIVECHAT_SUMMARY_CACHE_TTL, LIVECHAT_SUMMARY_CACHE_HARD_TTL
+)
+from .database import (
+    get_livechat_leader_mapping, get_frozen_aggregates, get_frozen_aggregates_version,
+    get_data_with_cache, LocalCache
 )
-from .config import SUMMARY_LIVECHAT_ROUTE, TARGET_KESALAHAN_HEADERS, KHUSUS_KESALAHAN_HEADERS
-from .database import get_livechat_leader_mapping 
 from .sheets_api import (
-    get_sheet_data, get_batch_sheet_data, calculate_sheet_total
+    get_sheet_data, get_batch_sheet_data, calculate_sheet_total,
+    limit_range_columns, value_range_digest
 )
 from .filters import format_number
 from .routes_main import get_all_sheet_names 
@@ -23,55 +31,76 @@ from .routes_main import get_all_sheet_names
 # (Tidak ada perubahan, hanya untuk kelengkapan)
 # =========================================================================
 
-def calculate_staff_errors_from_kesalahan(kesalahan_data_all, staff_list):
-    
-    KESALAHAN_TYPES = [
-        "Tidak membantu / menyelesaikan kendala dengan benar", 
-        "Note Pengecekkan tidak berujung", 
-        "Tidak melakukan pengecekan", 
-        "Memberikan data penting ke member", 
-        "Reset pass tanpa persetujuan",
-        "Tidak memahami permainan", 
-        "Tidak respon permainan",
-        "Ubah data tanpa data lengkap",
-        "Salah indikator bank", 
-        "Mempermainkan member", 
-        "Telat minta maaf", 
-        "Salah informasi", 
-        "Salah respon", 
-        "Tidak respon", 
-        "Telat respon", 
-        "Tidak teliti", 
-        "Asal spam pk", 
-        "Tidak minta userid", 
-        "Fatal", 
-        "Capslock", 
-        "Tidak sopan", 
-        "Tidak meminta data pendukung", 
-        "SS admin", 
-        "Note", 
-    ]
-    
-    NEW_STAFF_HEADERS_ORDER = [
-        "Salah respon", "Salah informasi", "Telat minta maaf", "Tidak respon", "Telat respon", 
-        "Tidak membantu / menyelesaikan kendala dengan benar", "Tidak melakukan pengecekan", 
-        "Tidak teliti", "Asal spam pk", "Tidak minta userid", "Fatal", "Tidak memahami permainan", 
-        "Tidak respon permainan", "Memberikan data penting ke member", "Salah indikator bank", 
-        "Mempermainkan member", "Capslock", "Tidak sopan", "Ubah data tanpa data lengkap", 
-        "Reset pass tanpa persetujuan", "Tidak meminta data pendukung", "SS admin", "Note"
-    ]
-    NEW_STAFF_HEADERS_ORDER.append("PENGECEKKAN TIDAK BERUJUNG")
-
-    def normalize_name(name_raw):
-        if not name_raw:
-            return ""
-        name_str = str(name_raw)
-        name_clean = name_str.encode('ascii', 'ignore').decode('ascii').upper()
-        name_normalized = re.sub(r'[^A-Z0-9/]', '', name_clean) 
-        return name_normalized
-        
-    def clean_for_display(name_raw):
-        return re.sub(r'\s+', ' ', str(name_raw)).strip().title()
+KESALAHAN_TYPES = [
+    "Tidak membantu / menyelesaikan kendala dengan benar", 
+    "Note Pengecekkan tidak berujung", 
+    "Tidak melakukan pengecekan", 
+    "Memberikan data penting ke member", 
+    "Reset pass tanpa persetujuan",
+    "Tidak memahami permainan", 
+    "Tidak respon permainan",
+    "Ubah data tanpa data lengkap",
+    "Salah indikator bank", 
+    "Mempermainkan member", 
+    "Telat minta maaf", 
+    "Salah informasi", 
+    "Salah respon", 
+    "Tidak respon", 
+    "Telat respon", 
+    "Tidak teliti", 
+    "Asal spam pk", 
+    "Tidak minta userid", 
+    "Fatal", 
+    "Capslock", 
+    "Tidak sopan", 
+    "Tidak meminta data pendukung", 
+    "SS admin", 
+    "Note", 
+]
+
+NEW_STAFF_HEADERS_ORDER = [
+    "Salah respon", "Salah informasi", "Telat minta maaf", "Tidak respon", "Telat respon", 
+    "Tidak membantu / menyelesaikan kendala dengan benar", "Tidak melakukan pengecekan", 
+    "Tidak teliti", "Asal spam pk", "Tidak minta userid", "Fatal", "Tidak memahami permainan", 
+    "Tidak respon permainan", "Memberikan data penting ke member", "Salah indikator bank", 
+    "Mempermainkan member", "Capslock", "Tidak sopan", "Ubah data tanpa data lengkap", 
+    "Reset pass tanpa persetujuan", "Tidak meminta data pendukung", "SS admin", "Note",
+    "PENGECEKKAN TIDAK BERUJUNG"
+]
+
+# Alternation berurutan: regex mencoba alternatif dari kiri ke kanan, sehingga jenis
+# pertama di KESALAHAN_TYPES yang menjadi awalan tetap menang (sama seperti loop startswith).
+_ERROR_TYPE_PATTERN = re.compile('|'.join(re.escape(et.upper()) for et in KESALAHAN_TYPES))
+_ERROR_TYPE_BY_UPPER = {et.upper(): et for et in KESALAHAN_TYPES}
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_NON_NAME_CHAR_PATTERN = re.compile(r'[^A-Z0-9/]')
+_STAFF_NAME_SPLIT_PATTERN = re.compile(r'\s*/\s*|\s+/\s*')
+
+@lru_cache(maxsize=4096)
+def classify_error_type(error_type_raw):
+    """Mengembalikan jenis kesalahan dari KESALAHAN_TYPES untuk teks kolom C, atau None."""
+    clean_error_type = _WHITESPACE_PATTERN.sub(' ', error_type_raw.strip()).strip().upper()
+    match = _ERROR_TYPE_PATTERN.match(clean_error_type)
+    return _ERROR_TYPE_BY_UPPER[match.group(0)] if match else None
+
+@lru_cache(maxsize=4096)
+def normalize_name(name_raw):
+    if not name_raw:
+        return ""
+    name_str = str(name_raw)
+    name_clean = name_str.encode('ascii', 'ignore').decode('ascii').upper()
+    name_normalized = _NON_NAME_CHAR_PATTERN.sub('', name_clean) 
+    return name_normalized
+
+def clean_for_display(name_raw):
+    return _WHITESPACE_PATTERN.sub(' ', str(name_raw)).strip().title()
+
+def count_staff_errors(kesalahan_data_all, staff_list):
+    """
+    Tahap hitung calculate_staff_errors_from_kesalahan: mengembalikan
+    (staff_summary, note_pengecekan_map) sebelum aturan 10 note pengecekan = 1 kesalahan.
+    Hasil per baris bersifat aditif, jadi bisa dijumlahkan antar potongan data.
+    """
     
     staff_full_names = {}
     staff_key_to_display_name = {} 
@@ -99,7 +128,7 @@ def calculate_staff_errors_from_kesalahan(kesalahan_data_all, staff_list):
             staff_full_names[display_name_key_upper] = full_name_raw
             staff_key_to_display_name[display_name_key_upper] = display_name_key_upper
 
-            name_parts = re.split(r'\s*/\s*|\s+/\s*', full_name_raw)
+            name_parts = _STAFF_NAME_SPLIT_PATTERN.split(full_name_raw)
             
             for part in name_parts:
                 part_stripped = part.strip()
@@ -117,9 +146,6 @@ def calculate_staff_errors_from_kesalahan(kesalahan_data_all, staff_list):
         
         staff_name_from_error = row[0].strip()
         clean_staff_name_error = normalize_name(staff_name_from_error)
-        
-        error_type_from_error = row[2].strip()
-        clean_error_type = re.sub(r'\s+', ' ', error_type_from_error).strip().upper()
 
         matching_staff_name_key = None
         
@@ -134,11 +160,7 @@ def calculate_staff_errors_from_kesalahan(kesalahan_data_all, staff_list):
         if not display_name_key:
             continue
             
-        error_type_base = None
-        for et in KESALAHAN_TYPES:
-            if clean_error_type.startswith(et.upper()):
-                error_type_base = et
-                break
+        error_type_base = classify_error_type(row[2])
             
         if not error_type_base:
             continue
@@ -154,6 +176,16 @@ def calculate_staff_errors_from_kesalahan(kesalahan_data_all, staff_list):
             staff_summary[display_name_key]['Detail Kesalahan'][error_type_base] += 1
             staff_summary[display_name_key]['TOTAL KESALAHAN'] += 1
         
+    return staff_summary, note_pengecekan_map
+
+def calculate_staff_errors_from_kesalahan(kesalahan_data_all, staff_list):
+    """
+    Menghitung kesalahan per staff dari baris kesalahan (A:C) dan daftar staff (H).
+    Mengembalikan (headers, staff_rows, total) dengan staff_rows berupa list dict
+    {'name', 'total', 'counts': {jenis kesalahan: jumlah}} urut dari total terbesar.
+    """
+    staff_summary, note_pengecekan_map = count_staff_errors(kesalahan_data_all, staff_list)
+
     for staff_name_key, count in note_pengecekan_map.items():
         if staff_name_key in staff_summary:
             jumlah_pengecekan_berujung = math.floor(count / 10)
@@ -173,32 +205,97 @@ def calculate_staff_errors_from_kesalahan(kesalahan_data_all, staff_list):
         reverse=True
     )
 
+    # Hasil berupa angka (bukan string terformat); format_number dipanggil di template
     for name_key in sorted_staff_keys:
         data = staff_summary[name_key]
-            
-        row = [data['NAMA LENGKAP']] 
-        row.append(format_number(data['TOTAL KESALAHAN'])) 
         total_kesalahan_staff_new += data['TOTAL KESALAHAN']
         
-        for error_type in NEW_STAFF_HEADERS_ORDER:
-            val = max(0, data['Detail Kesalahan'].get(error_type, 0))
-            row.append(format_number(val))
-            
-        new_staff_rows.append(row)
+        new_staff_rows.append({
+            'name': data['NAMA LENGKAP'],
+            'total': data['TOTAL KESALAHAN'],
+            'counts': {
+                error_type: max(0, data['Detail Kesalahan'].get(error_type, 0))
+                for error_type in NEW_STAFF_HEADERS_ORDER
+            }
+        })
     
     return final_headers, new_staff_rows, total_kesalahan_staff_new
 
 
+def staff_total_partials(kesalahan_data_all, staff_list):
+    """
+    Total per staff dalam bentuk yang bisa digabung antar bulan (disimpan di MonthlyAggregate):
+    {kunci staff: {'name', 'total' (tanpa aturan note), 'notes' (jumlah note pengecekan)}}.
+    """
+    staff_summary, note_pengecekan_map = count_staff_errors(kesalahan_data_all, staff_list)
+    return {
+        key: {
+            'name': data['NAMA LENGKAP'],
+            'total': data['TOTAL KESALAHAN'],
+            'notes': note_pengecekan_map.get(key, 0)
+        }
+        for key, data in staff_summary.items()
+    }
+
+def combine_staff_total_partials(live_partials, frozen_partials_list):
+    """
+    Menggabungkan partial data live dengan partial bulan beku. Hanya staff yang ada di
+    daftar staff saat ini (kunci live_partials) yang dihitung, sama seperti perhitungan live.
+    Mengembalikan (total situs, {NAMA STAFF UPPER: total}) dengan urutan total terbesar.
+    """
+    combined = {key: dict(partial) for key, partial in live_partials.items()}
+    for frozen_partials in frozen_partials_list:
+        for key, partial in frozen_partials.items():
+            if key in combined:
+                combined[key]['total'] += partial['total']
+                combined[key]['notes'] += partial['notes']
+
+    final_totals = {
+        key: partial['total'] + math.floor(partial['notes'] / 10)
+        for key, partial in combined.items()
+    }
+    staff_totals = {}
+    for key in sorted(final_totals, key=lambda k: final_totals[k], reverse=True):
+        staff_totals[combined[key]['name'].strip().upper()] = final_totals[key]
+    return sum(final_totals.values()), staff_totals
+
+
 # =========================================================================
 # FUNGSI PEMBANTU UNTUK FILTER BULAN BERBASIS DELIMITER
-# (Tidak ada perubahan, hanya untuk kelengkapan)
 # =========================================================================
 
-def is_date_string(date_str, format_list=['%d/%m/%Y', '%d/%m/%y']): 
+DATE_FORMATS = ('%d/%m/%Y', '%d/%m/%y')
+
+# Bentuk yang diterima strptime untuk '%d/%m/%Y' dan '%d/%m/%y': hari/bulan 1-2 digit
+# (hari boleh ' 1'), tahun tepat 4 atau 2 digit
+_DATE_CELL_PATTERN = re.compile(r'(\d{1,2}| \d)/(\d{1,2})/(\d{4}|\d{2})', re.ASCII)
+
+@lru_cache(maxsize=8192)
+def _parse_date_cell(date_str):
+    """Setara strptime dengan DATE_FORMATS, tetapi lewat regex dan konstruksi integer."""
+    match = _DATE_CELL_PATTERN.fullmatch(date_str)
+    if not match:
+        return None
+    day, month, year_text = match.groups()
+    year = int(year_text)
+    if len(year_text) == 2:
+        # Aturan %y: 69-99 -> 1969-1999, 00-68 -> 2000-2068
+        year += 1900 if year >= 69 else 2000
+    try:
+        return datetime(year, int(month), int(day))
+    except ValueError:
+        return None
+
+def is_date_string(date_str, format_list=DATE_FORMATS): 
     if not date_str:
         return None
-    date_str = date_str.strip().encode('ascii', 'ignore').decode('ascii') 
+    date_str = date_str.strip()
+    if not date_str.isascii():
+        date_str = date_str.encode('ascii', 'ignore').decode('ascii') 
     
+    if tuple(format_list) == DATE_FORMATS:
+        return _parse_date_cell(date_str)
+
     for fmt in format_list:
         try:
             return datetime.strptime(date_str, fmt)
@@ -206,7 +303,22 @@ def is_date_string(date_str, format_list=['%d/%m/%Y', '%d/%m/%y']):
             continue
     return None
 
+def month_key_to_str(month_key):
+    """(2025, 8) -> '08-2025', format bulan di URL dan dropdown."""
+    year, month = month_key
+    return f"{month:02d}-{year}"
+
+def parse_month_key(month_str):
+    """'08-2025' -> (2025, 8); None jika bukan format 'mm-YYYY'."""
+    match = re.fullmatch(r'(\d{2})-(\d{4})', month_str or '', re.ASCII)
+    return (int(match.group(2)), int(match.group(1))) if match else None
+
+def _month_sort_key(month_str):
+    """Kunci sort kronologis untuk string 'mm-YYYY'."""
+    return parse_month_key(month_str) or (0, 0)
+
 def get_delimiter_indexes(kesalahan_data):
+    """Mengembalikan {(tahun, bulan): index baris pembatas pertama}."""
     delimiter_map = {}
     
     for i, row in enumerate(kesalahan_data): 
@@ -214,7 +326,7 @@ def get_delimiter_indexes(kesalahan_data):
             if len(row) > 1 and row[1]: 
                 date_obj = is_date_string(row[1])
                 if date_obj:
-                    month_key = date_obj.strftime('%m-%Y')
+                    month_key = (date_obj.year, date_obj.month)
                     if month_key not in delimiter_map:
                          delimiter_map[month_key] = i
                          
@@ -225,32 +337,88 @@ def get_delimiter_indexes(kesalahan_data):
         if is_delimiter_row:
             date_obj = is_date_string(row[1])
             if date_obj:
-                month_key = date_obj.strftime('%m-%Y')
+                month_key = (date_obj.year, date_obj.month)
                 if month_key not in delimiter_map:
                     delimiter_map[month_key] = i
                              
     return delimiter_map
 
-def filter_kesalahan_by_month(kesalahan_data, month_filter):
+def build_month_index(kesalahan_data):
+    """
+    Index bulan untuk data kesalahan satu situs (tanpa header), dibangun sekali lalu
+    dipakai oleh get_available_months dan filter_kesalahan_by_month:
+        delimiters         -> {(tahun, bulan): index baris pembatas pertama}
+        sorted_months      -> bulan pembatas, terbaru lebih dulu
+        has_new_error_data -> ada baris kesalahan setelah pembatas terbaru (bulan baru tanpa pembatas)
+        first_row_has_name -> baris pertama berisi nama staff (dipakai jika tidak ada pembatas)
+    """
+    delimiter_map = get_delimiter_indexes(kesalahan_data)
+    sorted_months = sorted(delimiter_map.keys(), reverse=True)
+
+    has_new_error_data = False
+    if sorted_months:
+        for i in range(delimiter_map[sorted_months[0]] + 1, len(kesalahan_data)):
+            row = kesalahan_data[i]
+            
+            if (len(row) >= 3 and 
+                row[0] and row[0].strip() and           
+                row[2] and row[2].strip() and           
+                not is_date_string(row[1])
+               ):
+                has_new_error_data = True
+                break
+
+    first_row = kesalahan_data[0] if kesalahan_data else []
+    return {
+        'delimiters': delimiter_map,
+        'sorted_months': sorted_months,
+        'has_new_error_data': has_new_error_data,
+        'first_row_has_name': bool(first_row and first_row[0] and first_row[0].strip()),
+    }
+
+# Cache kecil khusus index bulan, terpisah dari local_cache agar entri konfigurasi tidak terdesak
+_month_index_cache = LocalCache(max_items=MONTH_INDEX_CACHE_MAX_ITEMS)
+
+def get_site_month_index(value_range, skip_blank_rows=False):
+    """
+    Memotong header dari valueRange A:C satu situs dan membangun index bulannya.
+    Hasil di-cache per range + digest isinya, jadi dipakai ulang antar request
+    selama isi sheet tidak berubah.
+    Mengembalikan (rows_tanpa_header, month_index).
+    """
+    values = value_range.get('values', [])
+    cache_key = f"{value_range.get('range', '')}:{value_range_digest(value_range)}:{int(skip_blank_rows)}"
+    cached = _month_index_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    rows = values
+    if skip_blank_rows:
+        rows = [row for row in rows if any(cell and cell.strip() for cell in row)]
+    rows = rows[1:]
+    month_index = build_month_index(rows)
+
+    _month_index_cache.set(cache_key, (rows, month_index), LOCAL_CACHE_TTL)
+    return rows, month_index
+
+def filter_kesalahan_by_month(kesalahan_data, month_filter, month_index=None):
     # LOGIKA INI SUDAH BENAR: Jika 'all' atau None, kembalikan semua data.
     if not month_filter or month_filter.lower() == 'all':
         return kesalahan_data
         
-    delimiter_map = get_delimiter_indexes(kesalahan_data)
+    if month_index is None:
+        month_index = build_month_index(kesalahan_data)
+    delimiter_map = month_index['delimiters']
+    sorted_months = month_index['sorted_months']
+    month_key = parse_month_key(month_filter)
     
-    sorted_months = sorted(
-        delimiter_map.keys(), 
-        key=lambda x: datetime.strptime(x, '%m-%Y'), 
-        reverse=True
-    )
-    
-    if not sorted_months and month_filter not in delimiter_map:
+    if not sorted_months and month_key not in delimiter_map:
         return []
         
     end_index = len(kesalahan_data)
     
     try:
-        current_index_in_sorted = sorted_months.index(month_filter)
+        current_index_in_sorted = sorted_months.index(month_key)
         
         if current_index_in_sorted > 0:
             next_month_key = sorted_months[current_index_in_sorted - 1] 
@@ -262,8 +430,8 @@ def filter_kesalahan_by_month(kesalahan_data, month_filter):
     start_index = 0
     
     try:
-        if month_filter in delimiter_map:
-            start_index = delimiter_map[month_filter] 
+        if month_key in delimiter_map:
+            start_index = delimiter_map[month_key] 
         else:
             if sorted_months:
                 latest_month_str = sorted_months[0]
@@ -277,84 +445,97 @@ def filter_kesalahan_by_month(kesalahan_data, month_filter):
     
     return kesalahan_data[start_index:end_index]
 
-def get_available_months(kesalahan_data):
-    delimiter_map = get_delimiter_indexes(kesalahan_data)
-    months = list(delimiter_map.keys()) 
+def get_available_months(kesalahan_data, month_index=None):
+    if month_index is None:
+        month_index = build_month_index(kesalahan_data)
+    months = list(month_index['delimiters'].keys()) 
     
     now = datetime.now()
-    current_month_str = now.strftime('%m-%Y')
+    current_month_key = (now.year, now.month)
 
     if months:
-        latest_month_str = max(months, key=lambda x: datetime.strptime(x, '%m-%Y'))
-        latest_delimiter_index = delimiter_map[latest_month_str]
-        latest_month_obj = datetime.strptime(latest_month_str, '%m-%Y')
-        
-        has_new_error_data = False
-        
-        for i in range(latest_delimiter_index + 1, len(kesalahan_data)):
-            row = kesalahan_data[i]
-            
-            if (len(row) >= 3 and 
-                row[0] and row[0].strip() and           
-                row[2] and row[2].strip() and           
-                not is_date_string(row[1])
-               ):
-                has_new_error_data = True
-                break
+        latest_year, latest_month = month_index['sorted_months'][0]
         
-        if has_new_error_data:
+        if month_index['has_new_error_data']:
             
-            next_month = (latest_month_obj.replace(day=28) + timedelta(days=4)).replace(day=1)
-            next_month_str = next_month.strftime('%m-%Y')
+            next_month_key = (latest_year + 1, 1) if latest_month == 12 else (latest_year, latest_month + 1)
             
-            if next_month_str == current_month_str:
-                 if next_month_str not in months:
-                     months.append(next_month_str)
+            if next_month_key == current_month_key:
+                 if next_month_key not in months:
+                     months.append(next_month_key)
         
     elif kesalahan_data:
-        if len(kesalahan_data) > 0 and kesalahan_data[0][0] and kesalahan_data[0][0].strip():
-             months.append(current_month_str)
+        if month_index['first_row_has_name']:
+             months.append(current_month_key)
 
-    try:
-        sorted_months = sorted(
-            months, 
-            key=lambda x: datetime.strptime(x, '%m-%Y'), 
-            reverse=True
-        )
-    except ValueError:
-        sorted_months = sorted(months, reverse=True)
-            
-    return sorted_months
+    return [month_key_to_str(month_key) for month_key in sorted(months, reverse=True)]
+
+def split_frozen_months(kesalahan_data, month_filter, month_index, frozen_months):
+    """
+    Memisahkan data satu situs menjadi baris yang masih harus dihitung live dan
+    partial bulan beku dari MonthlyAggregate ({'mm-YYYY': partial}).
+    Mengembalikan (rows_live, [partial beku...]) atau None jika tidak ada bulan beku
+    yang bisa dipakai. Bulan pembatas terbaru selalu dihitung live karena belum tertutup.
+    """
+    sorted_months = month_index['sorted_months']
+    if not frozen_months or len(sorted_months) < 2:
+        return None
+
+    delimiter_map = month_index['delimiters']
+    closed_months = sorted_months[1:]
+
+    if month_filter and month_filter.lower() != 'all':
+        month_key = parse_month_key(month_filter)
+        month_str = month_key_to_str(month_key) if month_key in closed_months else None
+        if month_str in frozen_months:
+            return [], [frozen_months[month_str]]
+        return None
+
+    # 'all': potongan per bulan hanya menutupi seluruh data jika pembatas urut kronologis
+    chronological = list(reversed(sorted_months))
+    positions = [delimiter_map[month_key] for month_key in chronological]
+    if positions != sorted(positions):
+        return None
+
+    live_rows = list(kesalahan_data[:positions[0]])
+    frozen_partials = []
+    for i, month_key in enumerate(chronological):
+        month_str = month_key_to_str(month_key)
+        if month_key in closed_months and month_str in frozen_months:
+            frozen_partials.append(frozen_months[month_str])
+        else:
+            end_index = positions[i + 1] if i + 1 < len(positions) else len(kesalahan_data)
+            live_rows.extend(kesalahan_data[positions[i]:end_index])
+
+    if not frozen_partials:
+        return None
+    return live_rows, frozen_partials
 
 
 # =========================================================================
 # ROUTE LIVECHAT (show_summary_livechat) - MODIFIED
 # =========================================================================
 
-@app.route(f'/{SUMMARY_LIVECHAT_ROUTE}')
-@app.route(f'/{SUMMARY_LIVECHAT_ROUTE}/<month_filter>') 
-def show_summary_livechat(month_filter=None): 
-    if SHEETS_SERVICE is None:
-        return redirect(url_for('home'))
-
-    sheet_names_livechat, kesalahan_sheet_names, sheet_khusus = get_all_sheet_names()
-    leader_mapping = get_livechat_leader_mapping()
-    
-    sheets_to_process = [name for name in sheet_names_livechat if name not in sheet_khusus]
-    leader_mapped_sites_uppercase = {k.upper(): v for k, v in leader_mapping.items()}
-    sites_for_batch_read = list({name.upper() for name in sheets_to_process if name.upper() in leader_mapped_sites_uppercase})
-
-    # Siapkan ranges, combined_ranges, num_sites
-    ranges_to_get_kesalahan = [f"'{sheet_name}'!{LIVECHAT_RANGE_KESALAHAN}" for sheet_name in sites_for_batch_read]
-    ranges_to_get_staff = [f"'{sheet_name}'!{LIVECHAT_RANGE_STAFF}" for sheet_name in sites_for_batch_read]
-    combined_ranges = ranges_to_get_kesalahan + ranges_to_get_staff
+def _compute_livechat_summary(sheets_service, livechat_spreadsheet_id, sites_for_batch_read,
+                              combined_ranges, leader_mapping, month_filter):
+    """
+    Seluruh perhitungan ringkasan Livechat (situs, staff, leader) untuk satu filter bulan.
+    Tidak memakai request/url_for agar bisa dijalankan ulang di background; hasilnya
+    berupa dict yang aman disimpan di Redis.
+    """
     num_sites = len(sites_for_batch_read)
     
-    batch_results = get_batch_sheet_data(SHEETS_SERVICE, combined_ranges, LIVECHAT_SPREADSHEET_ID)
+    # Range kesalahan (A:C) hanya bertambah di bawah, jadi di-refresh dengan fetch ekor
+    batch_results = get_batch_sheet_data(
+        sheets_service, combined_ranges, livechat_spreadsheet_id,
+        append_only_ranges=combined_ranges[:num_sites]
+    )
 
     site_errors_map = {} 
     staff_total_map_per_site = {} 
     available_months_set = set()
+    # Index bulan per situs dibangun sekali dan dipakai untuk daftar bulan maupun filter
+    site_month_indexes = {}
     
     # 1. Kumpulkan semua bulan yang tersedia
     for i, sheet_name_upper in enumerate(sites_for_batch_read):
@@ -362,16 +543,17 @@ def show_summary_livechat(month_filter=None):
         filtered_kesalahan_data_raw = raw_error_data_range.get('values', [])
         
         if filtered_kesalahan_data_raw and len(filtered_kesalahan_data_raw) > 0:
-            kesalahan_data_raw_no_header = filtered_kesalahan_data_raw[1:]
+            kesalahan_data_raw_no_header, month_index = get_site_month_index(raw_error_data_range)
+            site_month_indexes[sheet_name_upper] = (kesalahan_data_raw_no_header, month_index)
             
-            current_months = get_available_months(kesalahan_data_raw_no_header)
+            current_months = get_available_months(kesalahan_data_raw_no_header, month_index)
             available_months_set.update(current_months)
 
     # Sortir bulan yang tersedia
     try:
         final_available_months = sorted(
             list(available_months_set), 
-            key=lambda x: datetime.strptime(x, '%m-%Y'), 
+            key=_month_sort_key, 
             reverse=True
         )
     except ValueError:
@@ -404,6 +586,8 @@ def show_summary_livechat(month_filter=None):
     if current_month_filter_display not in final_available_months:
         current_month_filter_display = latest_month # Fallback ke bulan terbaru
 
+    frozen_livechat_months = get_frozen_aggregates('livechat')
+
     # 3. Iterasi Ulang dan Hitung Total Menggunakan Filter yang Tepat
     for i, sheet_name_upper in enumerate(sites_for_batch_read):
         
@@ -411,10 +595,12 @@ def show_summary_livechat(month_filter=None):
         filtered_kesalahan_data_raw = raw_error_data_range.get('values', [])
         
         if filtered_kesalahan_data_raw and len(filtered_kesalahan_data_raw) > 0:
-            kesalahan_data_raw_no_header = filtered_kesalahan_data_raw[1:]
+            kesalahan_data_raw_no_header, month_index = site_month_indexes[sheet_name_upper]
             
             # Filter data berdasarkan actual_month_filter_for_calc
-            kesalahan_data_filtered_by_month = filter_kesalahan_by_month(kesalahan_data_raw_no_header, actual_month_filter_for_calc)
+            kesalahan_data_filtered_by_month = filter_kesalahan_by_month(
+                kesalahan_data_raw_no_header, actual_month_filter_for_calc, month_index
+            )
             
             raw_staff_data_range = batch_results[i + num_sites]
             staff_data_raw = raw_staff_data_range.get('values', [])
@@ -422,7 +608,23 @@ def show_summary_livechat(month_filter=None):
             if staff_data_raw and len(staff_data_raw) > 1:
                 staff_list_for_calc = [row for row in staff_data_raw[1:] if row and row[0].strip()]
 
+            frozen_split = None
             if staff_list_for_calc:
+                frozen_split = split_frozen_months(
+                    kesalahan_data_raw_no_header, actual_month_filter_for_calc, month_index,
+                    frozen_livechat_months.get(sheet_name_upper)
+                )
+
+            if staff_list_for_calc and frozen_split is not None:
+                # Bulan tertutup dibaca dari MonthlyAggregate, hanya sisa baris yang dihitung live
+                live_rows, frozen_partials = frozen_split
+                total_kesalahan_situs, staff_totals = combine_staff_total_partials(
+                    staff_total_partials(live_rows, staff_list_for_calc), frozen_partials
+                )
+                site_errors_map[sheet_name_upper] = total_kesalahan_situs
+                staff_total_map_per_site[sheet_name_upper] = staff_totals
+
+            elif staff_list_for_calc:
                 _, staff_rows_calculated, total_kesalahan_situs = calculate_staff_errors_from_kesalahan(
                     kesalahan_data_filtered_by_month, staff_list_for_calc 
                 )
@@ -430,10 +632,9 @@ def show_summary_livechat(month_filter=None):
                 site_errors_map[sheet_name_upper] = total_kesalahan_situs
                 
                 staff_total_map_per_site[sheet_name_upper] = {}
-                for row in staff_rows_calculated:
-                    staff_name = row[0].strip().upper()
-                    total_str = row[1].replace('.', '') 
-                    staff_total_map_per_site[sheet_name_upper][staff_name] = int(total_str) if total_str.isdigit() else 0
+                for staff_result in staff_rows_calculated:
+                    staff_name = staff_result['name'].strip().upper()
+                    staff_total_map_per_site[sheet_name_upper][staff_name] = staff_result['total']
                 
             else:
                 site_errors_map[sheet_name_upper] = 0
@@ -449,21 +650,14 @@ def show_summary_livechat(month_filter=None):
         month_filter_for_detail_link = latest_month
     
     grand_total = sum(site_errors_map.values())
-    all_sites_map = {}
-    
-    for site_upper, total in site_errors_map.items():
-        all_sites_map[site_upper] = {
-            'total': total,
-            # Link detail situs menggunakan bulan terbaru jika ringkasan saat ini adalah 'all'
-            'url': url_for('show_data', sheet_name=site_upper, month_filter=month_filter_for_detail_link) 
-        }
 
+    # URL detail situs ditambahkan oleh route (url_for butuh request context)
     summary_data = [] 
-    for site_upper, details in all_sites_map.items():
+    for site_upper, total in site_errors_map.items():
         summary_data.append({
             'name': site_upper.title(),
-            'total': details['total'],
-            'url': details['url']
+            'site': site_upper,
+            'total': total
         })
         
     summary_data.sort(key=lambda x: x['total'], reverse=True) 
@@ -560,21 +754,140 @@ def show_summary_livechat(month_filter=None):
         })
         leader_grand_total += total
         
+    return {
+        'summary_data': summary_data,
+        'grand_total': grand_total,
+        'summary_staff_data': final_summary_staff_data,
+        'staff_grand_total': staff_grand_total,
+        'summary_leader_data': final_summary_leader_data,
+        'leader_grand_total': leader_grand_total,
+        'available_months': final_available_months,
+        # Menggunakan 'current_month_filter_display'
+        'current_month_filter': current_month_filter_display,
+        # Link detail situs menggunakan bulan terbaru jika ringkasan saat ini adalah 'all'
+        'detail_month_filter': month_filter_for_detail_link,
+    }
+
+def _livechat_summary_cache_key(livechat_spreadsheet_id, combined_ranges, leader_mapping, month_filter):
+    """
+    Kunci ringkasan per filter bulan. Isi sheet tidak ikut dalam kunci (cache hit tidak
+    membaca Sheets): ringkasan dihitung ulang setelah LIVECHAT_SUMMARY_CACHE_TTL atau oleh
+    cron prewarm. Versinya hanya dari hal yang bisa dicek tanpa request ke Google: range
+    (diurutkan), leader mapping, agregat bulan beku, dan bulan berjalan.
+    """
+    version_source = json.dumps([
+        sorted(combined_ranges),
+        sorted(leader_mapping.items()),
+        get_frozen_aggregates_version('livechat'),
+        datetime.now().strftime('%Y-%m'),
+    ])
+    version = hashlib.sha1(version_source.encode('utf-8')).hexdigest()[:16]
+    return f"livechat:summary:{livechat_spreadsheet_id}:{month_filter or ''}:{version}"
+
+def get_livechat_summary_ranges(sheet_names_livechat, sheet_khusus, leader_mapping,
+                                livechat_range_kesalahan, livechat_range_staff):
+    """
+    Situs yang punya leader (huruf besar) dan range batch ringkasan:
+    semua range kesalahan lalu semua range staff, urutannya sama dengan situs.
+    """
+    sheets_to_process = [name for name in sheet_names_livechat if name not in sheet_khusus]
+    leader_mapped_sites_uppercase = {k.upper(): v for k, v in leader_mapping.items()}
+    # Urutan sheet dipertahankan (menentukan urutan situs dengan total sama di ringkasan);
+    # kunci cache dan flight batchGet diurutkan sendiri sehingga tidak bergantung urutan ini
+    sites_for_batch_read = list(dict.fromkeys(
+        name.upper() for name in sheets_to_process if name.upper() in leader_mapped_sites_uppercase
+    ))
+
+    ranges_to_get_kesalahan = [f"'{sheet_name}'!{livechat_range_kesalahan}" for sheet_name in sites_for_batch_read]
+    ranges_to_get_staff = [f"'{sheet_name}'!{livechat_range_staff}" for sheet_name in sites_for_batch_read]
+    return sites_for_batch_read, ranges_to_get_kesalahan + ranges_to_get_staff
+
+def get_livechat_summary(sheets_service, livechat_spreadsheet_id, sites_for_batch_read,
+                         combined_ranges, leader_mapping, month_filter, force_refresh=False):
+    """
+    Ringkasan Livechat dari cache hasil jadi, satu entri per filter bulan. Cache hit
+    tidak membaca nilai Sheets maupun menghitung ulang agregasi.
+    force_refresh=True menghitung ulang dan menimpa entri cache (job prewarm).
+    Mengembalikan None jika month_filter bukan 'all' dan bukan bulan yang tersedia.
+    """
+    # Kunci cache hanya untuk filter yang valid (None, 'all', atau bulan yang tersedia),
+    # sehingga path URL sembarang tidak membuat entri cache baru
+    if month_filter and month_filter.lower() == 'all':
+        month_filter = 'all'
+    elif month_filter:
+        month_key = parse_month_key(month_filter)
+        if not month_key:
+            return None
+        month_filter = month_key_to_str(month_key)
+        default_summary = get_livechat_summary(
+            sheets_service, livechat_spreadsheet_id, sites_for_batch_read,
+            combined_ranges, leader_mapping, None
+        )
+        if month_filter not in default_summary['available_months']:
+            return None
+
+    cache_key = _livechat_summary_cache_key(livechat_spreadsheet_id, combined_ranges, leader_mapping, month_filter)
+
+    def _compute():
+        return _compute_livechat_summary(
+            sheets_service, livechat_spreadsheet_id, sites_for_batch_read,
+            combined_ranges, leader_mapping, month_filter
+        )
+
+    return get_data_with_cache(
+        cache_key,
+        _compute,
+        cache_ttl=LIVECHAT_SUMMARY_CACHE_TTL,
+        hard_ttl=LIVECHAT_SUMMARY_CACHE_HARD_TTL,
+        force_refresh=force_refresh
+    )
+
+@app.route(f'/{SUMMARY_LIVECHAT_ROUTE}')
+@app.route(f'/{SUMMARY_LIVECHAT_ROUTE}/<month_filter>') 
+def show_summary_livechat(month_filter=None): 
+    sheets_service = get_sheets_service()
+    if sheets_service is None:
+        return redirect(url_for('home'))
+
+    livechat_spreadsheet_id, livechat_range_kesalahan, livechat_range_staff = get_livechat_settings()
+    # Perhitungan staff hanya membaca kolom pertama (nama staff), kolom lain tidak perlu diambil
+    livechat_range_staff = limit_range_columns(livechat_range_staff, 1)
+
+    sheet_names_livechat, kesalahan_sheet_names, sheet_khusus = get_all_sheet_names()
+    leader_mapping = get_livechat_leader_mapping()
+
+    sites_for_batch_read, combined_ranges = get_livechat_summary_ranges(
+        sheet_names_livechat, sheet_khusus, leader_mapping,
+        livechat_range_kesalahan, livechat_range_staff
+    )
+
+    summary = get_livechat_summary(
+        sheets_service, livechat_spreadsheet_id, sites_for_batch_read,
+        combined_ranges, leader_mapping, month_filter
+    )
+    if summary is None:
+        # Filter bulan tidak dikenali atau tidak ada datanya
+        abort(404)
+
+    summary_data = [
+        dict(item, url=url_for('show_data', sheet_name=item['site'], month_filter=summary['detail_month_filter']))
+        for item in summary['summary_data']
+    ]
+
     # Tambahkan available_months dan current_month_filter ke render_template
     return render_template('index.html',
                             current_sheet='Ringkasan Livechat', 
                             sheet_names=sheet_names_livechat, 
                             kesalahan_sheet_names=kesalahan_sheet_names, 
                             summary_data=summary_data, 
-                            grand_total=grand_total,
-                            summary_staff_data=final_summary_staff_data, 
-                            staff_grand_total=staff_grand_total,
-                            summary_leader_data=final_summary_leader_data, 
-                            leader_grand_total=leader_grand_total,
+                            grand_total=summary['grand_total'],
+                            summary_staff_data=summary['summary_staff_data'], 
+                            staff_grand_total=summary['staff_grand_total'],
+                            summary_leader_data=summary['summary_leader_data'], 
+                            leader_grand_total=summary['leader_grand_total'],
                             title_prefix='Data Kesalahan Livechat',
-                            available_months=final_available_months, 
-                            # Menggunakan 'current_month_filter_display'
-                            current_month_filter=current_month_filter_display 
+                            available_months=summary['available_months'], 
+                            current_month_filter=summary['current_month_filter'] 
                             )
 
 
@@ -585,15 +898,20 @@ def show_summary_livechat(month_filter=None):
 @app.route('/<sheet_name>')
 @app.route('/<sheet_name>/<month_filter>') 
 def show_data(sheet_name, month_filter=None): 
-    if SHEETS_SERVICE is None:
+    sheets_service = get_sheets_service()
+    if sheets_service is None:
         return redirect(url_for('home'))
 
+    livechat_spreadsheet_id, livechat_range_kesalahan, livechat_range_staff = get_livechat_settings()
+    # Perhitungan staff hanya membaca kolom pertama (nama staff), kolom lain tidak perlu diambil
+    livechat_range_staff = limit_range_columns(livechat_range_staff, 1)
+
     sheet_name = unquote(sheet_name)
     
     sheet_names_livechat, kesalahan_sheet_names, sheet_khusus = get_all_sheet_names()
     sheet_names = sheet_names_livechat 
     
-    range_kesalahan_default = LIVECHAT_RANGE_KESALAHAN 
+    range_kesalahan_default = livechat_range_kesalahan 
 
     kesalahan_data_all = [] 
     kesalahan_data_filtered = [] 
@@ -609,7 +927,7 @@ def show_data(sheet_name, month_filter=None):
         # ... (Logika untuk sheet khusus tetap sama) ...
         range_kesalahan = sheet_khusus[sheet_name]
         kesalahan_data_all = get_sheet_data(
-            SHEETS_SERVICE, sheet_name, range_kesalahan, expected_columns=3, spreadsheet_id=LIVECHAT_SPREADSHEET_ID
+            sheets_service, sheet_name, range_kesalahan, expected_columns=3, spreadsheet_id=livechat_spreadsheet_id
         )
         kesalahan_headers = KHUSUS_KESALAHAN_HEADERS
         kesalahan_data_filtered = kesalahan_data_all
@@ -624,20 +942,22 @@ def show_data(sheet_name, month_filter=None):
     else:
         ranges_for_sheet = [
             f"'{sheet_name}'!{range_kesalahan_default}", 
-            f"'{sheet_name}'!{LIVECHAT_RANGE_STAFF}" 
+            f"'{sheet_name}'!{livechat_range_staff}" 
         ]
         
-        batch_results = get_batch_sheet_data(SHEETS_SERVICE, ranges_for_sheet, LIVECHAT_SPREADSHEET_ID)
+        batch_results = get_batch_sheet_data(
+            sheets_service, ranges_for_sheet, livechat_spreadsheet_id,
+            append_only_ranges=ranges_for_sheet[:1]
+        )
         
         batch_0 = batch_results[0].get('values', []) if len(batch_results) > 0 else []
-        filtered_kesalahan_data_raw = [
-            row for row in batch_0 if any(cell and cell.strip() for cell in row)
-        ]
+        has_kesalahan_data = any(any(cell and cell.strip() for cell in row) for row in batch_0)
 
         
-        if filtered_kesalahan_data_raw:
-            kesalahan_data_raw_no_header = filtered_kesalahan_data_raw[1:] 
-            available_months = get_available_months(kesalahan_data_raw_no_header)
+        if has_kesalahan_data:
+            # Baris kosong dibuang dan header dipotong; index bulan dipakai ulang antar request
+            kesalahan_data_raw_no_header, month_index = get_site_month_index(batch_results[0], skip_blank_rows=True)
+            available_months = get_available_months(kesalahan_data_raw_no_header, month_index)
             
             # Tambahkan opsi 'all' untuk ditampilkan di dropdown detail
             if 'all' not in available_months:
@@ -663,7 +983,7 @@ def show_data(sheet_name, month_filter=None):
 
             
             # Gunakan actual_month_filter untuk memfilter data
-            kesalahan_data_for_calc = filter_kesalahan_by_month(kesalahan_data_raw_no_header, actual_month_filter)
+            kesalahan_data_for_calc = filter_kesalahan_by_month(kesalahan_data_raw_no_header, actual_month_filter, month_index)
             
             kesalahan_data_filtered = [
                 (row + [''] * (3 - len(row)))[:3] for row in kesalahan_data_for_calc
@@ -6,9 +6,9 @@ from flask import render_template, redirect, url_for, request, flash
 import math
 
 from .app import (
-    app, SHEETS_SERVICE, KESALAHAN_SHEETS_SERVICE,
-    LIVECHAT_SPREADSHEET_ID, KESALAHAN_SPREADSHEET_ID,
-    load_global_config, init_sheets_api_service, init_kesalahan_sheets_service
+    app, get_sheets_service, get_livechat_settings, get_kesalahan_settings,
+    ensure_database, load_global_config,
+    init_sheets_api_service, init_kesalahan_sheets_service
 )
 from .config import SUMMARY_LIVECHAT_ROUTE
 from .database import (
@@ -17,35 +17,19 @@ from .database import (
     update_or_add_site_config, delete_site_config,
     update_or_add_special_sheet, delete_special_sheet
 )
-from .sheets_api import get_sheet_names
+from .sheets_api import get_sheet_names, invalidate_sheet_directory, SheetsApiError
+# get_all_sheet_names (fetch paralel) diekspor ulang untuk routes_livechat dan routes_kesalahan
+from .utils import get_all_sheet_names
 
 # =========================================================================
-# FUNGSI PEMBANTU: Mengambil semua nama sheet (Livechat dan Kesalahan)
+# ERROR GOOGLE SHEETS (KUOTA / SERVER)
 # =========================================================================
 
-def get_all_sheet_names():
-    """Mengambil daftar sheet dari Livechat dan Kesalahan untuk navigasi."""
-    sheet_khusus = get_special_sheets()
-    sheet_names_livechat = []
-    kesalahan_sheet_names = []
-    
-    # 1. Sheet Livechat
-    if SHEETS_SERVICE and LIVECHAT_SPREADSHEET_ID:
-        try:
-            # Gunakan try/except untuk menghindari kegagalan fatal
-            sheet_names_livechat = get_sheet_names(SHEETS_SERVICE, sheet_khusus, LIVECHAT_SPREADSHEET_ID)
-        except Exception as e:
-            print(f"Peringatan: Gagal mengambil sheet Livechat: {e}")
-
-    # 2. Sheet Kesalahan
-    if KESALAHAN_SHEETS_SERVICE and KESALAHAN_SPREADSHEET_ID:
-        try:
-            # Sheet kesalahan tidak menggunakan filter sheet_khusus
-            kesalahan_sheet_names = get_sheet_names(KESALAHAN_SHEETS_SERVICE, {}, KESALAHAN_SPREADSHEET_ID)
-        except Exception as e:
-            print(f"Peringatan: Gagal mengambil sheet Kesalahan: {e}")
-
-    return sheet_names_livechat, kesalahan_sheet_names, sheet_khusus
+@app.errorhandler(SheetsApiError)
+def handle_sheets_api_error(error):
+    # Data gagal diambil setelah retry: tampilkan error, jangan ringkasan kosong
+    message = f"Gagal mengambil data dari Google Sheets (kuota atau server sedang bermasalah). Silakan muat ulang beberapa saat lagi. Detail: {error}"
+    return render_template('error.html', message=message), 503
 
 # =========================================================================
 # ROUTE UTAMA
@@ -53,7 +37,7 @@ def get_all_sheet_names():
 
 @app.route('/')
 def home():
-    if SHEETS_SERVICE is None:
+    if get_sheets_service() is None:
         config_url = url_for('show_db_config')
         message = f"Gagal terhubung ke Google Sheets API. Silakan cek kredensial. <a href='{config_url}' class='font-bold underline'>Atur Konfigurasi</a>."
         return render_template('error.html', message=message)
@@ -63,6 +47,7 @@ def home():
 
 @app.route('/config', methods=['GET', 'POST'])
 def show_db_config():
+    ensure_database()
     
     site_configs = SiteConfig.query.order_by(SiteConfig.id).all()
     special_sheets = SpecialSheet.query.order_by(SpecialSheet.id).all()
@@ -97,7 +82,8 @@ def show_db_config():
                 
                 # Livechat Configuration Save
                 new_livechat_id = request.form.get('spreadsheet_livechat', '').strip()
-                global_id_changed = new_livechat_id != globals().get('LIVECHAT_SPREADSHEET_ID')
+                current_livechat_id, _, _ = get_livechat_settings()
+                global_id_changed = new_livechat_id != current_livechat_id
                 if global_id_changed:
                     sheets_service_reinitialized = True
 
@@ -107,7 +93,8 @@ def show_db_config():
                 
                 # Kesalahan Configuration Save
                 new_kesalahan_id = request.form.get('spreadsheet_kesalahan', '').strip()
-                kesalahan_id_changed = new_kesalahan_id != globals().get('KESALAHAN_SPREADSHEET_ID')
+                current_kesalahan_id, _, _ = get_kesalahan_settings()
+                kesalahan_id_changed = new_kesalahan_id != current_kesalahan_id
                 if kesalahan_id_changed:
                     kesalahan_service_reinitialized = True
                 
@@ -170,6 +157,10 @@ def show_db_config():
                         init_sheets_api_service()
                     if kesalahan_service_reinitialized:
                         init_kesalahan_sheets_service()
+
+                # Daftar sheet navigasi harus diambil ulang setelah konfigurasi disimpan
+                invalidate_sheet_directory(new_livechat_id)
+                invalidate_sheet_directory(new_kesalahan_id)
                 
                 if not config_save_error:
                     flash('✅ Semua konfigurasi berhasil disimpan!', 'success')
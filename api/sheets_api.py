@@ -3,17 +3,36 @@
 import os
 import json
 import re
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import quote
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+# Library Google (googleapiclient, google.auth, httplib2) diimpor di dalam fungsi
+# yang memakainya: impornya memakan ratusan ms dan tidak dibutuhkan route seperti
+# /config atau request yang dilayani penuh dari cache.
 
 from .config import (
     SPREADSHEET_LIVECHAT, CLIENT_SECRET_FILE, TOKEN_FILE, 
-    SHEETS_TO_HIDE, SCOPES as DEFAULT_SCOPES 
+    SHEETS_TO_HIDE, SCOPES as DEFAULT_SCOPES,
+    SHEETS_VALUE_CACHE_TTL, SHEETS_VALUE_CACHE_HARD_TTL,
+    SHEET_DIRECTORY_CACHE_TTL, SHEET_DIRECTORY_CACHE_HARD_TTL,
+    BATCH_GET_MAX_URL_CHARS, SHEETS_HTTP_TIMEOUT,
+    SHEETS_BACKEND, SHEETS_FIXTURE_DIR,
+    LIVECHAT_TAIL_OVERLAP_ROWS, LIVECHAT_TAIL_FULL_RESYNC_INTERVAL,
+    SHEETS_PROBE_ROWS, SHEETS_PROBE_MAX_AGE
 )
-from .database import get_global_config, get_special_sheets
+from .database import (
+    get_global_config, get_special_sheets,
+    get_data_with_cache, get_cached_many, set_cached_many,
+    single_flight, refresh_in_background, _clear_cache, CACHE_TTL_24_JAM
+)
+from .sheets_backend import (
+    SheetsBackend, SheetsApiError, LocalSheetsBackend, split_a1_range, parse_a1_cells,
+    column_index_to_letter
+)
+from .sheets_quota import call_sheets_api
 
 def _load_dynamic_config():
     global_config = get_global_config()
@@ -24,12 +43,236 @@ def _load_dynamic_config():
 
     return scopes, special_sheets, spreadsheet_id
 
-def init_sheets_service(spreadsheet_id=None, scopes=None):
-    
+def _normalize_a1_range(range_name):
+    """
+    Menormalkan notasi A1 agar kunci cache konsisten, misalnya
+    "depobos!a1:c" dan "'DEPOBOS'!$A$1:$C" menjadi "'DEPOBOS'!A1:C".
+    Nama sheet di Google Sheets tidak case-sensitive, jadi ikut di-uppercase.
+    """
+    sheet_part, cell_part = split_a1_range(range_name)
+    if not cell_part:
+        return sheet_part.upper()
+    return f"'{sheet_part.upper()}'!{cell_part}"
+
+def _value_cache_key(spreadsheet_id, range_name):
+    return f"sheets:values:{spreadsheet_id}:{_normalize_a1_range(range_name)}"
+
+def _batch_flight_key(spreadsheet_id, cache_keys):
+    digest = hashlib.sha1('\n'.join(sorted(cache_keys)).encode('utf-8')).hexdigest()
+    return f"sheets:batch:{spreadsheet_id}:{digest}"
+
+class SheetsServicePool(SheetsBackend):
+    """
+    Backend Google Sheets: pengganti objek service global yang aman dipakai banyak thread.
+
+    httplib2 tidak thread-safe, jadi setiap thread mendapat client
+    googleapiclient dengan objek Http sendiri (koneksi keep-alive per thread),
+    sementara credentials dipakai bersama. Selain method SheetsBackend,
+    `pool.spreadsheets()` tetap tersedia untuk pemanggilan API mentah.
+    configure() mengganti credentials di tempat; client lama di setiap thread
+    dibangun ulang pada pemakaian berikutnya.
+    """
+
+    def __init__(self, credentials):
+        self._credentials = credentials
+        self._generation = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def credentials(self):
+        return self._credentials
+
+    def configure(self, credentials):
+        with self._lock:
+            self._credentials = credentials
+            self._generation += 1
+
+    def _ensure_valid_credentials(self):
+        creds = self._credentials
+        if creds.valid:
+            return
+        # Hanya satu thread yang me-refresh token, thread lain memakai hasilnya
+        with self._lock:
+            if not creds.valid and creds.refresh_token:
+                _refresh_credentials(creds)
+
+    def _thread_client(self):
+        self._ensure_valid_credentials()
+
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
+            from googleapiclient.discovery import build_from_document
+
+            http = AuthorizedHttp(self._credentials, http=httplib2.Http(timeout=SHEETS_HTTP_TIMEOUT))
+            local.http = http.http
+            local.service = build_from_document(_get_sheets_discovery_doc(), http=http)
+            # Membuat resource spreadsheets() butuh puluhan ms (method dibangun dari
+            # discovery document), jadi disimpan dan dipakai ulang per thread.
+            local.spreadsheets = local.service.spreadsheets()
+            local.generation = self._generation
+        return local
+
+    def get(self):
+        """Mengembalikan client googleapiclient milik thread saat ini."""
+        return self._thread_client().service
+
+    def spreadsheets(self):
+        return self._thread_client().spreadsheets
+
+    def _execute(self, build_request, timeout):
+        """Menjalankan request dengan timeout socket = sisa deadline call_sheets_api."""
+        local = self._thread_client()
+        _set_http_timeout(local.http, timeout)
+        return build_request(local.spreadsheets).execute()
+
+    # Setiap panggilan ke Google lewat call_sheets_api: mengambil token kuota baca
+    # bersama dan mengulang 429/5xx dengan backoff (lihat sheets_quota.py).
+
+    def get_values(self, spreadsheet_id, range_name):
+        return call_sheets_api(lambda timeout: self._execute(
+            lambda spreadsheets: spreadsheets.values().get(spreadsheetId=spreadsheet_id, range=range_name),
+            timeout
+        ))
+
+    def batch_get_values(self, spreadsheet_id, ranges):
+        ranges = list(ranges)
+        return call_sheets_api(lambda timeout: self._execute(
+            lambda spreadsheets: spreadsheets.values().batchGet(spreadsheetId=spreadsheet_id, ranges=ranges),
+            timeout
+        )).get('valueRanges', [])
+
+    def get_metadata(self, spreadsheet_id, fields=None):
+        request_kwargs = {'spreadsheetId': spreadsheet_id}
+        if fields:
+            request_kwargs['fields'] = fields
+        return call_sheets_api(lambda timeout: self._execute(
+            lambda spreadsheets: spreadsheets.get(**request_kwargs),
+            timeout
+        ))
+
+def _set_http_timeout(http, timeout):
+    """
+    Timeout socket httplib2 untuk request berikutnya: koneksi baru memakai http.timeout,
+    koneksi keep-alive yang sudah terbuka diubah langsung di socket-nya.
+    """
+    http.timeout = timeout
+    for conn in list(http.connections.values()):
+        conn.timeout = timeout
+        if getattr(conn, 'sock', None) is not None:
+            conn.sock.settimeout(timeout)
+
+# --- DISCOVERY DOCUMENT & TOKEN BERSAMA ---
+
+_discovery_lock = threading.Lock()
+_sheets_discovery_doc = None
+
+def _get_sheets_discovery_doc():
+    """
+    Discovery document Sheets v4 statis yang dibundel googleapiclient, dibaca
+    sekali per proses (tanpa request ke discovery endpoint). Disimpan sebagai
+    string karena build_from_document mengubah dict yang diberikan.
+    """
+    global _sheets_discovery_doc
+    if _sheets_discovery_doc is None:
+        with _discovery_lock:
+            if _sheets_discovery_doc is None:
+                from googleapiclient.discovery_cache import get_static_doc
+                _sheets_discovery_doc = get_static_doc('sheets', 'v4')
+    return _sheets_discovery_doc
+
+def _shared_token_key(creds):
+    identity = f"{creds.client_id}:{creds.refresh_token}:{' '.join(sorted(creds.scopes or []))}"
+    return f"sheets:oauth_token:{hashlib.sha1(identity.encode('utf-8')).hexdigest()}"
+
+def _apply_shared_token(creds, token_info):
+    """Memakai access token dari Redis jika masih valid. Mengembalikan True jika dipakai."""
+    if not token_info or not token_info.get('token') or not token_info.get('expiry'):
+        return False
+    try:
+        expiry = datetime.fromisoformat(token_info['expiry'])
+    except (TypeError, ValueError):
+        return False
+
+    previous_token, previous_expiry = creds.token, creds.expiry
+    creds.token = token_info['token']
+    creds.expiry = expiry
+    if creds.valid:
+        return True
+
+    creds.token, creds.expiry = previous_token, previous_expiry
+    return False
+
+def _refresh_credentials(creds):
+    """
+    Refresh access token satu kali untuk semua instance: token yang masih valid
+    diambil dari Redis, dan jika perlu refresh, hanya satu pemanggil (single-flight)
+    yang menghubungi Google lalu menyimpan token + expiry-nya ke Redis.
+    """
+    token_key = _shared_token_key(creds)
+    if _apply_shared_token(creds, get_cached_many([token_key]).get(token_key)):
+        return
+
+    def _refresh_and_share():
+        from google.auth.transport.requests import Request
+
+        creds.refresh(Request())
+        if not creds.expiry:
+            return {}
+
+        token_info = {'token': creds.token, 'expiry': creds.expiry.isoformat()}
+        # Berhenti dibagikan sebelum google-auth sendiri menganggapnya kedaluwarsa
+        ttl = int((creds.expiry - datetime.utcnow() - timedelta(minutes=5)).total_seconds())
+        if ttl > 0:
+            set_cached_many({token_key: token_info}, cache_ttl=ttl)
+        return token_info
+
+    token_info = single_flight(f"refresh:{token_key}", _refresh_and_share)
+    if not creds.valid and not _apply_shared_token(creds, token_info):
+        raise RuntimeError("Gagal me-refresh access token Google Sheets.")
+
+def _write_local_token(local_token_path, creds):
+    """Menyimpan token.json jika memungkinkan; filesystem serverless bersifat read-only."""
+    try:
+        with open(local_token_path, 'w') as token:
+            token.write(creds.to_json())
+    except OSError:
+        pass
+
+def init_sheets_service(spreadsheet_id=None, scopes=None, pool=None):
+    """
+    Membuat backend spreadsheet sesuai SHEETS_BACKEND.
+
+    Untuk 'local', fixture dari SHEETS_FIXTURE_DIR dipakai tanpa credentials.
+    Untuk 'google', dibuat SheetsServicePool dari credentials yang tersedia; jika
+    `pool` diberikan (re-inisialisasi dari /config), pool tersebut dikonfigurasi
+    ulang di tempat agar semua modul yang memegang referensinya ikut memakai
+    credentials baru.
+    """
+    if SHEETS_BACKEND == 'local':
+        if isinstance(pool, LocalSheetsBackend):
+            return pool
+        return LocalSheetsBackend(SHEETS_FIXTURE_DIR)
+
     dynamic_scopes, _, dynamic_spreadsheet_id = _load_dynamic_config()
     
     current_scopes = scopes if scopes else dynamic_scopes
-    
+
+    creds = _load_credentials(current_scopes)
+    if creds is None:
+        return None
+
+    if isinstance(pool, SheetsServicePool):
+        pool.configure(creds)
+        return pool
+    return SheetsServicePool(creds)
+
+def _load_credentials(current_scopes):
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     creds = None
     
     token_json_str = os.environ.get('TOKEN_JSON')
@@ -41,7 +284,7 @@ def init_sheets_service(spreadsheet_id=None, scopes=None):
             creds = Credentials.from_authorized_user_info(token_info, current_scopes)
             
             if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
+                _refresh_credentials(creds)
                 
         except Exception:
             creds = None
@@ -58,20 +301,18 @@ def init_sheets_service(spreadsheet_id=None, scopes=None):
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             try:
-                creds.refresh(Request())
-                with open(local_token_path, 'w') as token:
-                    token.write(creds.to_json())
+                _refresh_credentials(creds)
             except Exception:
                 creds = None
+            else:
+                _write_local_token(local_token_path, creds)
         else:
             if os.path.exists(local_client_secret_path):
                 try:
                     flow = InstalledAppFlow.from_client_secrets_file(
                         local_client_secret_path, current_scopes)
                     creds = flow.run_local_server(port=0)
-
-                    with open(local_token_path, 'w') as token:
-                        token.write(creds.to_json())
+                    _write_local_token(local_token_path, creds)
                 except Exception:
                     return None
             else:
@@ -80,7 +321,94 @@ def init_sheets_service(spreadsheet_id=None, scopes=None):
     if not creds or not creds.valid:
         return None 
 
-    return build('sheets', 'v4', credentials=creds)
+    return creds
+
+# Hanya properti yang dibutuhkan navigasi dan range builder, bukan seluruh resource spreadsheet
+SHEET_DIRECTORY_FIELDS = 'sheets.properties(sheetId,title,index,gridProperties(rowCount,columnCount))'
+
+def _sheet_directory_cache_key(spreadsheet_id):
+    return f"sheets:directory:{spreadsheet_id}"
+
+def _sheet_directory_version_key(spreadsheet_id):
+    return f"sheets:directory_version:{spreadsheet_id}"
+
+def _fetch_sheet_directory(service, spreadsheet_id):
+    metadata = service.get_metadata(spreadsheet_id, fields=SHEET_DIRECTORY_FIELDS)
+
+    directory = []
+    for sheet in metadata.get('sheets', []):
+        properties = sheet.get('properties', {})
+        grid_properties = properties.get('gridProperties', {})
+        if not properties.get('title'):
+            continue
+        directory.append({
+            'title': properties.get('title'),
+            'sheetId': properties.get('sheetId'),
+            'index': properties.get('index'),
+            'rowCount': grid_properties.get('rowCount', 0),
+            'columnCount': grid_properties.get('columnCount', 0),
+        })
+    return directory
+
+def _titles_fingerprint(directory):
+    titles = '\n'.join(entry['title'] for entry in directory)
+    return hashlib.sha1(titles.encode('utf-8')).hexdigest()[:16]
+
+def get_sheet_directory_version(spreadsheet_id):
+    """
+    Fingerprint daftar judul sheet terakhir yang diketahui. Berubah setiap kali
+    ada sheet yang ditambah/dihapus/diganti nama, sehingga bisa dipakai sebagai
+    bagian dari kunci cache turunan.
+    """
+    return get_data_with_cache(
+        _sheet_directory_version_key(spreadsheet_id),
+        lambda: '0',
+        cache_ttl=CACHE_TTL_24_JAM
+    )
+
+def invalidate_sheet_directory(spreadsheet_id):
+    _clear_cache([
+        _sheet_directory_cache_key(spreadsheet_id),
+        _sheet_directory_version_key(spreadsheet_id)
+    ])
+
+def get_sheet_directory(service, spreadsheet_id=None, force_refresh=False):
+    """
+    Mengembalikan daftar sheet [{title, sheetId, index, rowCount, columnCount}]
+    dari cache. Metadata diambil dengan field mask sehingga respons Google tetap kecil.
+    Jika daftar judul berubah saat refresh, versi direktori ikut diperbarui.
+    force_refresh=True selalu mengambil ulang metadata dari Google.
+    """
+    if service is None:
+        return []
+
+    if not spreadsheet_id:
+        _, _, spreadsheet_id = _load_dynamic_config()
+
+    cache_key = _sheet_directory_cache_key(spreadsheet_id)
+
+    def _fetch_and_track():
+        directory = single_flight(cache_key, lambda: _fetch_sheet_directory(service, spreadsheet_id))
+        fingerprint = _titles_fingerprint(directory)
+        if directory and fingerprint != get_sheet_directory_version(spreadsheet_id):
+            set_cached_many(
+                {_sheet_directory_version_key(spreadsheet_id): fingerprint},
+                cache_ttl=CACHE_TTL_24_JAM
+            )
+        return directory
+
+    try:
+        return get_data_with_cache(
+            cache_key,
+            _fetch_and_track,
+            cache_ttl=SHEET_DIRECTORY_CACHE_TTL,
+            hard_ttl=SHEET_DIRECTORY_CACHE_HARD_TTL,
+            force_refresh=force_refresh
+        )
+    except SheetsApiError:
+        raise
+    except Exception:
+        return []
 
 def get_sheet_names(service, sheet_khusus=None, spreadsheet_id=None):
     if service is None:
@@ -98,12 +426,7 @@ def get_sheet_names(service, sheet_khusus=None, spreadsheet_id=None):
     hide_set_stripped.update({name.strip() for name in current_sheet_khusus.keys()})
     
     try:
-        spreadsheet_metadata = service.spreadsheets().get(
-            spreadsheetId=current_spreadsheet_id
-        ).execute()
-
-        all_names = [sheet.get('properties', {}).get('title')
-                     for sheet in spreadsheet_metadata.get('sheets', [])]
+        all_names = [entry['title'] for entry in get_sheet_directory(service, current_spreadsheet_id)]
 
         filtered_names = []
         for name in all_names:
@@ -119,57 +442,344 @@ def get_sheet_names(service, sheet_khusus=None, spreadsheet_id=None):
 
         return filtered_names
 
+    except SheetsApiError:
+        raise
     except Exception:
         return []
 
-def get_sheet_data(service, sheet_name, range_name, expected_columns=None, spreadsheet_id=None):
+# --- PROYEKSI KOLOM ---
+
+def _format_a1_range(sheet_title, start_row, start_col, end_row, end_col):
+    """Kebalikan split_a1_range + parse_a1_cells (indeks berbasis 0, end_row None = terbuka)."""
+    quoted_title = sheet_title.replace("'", "''")
+    end_row_part = '' if end_row is None else str(end_row + 1)
+    return (
+        f"'{quoted_title}'!{column_index_to_letter(start_col)}{start_row + 1}:"
+        f"{column_index_to_letter(end_col)}{end_row_part}"
+    )
+
+def limit_range_columns(range_name, column_count):
+    """
+    Proyeksi kolom: hanya `column_count` kolom pertama dari range yang diminta,
+    misalnya 'H1:AH' -> 'H1:H' untuk column_count=1. Range tanpa sheet juga didukung.
+    """
+    has_sheet = '!' in range_name
+    sheet_title, cell_part = split_a1_range(range_name if has_sheet else f"'_'!{range_name}")
+    try:
+        start_row, start_col, end_row, end_col = parse_a1_cells(cell_part)
+    except ValueError:
+        return range_name
+    if not cell_part or (end_col is not None and end_col - start_col < column_count):
+        return range_name
+
+    bounded = _format_a1_range(sheet_title, start_row, start_col, end_row, start_col + column_count - 1)
+    return bounded if has_sheet else bounded.split('!', 1)[1]
+
+def clean_sheet_values(values, expected_columns=None):
+    """Membuang baris kosong dan (opsional) menyamakan jumlah kolom setiap baris."""
+    filtered_values = [
+        row for row in values if any(cell and cell.strip() for cell in row)
+    ]
+
+    if expected_columns and expected_columns > 0:
+        cleaned_data = []
+        for row in filtered_values:
+            if len(row) < expected_columns:
+                padded_row = row + [''] * (expected_columns - len(row))
+            else:
+                padded_row = row[:expected_columns]
+            cleaned_data.append(padded_row)
+        return cleaned_data
+
+    return filtered_values
+
+def get_sheet_data(service, sheet_name, range_name, expected_columns=None, spreadsheet_id=None, probe=False):
+    """
+    Nilai satu range (dibersihkan) dengan cache. probe=True hanya untuk sheet log yang
+    bertambah di bawah: refresh lebih dulu mencocokkan baris terakhir (lihat _probe_request).
+    """
     
     _, _, dynamic_spreadsheet_id = _load_dynamic_config()
     current_spreadsheet_id = spreadsheet_id if spreadsheet_id else dynamic_spreadsheet_id 
     
     full_range_name = f"'{sheet_name}'!{range_name}"
 
+    cache_key = _value_cache_key(current_spreadsheet_id, full_range_name)
+
+    def _fetch_value_range():
+        now = time.time()
+        previous_ranges = get_cached_many([cache_key])
+        try:
+            if probe and _probe_unchanged_keys(service, current_spreadsheet_id, {cache_key: full_range_name}, previous_ranges, now):
+                return previous_ranges[cache_key]
+        except SheetsApiError:
+            raise
+        except Exception:
+            pass
+
+        value_range = single_flight(cache_key, lambda: service.get_values(current_spreadsheet_id, full_range_name))
+        value_range = dict(value_range, **{FETCHED_AT_FIELD: now, DIGEST_FIELD: _value_range_digest(value_range)})
+        return value_range
+
     try:
-        result = service.spreadsheets().values().get(
-            spreadsheetId=current_spreadsheet_id,
-            range=full_range_name
-        ).execute()
+        result = get_data_with_cache(
+            cache_key,
+            _fetch_value_range,
+            cache_ttl=SHEETS_VALUE_CACHE_TTL,
+            hard_ttl=SHEETS_VALUE_CACHE_HARD_TTL
+        )
         
-        values = result.get('values', [])
-        filtered_values = [
-            row for row in values if any(cell and cell.strip() for cell in row)
-        ]
-
-        if expected_columns and expected_columns > 0:
-            cleaned_data = []
-            for row in filtered_values:
-                if len(row) < expected_columns:
-                    padded_row = row + [''] * (expected_columns - len(row))
-                else:
-                    padded_row = row[:expected_columns]
-                cleaned_data.append(padded_row)
-            return cleaned_data
-
-        return filtered_values
+        return clean_sheet_values(result.get('values', []), expected_columns)
 
+    except SheetsApiError:
+        raise
     except Exception:
         return []
 
-def get_batch_sheet_data(service, ranges, spreadsheet_id=None):
+# --- DIGEST NILAI PER RANGE ---
+
+# Disimpan di dalam valueRange yang di-cache: digest isi 'values' saat diunduh
+DIGEST_FIELD = '_digest'
+
+def _value_range_digest(value_range):
+    values = value_range.get('values', []) if value_range else []
+    payload = json.dumps(values, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+def value_range_digest(value_range):
+    """Digest isi valueRange: yang tersimpan saat fetch, atau dihitung jika belum ada."""
+    return (value_range or {}).get(DIGEST_FIELD) or _value_range_digest(value_range)
+
+def _chunk_ranges_for_url(ranges_by_key, max_url_chars=BATCH_GET_MAX_URL_CHARS):
+    """Memecah {cache_key: range} menjadi beberapa batch agar query string batchGet tidak terlalu panjang."""
+    chunks = []
+    current_chunk = {}
+    current_length = 0
+    for key, range_name in ranges_by_key.items():
+        param_length = len('&ranges=') + len(quote(range_name, safe=''))
+        if current_chunk and current_length + param_length > max_url_chars:
+            chunks.append(current_chunk)
+            current_chunk = {}
+            current_length = 0
+        current_chunk[key] = range_name
+        current_length += param_length
+    if current_chunk:
+        chunks.append(current_chunk)
+    return chunks
+
+# --- FETCH EKOR (SHEET APPEND-ONLY) ---
+
+# Disimpan di dalam valueRange yang di-cache: waktu terakhir range dibaca penuh
+FULL_SYNCED_AT_FIELD = '_full_synced_at'
+
+def _tail_request(range_name, previous_range, now):
+    """
+    Untuk range terbuka ke bawah (misalnya 'Situs'!A1:C) yang nilainya sudah ada di cache,
+    mengembalikan (range_ekor, offset_baris): hanya baris mulai len(values) - overlap yang
+    diambil ulang. None jika harus dibaca penuh (belum ada cache, range tertutup, atau
+    sudah waktunya resync penuh).
+    """
+    if not previous_range:
+        return None
+    full_synced_at = previous_range.get(FULL_SYNCED_AT_FIELD)
+    if not full_synced_at or now - full_synced_at >= LIVECHAT_TAIL_FULL_RESYNC_INTERVAL:
+        return None
+
+    sheet_title, cell_part = split_a1_range(range_name)
+    try:
+        start_row, start_col, end_row, end_col = parse_a1_cells(cell_part)
+    except ValueError:
+        return None
+    if end_row is not None or end_col is None:
+        return None
+
+    offset = max(0, len(previous_range.get('values', [])) - LIVECHAT_TAIL_OVERLAP_ROWS)
+    return _format_a1_range(sheet_title, start_row + offset, start_col, None, end_col), offset
+
+def _merge_tail(previous_range, tail_range, offset):
+    """Baris sebelum offset diambil dari cache, sisanya dari hasil fetch ekor."""
+    values = previous_range.get('values', [])[:offset] + tail_range.get('values', [])
+    # Seperti respons Google: baris kosong di ujung range tidak disertakan
+    while values and not values[-1]:
+        values.pop()
+
+    merged = {key: value for key, value in previous_range.items() if key != 'values'}
+    if values:
+        merged['values'] = values
+    return merged
+
+# --- PROBE PERUBAHAN (SEBELUM DOWNLOAD ULANG) ---
+
+# Disimpan di dalam valueRange yang di-cache: waktu terakhir nilai benar-benar diunduh
+FETCHED_AT_FIELD = '_fetched_at'
+
+def _probe_request(range_name, previous_range, now):
+    """
+    Range kecil untuk mendeteksi perubahan: SHEETS_PROBE_ROWS baris terakhir yang
+    sudah di-cache ditambah satu baris sesudahnya (menangkap baris baru).
+    Mengembalikan (range_probe, baris_pembanding) atau None jika probe tidak bisa
+    dipakai (belum ada cache, probe dimatikan, atau unduhan terakhir sudah melewati
+    SHEETS_PROBE_MAX_AGE sehingga harus diunduh ulang).
+    """
+    if not previous_range or SHEETS_PROBE_MAX_AGE <= 0:
+        return None
+    fetched_at = previous_range.get(FETCHED_AT_FIELD)
+    if not fetched_at or now - fetched_at >= SHEETS_PROBE_MAX_AGE:
+        return None
+
+    sheet_title, cell_part = split_a1_range(range_name)
+    try:
+        start_row, start_col, end_row, end_col = parse_a1_cells(cell_part)
+    except ValueError:
+        return None
+    if not cell_part or end_col is None:
+        return None
+
+    previous_values = previous_range.get('values', [])
+    first_probe_row = max(0, len(previous_values) - SHEETS_PROBE_ROWS)
+    probe_end_row = start_row + len(previous_values)
+    if end_row is not None:
+        probe_end_row = min(probe_end_row, end_row)
+    probe_range = _format_a1_range(sheet_title, start_row + first_probe_row, start_col, probe_end_row, end_col)
+    return probe_range, previous_values[first_probe_row:]
+
+def _probe_unchanged_keys(service, spreadsheet_id, ranges_by_key, previous_ranges, now):
+    """
+    Satu batchGet kecil untuk semua range yang bisa di-probe. Mengembalikan kunci yang
+    baris terakhirnya (dan jumlah barisnya) sama dengan cache, yang tidak perlu diunduh ulang.
+    Perubahan di tengah sheet baru terlihat setelah SHEETS_PROBE_MAX_AGE, jadi hanya
+    dipakai untuk sheet log yang bertambah di bawah, bukan grid yang diedit di tempat
+    (misalnya sheet bulanan Kesalahan).
+    """
+    probes = {}
+    for key, range_name in ranges_by_key.items():
+        probe = _probe_request(range_name, previous_ranges.get(key), now)
+        if probe:
+            probes[key] = probe
+    if not probes:
+        return set()
+
+    probe_ranges = {key: probe_range for key, (probe_range, _) in probes.items()}
+    unchanged = set()
+    for chunk in _chunk_ranges_for_url(probe_ranges):
+        value_ranges = service.batch_get_values(spreadsheet_id, list(chunk.values()))
+        for key, value_range in zip(chunk.keys(), value_ranges):
+            if value_range.get('values', []) == probes[key][1]:
+                unchanged.add(key)
+    return unchanged
+
+def _fetch_and_cache_ranges(service, spreadsheet_id, ranges_by_key, append_only_keys=(), probe_keys=()):
+    """
+    batchGet untuk {cache_key: range} lalu simpan setiap valueRange ke cache.
+    Range di append_only_keys hanya diambil ekornya (lihat _tail_request) lalu
+    digabung dengan baris lama. Range di probe_keys (selain yang memakai fetch ekor,
+    karena ekor sudah satu request) lebih dulu dicek dengan probe kecil dan tidak
+    diunduh ulang jika tidak berubah.
+    """
+    now = time.time()
+    previous_ranges = get_cached_many(list(ranges_by_key))
+
+    fetched_ranges = {}
+    probe_ranges = {
+        key: range_name for key, range_name in ranges_by_key.items()
+        if key in probe_keys and key not in append_only_keys
+    }
+    try:
+        unchanged_keys = _probe_unchanged_keys(service, spreadsheet_id, probe_ranges, previous_ranges, now)
+    except SheetsApiError:
+        raise
+    except Exception:
+        unchanged_keys = set()
+    for key in unchanged_keys:
+        # Disimpan ulang dengan TTL baru; _fetched_at tetap waktu unduhan terakhir
+        fetched_ranges[key] = previous_ranges[key]
+
+    request_ranges = {key: range_name for key, range_name in ranges_by_key.items() if key not in unchanged_keys}
+    tail_offsets = {}
+    for key in append_only_keys:
+        if key in request_ranges and key in previous_ranges:
+            tail = _tail_request(request_ranges[key], previous_ranges[key], now)
+            if tail:
+                request_ranges[key], tail_offsets[key] = tail
+
+    for chunk in _chunk_ranges_for_url(request_ranges):
+        # Permintaan bersamaan untuk set range yang sama menunggu satu batchGet saja.
+        # Offset ekor ikut dalam kunci agar hasil hanya dibagi ke pemanggil dengan offset sama.
+        flight_parts = {key: f"{key}@{tail_offsets[key]}" if key in tail_offsets else key for key in chunk}
+        # Hasil flight berupa {bagian kunci: valueRange}, bukan list: pemanggil lain bisa
+        # mengirim set range yang sama dengan urutan berbeda (kunci flight diurutkan).
+        value_ranges_by_part = single_flight(
+            _batch_flight_key(spreadsheet_id, flight_parts.values()),
+            lambda chunk=chunk, flight_parts=flight_parts: dict(zip(
+                flight_parts.values(),
+                service.batch_get_values(spreadsheet_id, list(chunk.values()))
+            ))
+        )
+        for key in chunk:
+            value_range = value_ranges_by_part.get(flight_parts[key], {})
+            if key in tail_offsets:
+                value_range = _merge_tail(previous_ranges[key], value_range, tail_offsets[key])
+            elif key in append_only_keys:
+                value_range = dict(value_range, **{FULL_SYNCED_AT_FIELD: now})
+            # Digest dihitung ulang (hasil merge ekor masih membawa digest lama)
+            fetched_ranges[key] = dict(value_range, **{FETCHED_AT_FIELD: now, DIGEST_FIELD: _value_range_digest(value_range)})
+
+    set_cached_many(
+        fetched_ranges,
+        cache_ttl=SHEETS_VALUE_CACHE_TTL,
+        hard_ttl=SHEETS_VALUE_CACHE_HARD_TTL
+    )
+    return fetched_ranges
+
+def get_batch_sheet_data(service, ranges, spreadsheet_id=None, append_only_ranges=(), force_refresh=False,
+                         probe_ranges=()):
+    """
+    batchGet dengan cache per range: range yang sudah ada di cache tidak ikut
+    dikirim ke Google, hanya range yang belum tersedia yang diambil.
+    Range yang sudah lewat soft TTL tetap dikembalikan dan di-refresh di background.
+    Range di `append_only_ranges` (sheet yang hanya bertambah di bawah) di-refresh
+    dengan fetch ekor, dengan resync penuh setiap LIVECHAT_TAIL_FULL_RESYNC_INTERVAL.
+    Range di `probe_ranges` (sheet log tanpa fetch ekor) dicek dulu dengan probe.
+    force_refresh=True me-refresh semua range secara sinkron (tetap lewat probe dan
+    fetch ekor). Urutan hasil selalu sama dengan urutan `ranges`.
+    """
     if not ranges:
         return []
         
     _, _, dynamic_spreadsheet_id = _load_dynamic_config()
     current_spreadsheet_id = spreadsheet_id if spreadsheet_id else dynamic_spreadsheet_id
 
+    cache_keys = [_value_cache_key(current_spreadsheet_id, r) for r in ranges]
+    append_only_keys = {_value_cache_key(current_spreadsheet_id, r) for r in append_only_ranges}
+    probe_keys = {_value_cache_key(current_spreadsheet_id, r) for r in probe_ranges}
+
     try:
-        result = service.spreadsheets().values().batchGet(
-            spreadsheetId=current_spreadsheet_id,
-            ranges=ranges
-        ).execute()
-        
-        return result.get('valueRanges', [])
+        stale_keys = set()
+        cached_ranges = get_cached_many(cache_keys, stale_keys=stale_keys)
+
+        missing_ranges = {}
+        stale_ranges = {}
+        for range_name, key in zip(ranges, cache_keys):
+            if key not in cached_ranges or force_refresh:
+                missing_ranges.setdefault(key, range_name)
+            elif key in stale_keys:
+                stale_ranges.setdefault(key, range_name)
+
+        if missing_ranges:
+            cached_ranges.update(
+                _fetch_and_cache_ranges(service, current_spreadsheet_id, missing_ranges, append_only_keys, probe_keys)
+            )
+
+        if stale_ranges:
+            refresh_in_background(
+                _batch_flight_key(current_spreadsheet_id, stale_ranges.keys()),
+                lambda: _fetch_and_cache_ranges(service, current_spreadsheet_id, stale_ranges, append_only_keys, probe_keys)
+            )
+
+        return [cached_ranges.get(key, {}) for key in cache_keys]
         
+    except SheetsApiError:
+        raise
     except Exception:
         return []
 
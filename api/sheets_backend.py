@@ -0,0 +1,217 @@
+# api/sheets_backend.py
+
+import csv
+import json
+from abc import ABC, abstractmethod
+import os
+import re
+import threading
+
+# =========================================================================
+# ANTARMUKA BACKEND SPREADSHEET
+# Semua akses data di sheets_api melewati tiga method ini, sehingga sumber data
+# bisa diganti (Google Sheets atau fixture lokal) lewat konfigurasi SHEETS_BACKEND.
+# Bentuk hasil mengikuti respons Google Sheets API v4 (valueRange, metadata).
+# =========================================================================
+
+class SheetsApiError(Exception):
+    """
+    Sumber data spreadsheet gagal dibaca setelah semua retry (kuota habis, 5xx, atau
+    gangguan jaringan). Dilempar ke route agar tampil sebagai error, bukan data kosong.
+    """
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class SheetsBackend(ABC):
+    """Antarmuka sumber data spreadsheet. Backend yang belum lengkap gagal saat dibuat."""
+
+    @abstractmethod
+    def get_values(self, spreadsheet_id, range_name):
+        """Setara values().get: mengembalikan satu valueRange {'range', 'majorDimension', 'values'}."""
+
+    @abstractmethod
+    def batch_get_values(self, spreadsheet_id, ranges):
+        """Setara values().batchGet: mengembalikan list valueRange sesuai urutan `ranges`."""
+
+    @abstractmethod
+    def get_metadata(self, spreadsheet_id, fields=None):
+        """Setara spreadsheets().get: mengembalikan {'sheets': [{'properties': {...}}]}."""
+
+
+# =========================================================================
+# BACKEND LOKAL (FIXTURE JSON/CSV)
+# =========================================================================
+
+_A1_CELL_PATTERN = re.compile(r'^([A-Z]*)(\d*)$')
+
+def column_letter_to_index(letters):
+    """'A' -> 0, 'Z' -> 25, 'AA' -> 26."""
+    index = 0
+    for char in letters:
+        index = index * 26 + (ord(char) - ord('A') + 1)
+    return index - 1
+
+def column_index_to_letter(index):
+    """0 -> 'A', 25 -> 'Z', 26 -> 'AA'."""
+    letters = ''
+    index += 1
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+def split_a1_range(range_name):
+    """Memecah "'Sheet'!A1:C" menjadi ('Sheet', 'A1:C'). Tanpa '!', seluruh teks adalah nama sheet."""
+    range_name = range_name.strip()
+    if '!' not in range_name:
+        return range_name.strip("'"), ''
+
+    sheet_part, cell_part = range_name.rsplit('!', 1)
+    sheet_part = sheet_part.strip()
+    if len(sheet_part) >= 2 and sheet_part[0] == sheet_part[-1] == "'":
+        sheet_part = sheet_part[1:-1].replace("''", "'")
+    return sheet_part, cell_part.strip().replace('$', '').upper()
+
+def parse_a1_cells(cell_part):
+    """
+    Mengubah 'A2:BN' menjadi (start_row, start_col, end_row, end_col) berbasis 0.
+    end_row/end_col bernilai None jika range terbuka (misalnya 'A1:C' atau 'H:H').
+    """
+    if not cell_part:
+        return 0, 0, None, None
+
+    start, _, end = cell_part.partition(':')
+    start_match = _A1_CELL_PATTERN.match(start)
+    end_match = _A1_CELL_PATTERN.match(end or start)
+    if not start_match or not end_match:
+        raise ValueError(f"Range A1 tidak valid: {cell_part}")
+
+    start_col_letters, start_row_digits = start_match.groups()
+    end_col_letters, end_row_digits = end_match.groups()
+
+    start_row = int(start_row_digits) - 1 if start_row_digits else 0
+    start_col = column_letter_to_index(start_col_letters) if start_col_letters else 0
+    end_row = int(end_row_digits) - 1 if end_row_digits else None
+    end_col = column_letter_to_index(end_col_letters) if end_col_letters else None
+    return start_row, start_col, end_row, end_col
+
+
+class LocalSheetsBackend(SheetsBackend):
+    """
+    Menyajikan spreadsheet dari direktori fixture, untuk profiling dan load test
+    tanpa akses ke Google.
+
+    Struktur direktori:
+        <fixture_dir>/<spreadsheet_id>/<judul sheet>.json   -> [[...], ...] atau {"values": [[...]]}
+        <fixture_dir>/<spreadsheet_id>/<judul sheet>.csv
+        <fixture_dir>/<spreadsheet_id>/_sheets.json         -> (opsional) urutan judul sheet
+
+    File dibaca ulang hanya jika mtime-nya berubah.
+    """
+
+    MANIFEST_FILE = '_sheets.json'
+
+    def __init__(self, fixture_dir):
+        self.fixture_dir = fixture_dir
+        self._lock = threading.Lock()
+        self._file_cache = {}
+
+    def _spreadsheet_dir(self, spreadsheet_id):
+        return os.path.join(self.fixture_dir, spreadsheet_id)
+
+    def _sheet_files(self, spreadsheet_id):
+        """{judul sheet: path file} sesuai urutan manifest (jika ada) atau nama file."""
+        spreadsheet_dir = self._spreadsheet_dir(spreadsheet_id)
+        if not os.path.isdir(spreadsheet_dir):
+            return {}
+
+        files = {}
+        for file_name in sorted(os.listdir(spreadsheet_dir)):
+            title, ext = os.path.splitext(file_name)
+            if file_name != self.MANIFEST_FILE and ext.lower() in ('.json', '.csv'):
+                files[title] = os.path.join(spreadsheet_dir, file_name)
+
+        manifest_path = os.path.join(spreadsheet_dir, self.MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as manifest:
+                ordered_titles = json.load(manifest)
+            ordered = {title: files[title] for title in ordered_titles if title in files}
+            ordered.update({title: path for title, path in files.items() if title not in ordered})
+            return ordered
+        return files
+
+    def _read_rows(self, path):
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            cached = self._file_cache.get(path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+        if path.lower().endswith('.csv'):
+            with open(path, newline='', encoding='utf-8') as csv_file:
+                rows = [list(row) for row in csv.reader(csv_file)]
+        else:
+            with open(path, encoding='utf-8') as json_file:
+                data = json.load(json_file)
+            rows = data.get('values', []) if isinstance(data, dict) else data
+            rows = [['' if cell is None else str(cell) for cell in row] for row in rows]
+
+        with self._lock:
+            self._file_cache[path] = (mtime, rows)
+        return rows
+
+    def _find_sheet_file(self, spreadsheet_id, sheet_title):
+        files = self._sheet_files(spreadsheet_id)
+        if sheet_title in files:
+            return sheet_title, files[sheet_title]
+        # Nama sheet di Google Sheets tidak case-sensitive
+        for title, path in files.items():
+            if title.upper() == sheet_title.upper():
+                return title, path
+        raise KeyError(f"Sheet '{sheet_title}' tidak ditemukan di fixture {spreadsheet_id}")
+
+    def get_values(self, spreadsheet_id, range_name):
+        sheet_title, cell_part = split_a1_range(range_name)
+        title, path = self._find_sheet_file(spreadsheet_id, sheet_title)
+        rows = self._read_rows(path)
+
+        start_row, start_col, end_row, end_col = parse_a1_cells(cell_part)
+        last_row = len(rows) - 1 if end_row is None else min(end_row, len(rows) - 1)
+
+        values = []
+        for row in rows[start_row:last_row + 1]:
+            cells = row[start_col:] if end_col is None else row[start_col:end_col + 1]
+            # Seperti Google: sel kosong di ujung baris tidak dikirim
+            while cells and cells[-1] == '':
+                cells = cells[:-1]
+            values.append(cells)
+
+        # Seperti Google: baris kosong di ujung range tidak dikirim
+        while values and not values[-1]:
+            values.pop()
+
+        value_range = {'range': f"'{title}'!{cell_part}" if cell_part else f"'{title}'", 'majorDimension': 'ROWS'}
+        if values:
+            value_range['values'] = values
+        return value_range
+
+    def batch_get_values(self, spreadsheet_id, ranges):
+        return [self.get_values(spreadsheet_id, range_name) for range_name in ranges]
+
+    def get_metadata(self, spreadsheet_id, fields=None):
+        sheets = []
+        for index, (title, path) in enumerate(self._sheet_files(spreadsheet_id).items()):
+            rows = self._read_rows(path)
+            sheets.append({'properties': {
+                'sheetId': index,
+                'title': title,
+                'index': index,
+                'gridProperties': {
+                    'rowCount': max(len(rows), 1),
+                    'columnCount': max((len(row) for row in rows), default=1) or 1,
+                },
+            }})
+        return {'sheets': sheets}
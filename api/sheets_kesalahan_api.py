@@ -3,18 +3,19 @@
 import re
 import sys 
 
-from .app import SHEETS_SERVICE, KESALAHAN_SPREADSHEET_ID 
+from .app import get_sheets_service, get_kesalahan_settings
 from .config import SHEETS_TO_HIDE
-from .sheets_api import get_batch_sheet_data, get_sheet_data # Pastikan get_sheet_data tersedia
+from .sheets_api import get_batch_sheet_data, get_sheet_data, get_sheet_directory # Pastikan get_sheet_data tersedia
 
 
 def _get_kesalahan_spreadsheet_id():
     """Mengambil ID Spreadsheet Kesalahan."""
+    kesalahan_spreadsheet_id, _, _ = get_kesalahan_settings()
     # Menambahkan validasi sederhana
-    if not KESALAHAN_SPREADSHEET_ID:
+    if not kesalahan_spreadsheet_id:
         print("ERROR: KESALAHAN_SPREADSHEET_ID belum didefinisikan di config/app.", file=sys.stderr)
         return None
-    return KESALAHAN_SPREADSHEET_ID
+    return kesalahan_spreadsheet_id
 
 # ----------------------------------------------------
 # 1. FUNGSI PENGAMBILAN SEMUA NAMA SHEET
@@ -26,7 +27,8 @@ def get_all_sheet_names():
     Returns:
         list: Daftar nama sheet (str) yang sudah difilter.
     """
-    if SHEETS_SERVICE is None:
+    sheets_service = get_sheets_service()
+    if sheets_service is None:
         print("Sheets Service Gagal Diinisialisasi.", file=sys.stderr)
         return []
     
@@ -34,15 +36,11 @@ def get_all_sheet_names():
     if not spreadsheet_id: return []
 
     try:
-        # Menggunakan fields='sheets.properties.title' agar lebih cepat
-        metadata = SHEETS_SERVICE.spreadsheets().get(
-            spreadsheetId=spreadsheet_id,
-            fields='sheets.properties.title'
-        ).execute()
+        # Direktori sheet di-cache dan diambil dengan field mask agar lebih cepat
+        directory = get_sheet_directory(sheets_service, spreadsheet_id)
         
         # Ekstrak nama sheet
-        sheet_names = [sheet.get('properties', {}).get('title') 
-                       for sheet in metadata.get('sheets', [])]
+        sheet_names = [entry['title'] for entry in directory]
         
         # Hapus sheet yang tidak relevan (berdasarkan SHEETS_TO_HIDE dari config)
         filtered_names = [name for name in sheet_names if name not in SHEETS_TO_HIDE]
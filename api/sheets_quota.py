@@ -0,0 +1,161 @@
+# api/sheets_quota.py
+
+import random
+import threading
+import time
+
+from .config import (
+    SHEETS_READ_QUOTA_PER_MINUTE, SHEETS_RATE_LIMIT_MAX_WAIT,
+    SHEETS_RETRY_MAX_ATTEMPTS, SHEETS_RETRY_BASE_DELAY, SHEETS_RETRY_MAX_DELAY,
+    SHEETS_CALL_DEADLINE, SHEETS_HTTP_TIMEOUT
+)
+from .database import get_redis_client
+from .sheets_backend import SheetsApiError
+
+# =========================================================================
+# RATE LIMITER (TOKEN BUCKET) DAN RETRY UNTUK GOOGLE SHEETS API
+# Semua panggilan ke Google (values.get, values.batchGet, spreadsheets.get)
+# mengambil satu token dari bucket bersama di Redis sehingga seluruh instance
+# tetap di bawah kuota baca per menit. Tanpa Redis dipakai bucket per proses.
+# =========================================================================
+
+RATE_LIMIT_KEY = 'sheets:rate_limit:read'
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Mengembalikan 0 jika token diberikan, atau lama menunggu (ms) sampai token tersedia
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate_per_ms = tonumber(ARGV[2])
+local redis_time = redis.call('TIME')
+local now = tonumber(redis_time[1]) * 1000 + math.floor(tonumber(redis_time[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate_per_ms)
+
+local wait_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait_ms = math.ceil((1 - tokens) / rate_per_ms)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate_per_ms) + 1000)
+return wait_ms
+"""
+
+class _LocalTokenBucket:
+    """Bucket per proses, dipakai jika Redis tidak tersedia."""
+
+    def __init__(self, capacity, rate_per_ms):
+        self.capacity = capacity
+        self.rate_per_ms = rate_per_ms
+        self._tokens = capacity
+        self._ts = time.monotonic() * 1000
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            now = time.monotonic() * 1000
+            self._tokens = min(self.capacity, self._tokens + (now - self._ts) * self.rate_per_ms)
+            self._ts = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return int((1 - self._tokens) / self.rate_per_ms) + 1
+
+_BUCKET_CAPACITY = max(1, SHEETS_READ_QUOTA_PER_MINUTE)
+_BUCKET_RATE_PER_MS = _BUCKET_CAPACITY / 60000.0
+_local_bucket = _LocalTokenBucket(_BUCKET_CAPACITY, _BUCKET_RATE_PER_MS)
+
+def _try_acquire_token():
+    redis_client = get_redis_client()
+    if redis_client:
+        try:
+            return int(redis_client.eval(_TOKEN_BUCKET_SCRIPT, 1, RATE_LIMIT_KEY, _BUCKET_CAPACITY, _BUCKET_RATE_PER_MS))
+        except Exception:
+            pass
+    return _local_bucket.try_acquire()
+
+def acquire_read_token(max_wait=SHEETS_RATE_LIMIT_MAX_WAIT):
+    """Menunggu sampai satu token baca tersedia; SheetsApiError jika melewati max_wait."""
+    deadline = time.monotonic() + max_wait
+    while True:
+        wait_ms = _try_acquire_token()
+        if wait_ms <= 0:
+            return
+        # Jitter kecil agar instance yang menunggu tidak bangun bersamaan
+        wait_seconds = wait_ms / 1000.0 + random.uniform(0, 0.05)
+        if time.monotonic() + wait_seconds > deadline:
+            raise SheetsApiError(
+                "Kuota baca Google Sheets per menit sedang habis. Silakan coba lagi sebentar lagi.",
+                status=429
+            )
+        time.sleep(wait_seconds)
+
+# =========================================================================
+# RETRY DENGAN EXPONENTIAL BACKOFF + JITTER
+# =========================================================================
+
+def _error_status(error):
+    """Status HTTP dari HttpError googleapiclient (atau None untuk error lain)."""
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def _is_retryable(error):
+    status = _error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    # Timeout/koneksi putus (socket.timeout, ConnectionError, ...) adalah OSError
+    return isinstance(error, OSError)
+
+def _retry_after_seconds(error):
+    headers = getattr(error, 'resp', None) or {}
+    try:
+        return float(headers.get('retry-after', 0))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+def _backoff_delay(attempt):
+    """Full jitter: acak antara 0 dan base * 2^attempt (maksimal SHEETS_RETRY_MAX_DELAY)."""
+    return random.uniform(0, min(SHEETS_RETRY_MAX_DELAY, SHEETS_RETRY_BASE_DELAY * (2 ** attempt)))
+
+def call_sheets_api(request_func, deadline_seconds=SHEETS_CALL_DEADLINE):
+    """
+    Menjalankan satu panggilan Google Sheets API dengan rate limiter dan retry.
+    Error 429/5xx/jaringan diulang maksimal SHEETS_RETRY_MAX_ATTEMPTS kali lalu dilempar
+    sebagai SheetsApiError; error lain (misalnya 400 range tidak valid) dilempar apa adanya.
+    Menunggu token, request HTTP, dan backoff dibatasi satu deadline (SHEETS_CALL_DEADLINE):
+    request_func(timeout) menerima sisa waktu sebagai timeout HTTP, dan jika deadline
+    habis SheetsApiError langsung dilempar tanpa retry lagi.
+    """
+    deadline = time.monotonic() + deadline_seconds
+    attempts = max(1, SHEETS_RETRY_MAX_ATTEMPTS)
+    last_error = None
+    for attempt in range(attempts):
+        acquire_read_token(max_wait=min(SHEETS_RATE_LIMIT_MAX_WAIT, max(0, deadline - time.monotonic())))
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            return request_func(min(SHEETS_HTTP_TIMEOUT, remaining))
+        except Exception as e:
+            if not _is_retryable(e):
+                raise
+            last_error = e
+
+        if attempt + 1 < attempts:
+            delay = max(_backoff_delay(attempt), min(_retry_after_seconds(last_error), SHEETS_RETRY_MAX_DELAY))
+            if time.monotonic() + delay >= deadline:
+                break
+            time.sleep(delay)
+
+    raise SheetsApiError(
+        f"Google Sheets API gagal setelah {attempt + 1} percobaan: {last_error}",
+        status=_error_status(last_error)
+    ) from last_error
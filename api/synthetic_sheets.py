@@ -0,0 +1,149 @@
+# api/synthetic_sheets.py
+
+"""
+Generator spreadsheet sintetis dengan struktur yang sama seperti sheet asli,
+ditulis sebagai fixture untuk LocalSheetsBackend (SHEETS_BACKEND=local).
+
+- Sheet situs Livechat: kolom A:C berisi baris pembatas bulan ('', 'dd/mm/yyyy', '')
+  diikuti baris kesalahan (nama staff, link, jenis kesalahan); kolom H berisi
+  daftar staff (termasuk nama gabungan "A / B").
+- Sheet bulanan Kesalahan (misalnya 'NOV25'): baris 2 berisi tanggal, baris 3
+  berisi DP/WD per kolom, lalu satu baris per staff dengan jumlah kesalahan.
+"""
+
+import json
+import os
+import random
+from datetime import date
+
+ERROR_TYPES = [
+    "Salah respon", "Salah informasi", "Telat minta maaf", "Tidak respon", "Telat respon",
+    "Tidak membantu / menyelesaikan kendala dengan benar", "Tidak melakukan pengecekan",
+    "Tidak teliti", "Asal spam pk", "Tidak minta userid", "Fatal", "Tidak memahami permainan",
+    "Tidak respon permainan", "Memberikan data penting ke member", "Salah indikator bank",
+    "Mempermainkan member", "Capslock", "Tidak sopan", "Ubah data tanpa data lengkap",
+    "Reset pass tanpa persetujuan", "Tidak meminta data pendukung", "SS admin",
+    "Note", "Note Pengecekkan tidak berujung",
+]
+
+FIRST_NAMES = [
+    "Budi", "Andi", "Sari", "Dewi", "Rizky", "Agus", "Putri", "Wahyu", "Indah", "Fajar",
+    "Rina", "Dimas", "Yoga", "Nina", "Bayu", "Lestari", "Hendra", "Maya", "Eko", "Sinta",
+]
+
+STAFF_COLUMN_INDEX = 7  # kolom H
+
+
+def _month_starts(months, today=None):
+    """Tanggal 1 dari `months` bulan terakhir, urut dari yang terlama."""
+    today = today or date.today()
+    year, month = today.year, today.month
+    starts = []
+    for _ in range(months):
+        starts.append(date(year, month, 1))
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return list(reversed(starts))
+
+
+def _staff_names(rng, count, prefix=''):
+    names = []
+    for i in range(count):
+        name = f"{prefix}{rng.choice(FIRST_NAMES)} {i + 1}"
+        # Sebagian staff memakai nama gabungan seperti di sheet asli
+        if rng.random() < 0.1:
+            name = f"{name} / {rng.choice(FIRST_NAMES)} {i + 1}B"
+        names.append(name)
+    return names
+
+
+def generate_livechat_site(rng, staff_count, months, errors_per_staff_month, trailing_new_month=True):
+    """Baris sheet situs Livechat (kolom A:H) dengan pembatas bulan dan daftar staff di kolom H."""
+    staff_names = _staff_names(rng, staff_count)
+    error_rows = [['Nama Staff', 'Link Kesalahan', 'Poin Kesalahan']]
+
+    for month_start in _month_starts(months):
+        error_rows.append(['', month_start.strftime('%d/%m/%Y'), ''])
+        for _ in range(int(staff_count * errors_per_staff_month)):
+            # Nama gabungan kadang ditulis salah satu bagiannya saja
+            staff_parts = rng.choice(staff_names).split(' / ')
+            staff = staff_parts[-1] if rng.random() < 0.2 else staff_parts[0]
+            error_type = rng.choice(ERROR_TYPES)
+            suffix = f" ({rng.randint(1, 9)}x)" if rng.random() < 0.3 else ''
+            error_rows.append([staff, f"https://prnt.sc/{rng.getrandbits(32):08x}", error_type + suffix])
+
+    if trailing_new_month:
+        # Data bulan baru yang belum diberi baris pembatas
+        for _ in range(max(1, staff_count // 4)):
+            error_rows.append([rng.choice(staff_names).split(' / ')[0], 'https://prnt.sc/x', rng.choice(ERROR_TYPES)])
+
+    staff_rows = [['NAMA STAFF']] + [[name] for name in staff_names] + [['TOTAL']]
+
+    rows = []
+    for i in range(max(len(error_rows), len(staff_rows))):
+        row = list(error_rows[i]) if i < len(error_rows) else []
+        row += [''] * (STAFF_COLUMN_INDEX - len(row))
+        row.append(staff_rows[i][0] if i < len(staff_rows) else '')
+        rows.append(row)
+    return rows
+
+
+def generate_kesalahan_month(rng, sites, staff_count, days=31, error_probability=0.08):
+    """
+    Baris sheet bulanan Kesalahan mulai dari baris 1 (range A2:BN dimulai dari
+    header tanggal di baris 2).
+    """
+    header_dates = ['PASSPORT', 'NAMA STAFF', 'STATUS', 'SITUS']
+    header_types = ['', '', '', '']
+    for day in range(1, days + 1):
+        header_dates += [f"{day:02d}", '']
+        header_types += ['DP', 'WD']
+
+    rows = [['REKAP KESALAHAN'], header_dates, header_types]
+    for i, name in enumerate(_staff_names(rng, staff_count, prefix='K ')):
+        row = [f"P{i:05d}", name, rng.choice(['AKTIF', 'TRAINING']), rng.choice(sites)]
+        for _ in range(days * 2):
+            row.append(str(rng.randint(1, 3)) if rng.random() < error_probability else '')
+        rows.append(row)
+    return rows
+
+
+def kesalahan_month_sheet_name(month_start):
+    """Nama sheet bulanan seperti di routes_kesalahan, misalnya 'NOV25'."""
+    return month_start.strftime('%b%y').upper()
+
+
+def generate_fixtures(output_dir, livechat_spreadsheet_id, kesalahan_spreadsheet_id,
+                      sites=20, staff_per_site=15, months=6, errors_per_staff_month=2.0,
+                      kesalahan_staff=300, seed=42):
+    """
+    Menulis fixture Livechat dan Kesalahan ke output_dir (format LocalSheetsBackend).
+    Mengembalikan {'sites': [...], 'kesalahan_months': [...]}.
+    """
+    rng = random.Random(seed)
+    site_names = [f"SITUS{i + 1:03d}" for i in range(sites)]
+
+    livechat_dir = os.path.join(output_dir, livechat_spreadsheet_id)
+    kesalahan_dir = os.path.join(output_dir, kesalahan_spreadsheet_id)
+    os.makedirs(livechat_dir, exist_ok=True)
+    os.makedirs(kesalahan_dir, exist_ok=True)
+
+    for site_name in site_names:
+        rows = generate_livechat_site(rng, staff_per_site, months, errors_per_staff_month)
+        with open(os.path.join(livechat_dir, f"{site_name}.json"), 'w', encoding='utf-8') as f:
+            json.dump(rows, f)
+    with open(os.path.join(livechat_dir, '_sheets.json'), 'w', encoding='utf-8') as f:
+        json.dump(site_names, f)
+
+    month_names = []
+    for month_start in _month_starts(months):
+        sheet_name = kesalahan_month_sheet_name(month_start)
+        month_names.append(sheet_name)
+        rows = generate_kesalahan_month(rng, site_names, kesalahan_staff)
+        with open(os.path.join(kesalahan_dir, f"{sheet_name}.json"), 'w', encoding='utf-8') as f:
+            json.dump(rows, f)
+    with open(os.path.join(kesalahan_dir, '_sheets.json'), 'w', encoding='utf-8') as f:
+        json.dump(month_names, f)
+
+    return {'sites': site_names, 'kesalahan_months': month_names}
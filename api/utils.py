@@ -1,34 +1,85 @@
 # api/utils.py
 
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from flask import g, has_request_context
+
 from .app import (
-    SHEETS_SERVICE, KESALAHAN_SHEETS_SERVICE,
-    LIVECHAT_SPREADSHEET_ID, KESALAHAN_SPREADSHEET_ID
+    app, get_sheets_service, get_kesalahan_sheets_service,
+    get_livechat_settings, get_kesalahan_settings
 )
+from .config import SHEETS_FETCH_MAX_WORKERS, SHEET_NAMES_FETCH_TIMEOUT
 from .database import get_special_sheets
-from .sheets_api import get_sheet_names
+from .sheets_api import get_sheet_names, SheetsApiError
+
+# Pool terbatas untuk fetch Sheets yang saling independen
+sheets_fetch_executor = ThreadPoolExecutor(
+    max_workers=SHEETS_FETCH_MAX_WORKERS, thread_name_prefix='sheets-fetch'
+)
+
+
+def _run_in_app_context(func, *args, **kwargs):
+    """Thread worker tidak punya app context, padahal cache konfigurasi bisa query DB."""
+    with app.app_context():
+        return func(*args, **kwargs)
+
+
+def run_concurrently(tasks, timeout=SHEET_NAMES_FETCH_TIMEOUT):
+    """
+    Menjalankan {label: (func, args)} secara paralel di sheets_fetch_executor.
+    Semua task berbagi satu batas waktu. Mengembalikan (hasil, gagal): {label: hasil}
+    untuk task yang berhasil dan {label: exception} untuk task yang error (termasuk
+    SheetsApiError) atau timeout, sehingga pemanggil tetap bisa memakai hasil parsial.
+    """
+    futures = {
+        label: sheets_fetch_executor.submit(_run_in_app_context, func, *args)
+        for label, (func, args) in tasks.items()
+    }
+
+    deadline = time.monotonic() + timeout
+    results = {}
+    failed = {}
+    for label, future in futures.items():
+        try:
+            results[label] = future.result(timeout=max(0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            failed[label] = TimeoutError(f"Timeout saat mengambil {label} (> {timeout} detik)")
+        except Exception as e:
+            failed[label] = e
+    return results, failed
 
 
 def get_all_sheet_names():
-    """Mengambil daftar sheet dari Livechat dan Kesalahan untuk navigasi."""
+    """Mengambil daftar sheet dari Livechat dan Kesalahan untuk navigasi (paralel)."""
     sheet_khusus = get_special_sheets()
-    sheet_names_livechat = []
-    kesalahan_sheet_names = []
+    tasks = {}
+
+    sheets_service = get_sheets_service()
+    livechat_spreadsheet_id, _, _ = get_livechat_settings()
+    kesalahan_sheets_service = get_kesalahan_sheets_service()
+    kesalahan_spreadsheet_id, _, _ = get_kesalahan_settings()
     
-    # 1. Sheet Livechat
-    if SHEETS_SERVICE and LIVECHAT_SPREADSHEET_ID:
-        try:
-            # Mengambil sheet Livechat, melewati sheet yang ada di sheet_khusus
-            sheet_names_livechat = get_sheet_names(SHEETS_SERVICE, sheet_khusus, LIVECHAT_SPREADSHEET_ID)
-        except Exception as e:
-            print(f"Peringatan: Gagal mengambil sheet Livechat: {e}")
+    # 1. Sheet Livechat, melewati sheet yang ada di sheet_khusus
+    if sheets_service and livechat_spreadsheet_id:
+        tasks['sheet Livechat'] = (get_sheet_names, (sheets_service, sheet_khusus, livechat_spreadsheet_id))
 
-    # 2. Sheet Kesalahan
-    if KESALAHAN_SHEETS_SERVICE and KESALAHAN_SPREADSHEET_ID:
-        try:
-            # Sheet kesalahan tidak menggunakan filter sheet_khusus
-            kesalahan_sheet_names = get_sheet_names(KESALAHAN_SHEETS_SERVICE, {}, KESALAHAN_SPREADSHEET_ID)
-        except Exception as e:
-            print(f"Peringatan: Gagal mengambil sheet Kesalahan: {e}")
+    # 2. Sheet Kesalahan, tidak menggunakan filter sheet_khusus
+    if kesalahan_sheets_service and kesalahan_spreadsheet_id:
+        tasks['sheet Kesalahan'] = (get_sheet_names, (kesalahan_sheets_service, {}, kesalahan_spreadsheet_id))
+
+    results, failed = run_concurrently(tasks)
+    if failed:
+        # Semua sumber gagal karena Google: tidak ada navigasi yang bisa ditampilkan (503)
+        if not results:
+            for error in failed.values():
+                if isinstance(error, SheetsApiError):
+                    raise error
+        # Sebagian gagal: halaman tetap dirender, base.html menampilkan peringatan
+        if has_request_context():
+            g.sheet_names_failed = list(failed)
+    sheet_names_livechat = results.get('sheet Livechat', [])
+    kesalahan_sheet_names = results.get('sheet Kesalahan', [])
 
     # Mengembalikan daftar nama sheet Livechat, Kesalahan, dan mapping sheet khusus
-    return sheet_names_livechat, kesalahan_sheet_names, sheet_khusus
\ No newline at end of file
+    return sheet_names_livechat, kesalahan_sheet_names, sheet_khusus
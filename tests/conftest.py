@@ -0,0 +1,8 @@
+# tests/conftest.py
+
+import os
+
+# Modul api membaca konfigurasi saat diimpor: pakai SQLite di memori dan tanpa Redis
+# agar test tidak menyentuh database/Redis produksi.
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+os.environ.setdefault('REDIS_URL', '')
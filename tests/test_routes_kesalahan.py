@@ -0,0 +1,70 @@
+# tests/test_routes_kesalahan.py
+
+import random
+
+import pytest
+
+from api.routes_kesalahan import (
+    _merge_monthly_rekap, _new_master_rekap, _rekap_staff_grid_numpy, _rekap_staff_grid_python
+)
+from api.synthetic_sheets import generate_kesalahan_month
+
+
+def _rekap(passport, nama, total_dp, total_wd, details):
+    return {
+        'passport': passport, 'nama': nama, 'status': 'AKTIF', 'situs': 'DEPOBOS',
+        'total_kesalahan': total_dp + total_wd,
+        'total_kesalahan_dp': total_dp, 'total_kesalahan_wd': total_wd,
+        'details_per_date': details,
+    }
+
+
+def test_merge_monthly_rekap_sums_totals_and_keeps_first_identity():
+    master = _new_master_rekap()
+    okt_detail = {'sheet': 'OKT26', 'tanggal': '01', 'tipe': 'DP', 'jumlah': 2.0}
+    nov_detail = {'sheet': 'NOV26', 'tanggal': '03', 'tipe': 'WD', 'jumlah': 1.0}
+
+    _merge_monthly_rekap(master, {'P1': _rekap('P1', 'Budi', 2.0, 0.0, [okt_detail])})
+    _merge_monthly_rekap(master, {
+        'P1': _rekap('P1', 'Budi Baru', 0.0, 1.0, [nov_detail]),
+        'P2': _rekap('P2', 'Andi', 1.5, 0.5, []),
+    })
+
+    assert master['P1']['nama'] == 'Budi'
+    assert master['P1']['total_kesalahan'] == 3.0
+    assert master['P1']['total_kesalahan_dp'] == 2.0
+    assert master['P1']['total_kesalahan_wd'] == 1.0
+    assert master['P1']['details_per_date'] == [okt_detail, nov_detail]
+    assert master['P2']['passport'] == 'P2'
+    assert master['P2']['total_kesalahan'] == 2.0
+    # Poin dihitung belakangan dari total, bukan saat penggabungan
+    assert master['P1']['point_total'] == 0.0
+
+
+def test_merge_monthly_rekap_fills_identity_from_later_month():
+    master = _new_master_rekap()
+    master['P3']  # Staff sudah tercatat tanpa data identitas
+
+    _merge_monthly_rekap(master, {'P3': _rekap('P3', 'Sari', 1.0, 0.0, [])})
+
+    assert (master['P3']['passport'], master['P3']['nama'], master['P3']['situs']) == ('P3', 'Sari', 'DEPOBOS')
+
+
+def test_numpy_staff_grid_matches_python_parser():
+    pytest.importorskip('numpy')
+    rows = generate_kesalahan_month(random.Random(3), ['DEPOBOS', 'GENGTOTO'], 40, days=5, error_probability=0.3)
+    header_dates, header_types, staff_rows = rows[1], rows[2], rows[3:]
+    # Sel tidak rapi seperti di sheet asli
+    staff_rows[0][5] = '1,5'
+    staff_rows[1][6] = ' 2 '
+    staff_rows[2][7] = 'x'
+    date_mapping = {}
+    current_date = ''
+    for i, header in enumerate(header_dates):
+        current_date = header.strip() or current_date
+        date_mapping[i] = current_date
+    column_types = [header.strip().upper() for header in header_types]
+
+    for include_details in (True, False):
+        assert _rekap_staff_grid_numpy('NOV26', staff_rows, date_mapping, column_types, include_details) == \
+            _rekap_staff_grid_python('NOV26', staff_rows, date_mapping, column_types, include_details)
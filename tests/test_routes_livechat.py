@@ -0,0 +1,78 @@
+# tests/test_routes_livechat.py
+
+from datetime import datetime
+
+import pytest
+
+from api.routes_livechat import _parse_date_cell, combine_staff_total_partials
+
+
+# --- _parse_date_cell ---
+
+@pytest.mark.parametrize('text', [
+    '01/09/2026', '1/9/2026', ' 1/09/2026', '31/12/99', '01/01/68', '01/01/69', '29/02/2024',
+])
+def test_parse_date_cell_matches_strptime(text):
+    expected = None
+    for fmt in ('%d/%m/%Y', '%d/%m/%y'):
+        try:
+            expected = datetime.strptime(text, fmt)
+            break
+        except ValueError:
+            continue
+
+    assert expected is not None
+    assert _parse_date_cell(text) == expected
+
+
+@pytest.mark.parametrize('text', [
+    '', 'Budi', '31/02/2026', '29/02/2025', '01/13/2026', '01/09/202', '001/09/2026', '01-09-2026', '01/09/2026 ',
+])
+def test_parse_date_cell_rejects_non_dates(text):
+    assert _parse_date_cell(text) is None
+
+
+def test_parse_date_cell_two_digit_year_pivot():
+    assert _parse_date_cell('01/01/68').year == 2068
+    assert _parse_date_cell('01/01/69').year == 1969
+
+
+# --- combine_staff_total_partials ---
+
+def test_combine_adds_frozen_months_for_current_staff_only():
+    live = {
+        'BUDI': {'name': ' Budi ', 'total': 3, 'notes': 5},
+        'ANDI': {'name': 'Andi', 'total': 4, 'notes': 0},
+    }
+    frozen = [
+        {'BUDI': {'name': 'Budi', 'total': 2, 'notes': 6}, 'KELUAR': {'name': 'Keluar', 'total': 9, 'notes': 0}},
+        {'ANDI': {'name': 'Andi', 'total': 0, 'notes': 3}},
+    ]
+
+    site_total, staff_totals = combine_staff_total_partials(live, frozen)
+
+    # Budi: 3 + 2 kesalahan, 5 + 6 note -> 1 poin tambahan; Andi: 4, 3 note belum cukup
+    assert staff_totals == {'BUDI': 6, 'ANDI': 4}
+    assert list(staff_totals) == ['BUDI', 'ANDI']
+    assert site_total == 10
+    # Partial live tidak diubah (bisa berasal dari cache)
+    assert live['BUDI'] == {'name': ' Budi ', 'total': 3, 'notes': 5}
+
+
+def test_combine_notes_are_counted_after_summing_months():
+    live = {'SARI': {'name': 'Sari', 'total': 0, 'notes': 5}}
+    frozen = [{'SARI': {'name': 'Sari', 'total': 0, 'notes': 5}}]
+
+    assert combine_staff_total_partials(live, frozen) == (1, {'SARI': 1})
+
+
+def test_combine_without_frozen_months_orders_by_total():
+    live = {
+        'A': {'name': 'A', 'total': 1, 'notes': 0},
+        'B': {'name': 'B', 'total': 5, 'notes': 20},
+    }
+
+    site_total, staff_totals = combine_staff_total_partials(live, [])
+
+    assert list(staff_totals.items()) == [('B', 7), ('A', 1)]
+    assert site_total == 8
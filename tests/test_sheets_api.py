@@ -0,0 +1,140 @@
+# tests/test_sheets_api.py
+
+import json
+import os
+import random
+import time
+from urllib.parse import quote
+
+import pytest
+
+from api.config import SHEETS_PROBE_MAX_AGE
+from api.sheets_api import (
+    FETCHED_AT_FIELD, _chunk_ranges_for_url, _merge_tail, _probe_unchanged_keys
+)
+from api.sheets_backend import LocalSheetsBackend
+from api.synthetic_sheets import generate_livechat_site
+
+SPREADSHEET_ID = 'livechat-test'
+
+
+# --- _merge_tail ---
+
+def test_merge_tail_keeps_rows_before_offset_and_replaces_the_rest():
+    previous = {'range': "'A'!A1:C", 'values': [['1'], ['2'], ['3'], ['4']], '_fetched_at': 10}
+    tail = {'range': "'A'!A3:C", 'values': [['3'], ['4b'], ['5']]}
+
+    merged = _merge_tail(previous, tail, 2)
+
+    assert merged['values'] == [['1'], ['2'], ['3'], ['4b'], ['5']]
+    assert merged['range'] == "'A'!A1:C"
+    assert merged['_fetched_at'] == 10
+    # Cache lama tidak ikut berubah
+    assert previous['values'] == [['1'], ['2'], ['3'], ['4']]
+
+
+def test_merge_tail_drops_trailing_empty_rows():
+    previous = {'values': [['1'], ['2'], ['3']]}
+    tail = {'values': [['2'], [], []]}
+
+    assert _merge_tail(previous, tail, 1)['values'] == [['1'], ['2']]
+
+
+def test_merge_tail_without_values_omits_the_key_like_google():
+    merged = _merge_tail({'range': "'A'!A1:C", 'values': [[]]}, {}, 0)
+
+    assert merged == {'range': "'A'!A1:C"}
+
+
+# --- _chunk_ranges_for_url ---
+
+def _param_length(range_name):
+    return len('&ranges=') + len(quote(range_name, safe=''))
+
+
+def test_chunk_ranges_keeps_order_and_url_limit():
+    ranges = {f"key{i}": f"'Situs {i}'!A1:C" for i in range(40)}
+
+    chunks = _chunk_ranges_for_url(ranges, max_url_chars=200)
+
+    assert len(chunks) > 1
+    assert [key for chunk in chunks for key in chunk] == list(ranges)
+    for chunk in chunks:
+        assert sum(_param_length(range_name) for range_name in chunk.values()) <= 200
+
+
+def test_chunk_ranges_puts_an_oversized_range_in_its_own_chunk():
+    ranges = {'small': "'A'!A1:C", 'huge': "'" + 'X' * 500 + "'!A1:C", 'after': "'B'!A1:C"}
+
+    chunks = _chunk_ranges_for_url(ranges, max_url_chars=100)
+
+    assert chunks == [{'small': "'A'!A1:C"}, {'huge': ranges['huge']}, {'after': "'B'!A1:C"}]
+
+
+def test_chunk_ranges_empty():
+    assert _chunk_ranges_for_url({}) == []
+
+
+# --- _probe_unchanged_keys (LocalSheetsBackend) ---
+
+class _CountingBackend(LocalSheetsBackend):
+    def __init__(self, fixture_dir):
+        super().__init__(fixture_dir)
+        self.batch_calls = []
+
+    def batch_get_values(self, spreadsheet_id, ranges):
+        self.batch_calls.append(list(ranges))
+        return super().batch_get_values(spreadsheet_id, ranges)
+
+
+def _write_sheet(fixture_dir, title, rows):
+    spreadsheet_dir = os.path.join(fixture_dir, SPREADSHEET_ID)
+    os.makedirs(spreadsheet_dir, exist_ok=True)
+    path = os.path.join(spreadsheet_dir, f"{title}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(rows, f)
+    # mtime dimajukan agar LocalSheetsBackend tidak memakai isi file lama
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+@pytest.fixture
+def probe_setup(tmp_path):
+    rng = random.Random(7)
+    sheets = {'SITUS001': generate_livechat_site(rng, 5, 2, 2), 'SITUS002': generate_livechat_site(rng, 5, 2, 2)}
+    for title, rows in sheets.items():
+        _write_sheet(str(tmp_path), title, rows)
+
+    backend = _CountingBackend(str(tmp_path))
+    ranges_by_key = {title: f"'{title}'!A1:C" for title in sheets}
+    now = time.time()
+    previous_ranges = {}
+    for key, range_name in ranges_by_key.items():
+        previous_ranges[key] = dict(backend.get_values(SPREADSHEET_ID, range_name), **{FETCHED_AT_FIELD: now})
+    return backend, str(tmp_path), sheets, ranges_by_key, previous_ranges, now
+
+
+def test_probe_reports_unchanged_ranges_in_one_batch(probe_setup):
+    backend, _, _, ranges_by_key, previous_ranges, now = probe_setup
+
+    assert _probe_unchanged_keys(backend, SPREADSHEET_ID, ranges_by_key, previous_ranges, now) == set(ranges_by_key)
+    assert len(backend.batch_calls) == 1
+
+
+def test_probe_detects_appended_and_edited_last_rows(probe_setup):
+    backend, fixture_dir, sheets, ranges_by_key, previous_ranges, now = probe_setup
+    _write_sheet(fixture_dir, 'SITUS001', sheets['SITUS001'] + [['Budi 1', 'https://prnt.sc/new', 'Fatal']])
+    edited = [list(row) for row in sheets['SITUS002']]
+    edited[-1][0] = 'Nama Baru'
+    _write_sheet(fixture_dir, 'SITUS002', edited)
+
+    assert _probe_unchanged_keys(backend, SPREADSHEET_ID, ranges_by_key, previous_ranges, now) == set()
+
+
+def test_probe_skips_ranges_without_recent_download(probe_setup):
+    backend, _, _, ranges_by_key, previous_ranges, now = probe_setup
+    previous_ranges['SITUS001'][FETCHED_AT_FIELD] = now - SHEETS_PROBE_MAX_AGE
+    del previous_ranges['SITUS002']
+
+    assert _probe_unchanged_keys(backend, SPREADSHEET_ID, ranges_by_key, previous_ranges, now) == set()
+    assert backend.batch_calls == []
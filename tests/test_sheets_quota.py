@@ -0,0 +1,46 @@
+# tests/test_sheets_quota.py
+
+import pytest
+
+from api import sheets_quota
+from api.sheets_quota import _LocalTokenBucket
+
+
+class _Clock:
+    def __init__(self):
+        self.seconds = 1000.0
+
+    def __call__(self):
+        return self.seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(sheets_quota.time, 'monotonic', clock)
+    return clock
+
+
+def test_bucket_starts_full_then_reports_wait(clock):
+    # 1 token per 1000 ms
+    bucket = _LocalTokenBucket(3, 1 / 1000.0)
+
+    assert [bucket.try_acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.try_acquire() == 1001
+
+
+def test_bucket_refills_over_time_up_to_capacity(clock):
+    bucket = _LocalTokenBucket(2, 1 / 1000.0)
+    bucket.try_acquire()
+    bucket.try_acquire()
+
+    clock.seconds += 0.5
+    assert 0 < bucket.try_acquire() <= 501
+
+    clock.seconds += 0.5
+    assert bucket.try_acquire() == 0
+
+    # Menunggu lama tidak menambah token melebihi kapasitas
+    clock.seconds += 3600
+    assert [bucket.try_acquire() for _ in range(2)] == [0, 0]
+    assert bucket.try_acquire() == 1001